@@ -0,0 +1,115 @@
+"""
+Requests to the example app routers, both schema backends,
+called in-process through ASGI, so no network is involved.
+
+The authors table is filled with 50k rows. The paginated collection
+returns up to 1000 of them, so all of them are requested from the streamed one.
+
+Usage: python -m benchmarks.bench_endpoints [-k LABEL] [--factor 0.1]
+       [--concurrency 10] [--save NAME] [--compare NAME]
+"""
+import asyncio
+import json
+import typing
+
+from typing import Any, List, Optional
+
+from starlette_cbge.testing import call_asgi
+
+from example_app.app import base_pydantic_api, base_typesystem_api
+from example_app.db import create_tables, database, drop_tables
+
+from benchmarks.common import Result, finish, get_parser, measure_async, scale
+
+
+ROWS = 50000
+BACKENDS = (("pydantic", base_pydantic_api), ("typesystem", base_typesystem_api))
+HEADERS = ((b"content-type", b"application/json"),)
+
+
+class Scenario(typing.NamedTuple):
+    label: str
+    method: str
+    path: str
+    query_string: bytes = b""
+    body: Optional[Any] = None
+    status_code: int = 200
+    number: int = 1000
+
+
+SCENARIOS = (
+    Scenario("GET item", "GET", "/authors/7"),
+    Scenario("GET collection 10 rows", "GET", "/authors", b"limit=10"),
+    Scenario("GET collection 1k rows", "GET", "/authors", b"limit=1000", number=100),
+    Scenario(
+        "GET stream 50k rows",
+        "GET",
+        "/authors/stream",
+        f"limit={ROWS}".encode(),
+        number=5,
+    ),
+    Scenario("POST", "POST", "/authors", body={"name": "Author"}),
+    Scenario("POST invalid", "POST", "/authors", body={"foo": "bar"}, status_code=422),
+    Scenario("GET item invalid", "GET", "/authors/seven", status_code=422),
+)
+
+
+async def fill_authors() -> None:
+    await drop_tables()
+    await create_tables()
+    await database.execute_many(
+        "INSERT INTO authors(id, name) VALUES (:id, :name)",
+        [{"id": index, "name": f"Author {index}"} for index in range(1, ROWS + 1)],
+    )
+
+
+async def run_scenario(
+    app: Any, backend: str, scenario: Scenario, factor: float, concurrency: int
+) -> Result:
+    body = b"" if scenario.body is None else json.dumps(scenario.body).encode()
+
+    async def request() -> None:
+        status_code, _ = await call_asgi(
+            app, scenario.method, scenario.path, scenario.query_string, body, HEADERS
+        )
+        assert status_code == scenario.status_code, (scenario.label, status_code)
+
+    return await measure_async(
+        f"{backend} {scenario.label}",
+        request,
+        scale(scenario.number, factor),
+        concurrency,
+    )
+
+
+async def run(pattern: str, factor: float, concurrency: int) -> List[Result]:
+    await database.connect()
+    try:
+        await fill_authors()
+        results = []
+        for backend, app in BACKENDS:
+            for scenario in SCENARIOS:
+                if pattern in f"{backend} {scenario.label}":
+                    results.append(
+                        await run_scenario(app, backend, scenario, factor, concurrency)
+                    )
+        return results
+    finally:
+        await drop_tables()
+        await database.disconnect()
+
+
+def main() -> None:
+    parser = get_parser(__doc__)
+    parser.add_argument(
+        "--concurrency", type=int, default=1, help="Requests in flight at a time"
+    )
+    args = parser.parse_args()
+    results = asyncio.get_event_loop().run_until_complete(
+        run(args.pattern, args.factor, args.concurrency)
+    )
+    finish("endpoints", args, results)
+
+
+if __name__ == "__main__":
+    main()
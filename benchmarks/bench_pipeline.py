@@ -0,0 +1,163 @@
+"""
+Isolated steps of the endpoint pipeline: the request schema load,
+the response schema dump, the request data shaping, the JSON encoding
+and the OpenAPI document generation.
+
+Usage: python -m benchmarks.bench_pipeline [-k LABEL] [--factor 0.1]
+       [--save NAME] [--compare NAME]
+"""
+import asyncio
+import datetime
+import functools
+import json
+import uuid
+
+from typing import Any, Dict, List
+
+from starlette.requests import Request
+
+from starlette_cbge.json_codecs import (
+    OrjsonCodec,
+    StdlibJSONCodec,
+    UjsonCodec,
+    orjson,
+    ujson,
+)
+from starlette_cbge.schema_generator_backends import OpenAPIv3SchemaGenerator
+from starlette_cbge.testing import make_scope
+
+from example_app.app import app
+from example_app.base_api import base_pydantic, base_typesystem
+
+from benchmarks.common import (
+    Result,
+    finish,
+    get_parser,
+    measure,
+    measure_async,
+    scale,
+)
+
+
+ROWS = [{"id": index, "name": f"Author {index}"} for index in range(1000)]
+# DB records, the datetime and UUID values are not native JSON ones
+RECORDS = [
+    {
+        "id": uuid.UUID(int=index),
+        "name": f"Author {index}",
+        "created": datetime.datetime(2019, 9, 1, 12, 30) + datetime.timedelta(index),
+    }
+    for index in range(1000)
+]
+BODY = json.dumps({"name": "Author"}).encode()
+HEADERS = (
+    (b"content-type", b"application/json"),
+    (b"content-length", str(len(BODY)).encode()),
+)
+BACKENDS = (("pydantic", base_pydantic), ("typesystem", base_typesystem))
+
+
+async def receive() -> Dict[str, Any]:
+    return {"type": "http.request", "body": BODY, "more_body": False}
+
+
+async def send(message: Dict[str, Any]) -> None:
+    pass
+
+
+async def run_shape_request_data(
+    backend: str, module: Any, factor: float
+) -> List[Result]:
+    results = []
+    for method, query_string in (("GET", b"limit=10&offset=20"), ("POST", b"")):
+        scope = make_scope(method, "/authors", query_string, HEADERS)
+
+        async def shape() -> None:
+            endpoint = module.Authors(scope, receive, send)
+            await endpoint.shape_request_data(Request(scope, receive=receive))
+
+        results.append(
+            await measure_async(
+                f"{backend} shape_request_data {method}", shape, scale(10000, factor)
+            )
+        )
+    return results
+
+
+def run_schemas(backend: str, module: Any, factor: float) -> List[Result]:
+    request_schema = module.AuthorPostRequestSchema
+    response_schema = module.AuthorResponseSchema
+    list_schema = module.AuthorResponseListSchema
+    number = scale(10000, factor)
+    return [
+        measure(
+            f"{backend} perform_load item",
+            lambda: request_schema.perform_load({"name": "Author"}),
+            number,
+        ),
+        measure(
+            f"{backend} perform_dump item",
+            lambda: response_schema.perform_dump(ROWS[0]),
+            number,
+        ),
+        measure(
+            f"{backend} perform_dump {len(ROWS)} rows",
+            lambda: list_schema.perform_dump(ROWS),
+            scale(100, factor),
+        ),
+    ]
+
+
+def run_codecs(factor: float) -> List[Result]:
+    codecs: List[Any] = [StdlibJSONCodec()]
+    if ujson is not None:
+        codecs.append(UjsonCodec())
+    if orjson is not None:
+        codecs.append(OrjsonCodec())
+    return [
+        measure(
+            f"{codec.name} dumps {len(RECORDS)} records",
+            functools.partial(codec.dumps, RECORDS),
+            scale(100, factor),
+        )
+        for codec in codecs
+    ]
+
+
+def run_openapi(factor: float) -> List[Result]:
+    info = {"openapi": "3.0.0", "info": {"title": "Example API", "version": "1.0"}}
+    warm_schemas = OpenAPIv3SchemaGenerator(info)
+    return [
+        measure(
+            "openapi get_schema cold",
+            lambda: OpenAPIv3SchemaGenerator(info).get_schema(app.routes),
+            scale(100, factor),
+        ),
+        measure(
+            "openapi get_schema warm",
+            lambda: warm_schemas.get_schema(app.routes),
+            scale(100, factor),
+        ),
+    ]
+
+
+async def run(pattern: str, factor: float) -> List[Result]:
+    results = []
+    for backend, module in BACKENDS:
+        results.extend(run_schemas(backend, module, factor))
+        results.extend(await run_shape_request_data(backend, module, factor))
+    results.extend(run_codecs(factor))
+    results.extend(run_openapi(factor))
+    return [result for result in results if pattern in result.label]
+
+
+def main() -> None:
+    args = get_parser(__doc__).parse_args()
+    results = asyncio.get_event_loop().run_until_complete(
+        run(args.pattern, args.factor)
+    )
+    finish("pipeline", args, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Compiled vs generic validation of the schema backends.
+
+Usage: python -m benchmarks.bench_schema_backends
+"""
+import timeit
+import typing
+
+from starlette_cbge.schema_backends import (
+    PydanticSchema,
+    PydanticListSchema,
+    TypesystemSchema,
+    TypesystemListSchema,
+    typesystem_fields,
+)
+
+
+ROWS = [
+    {"id": index, "name": f"Author {index}", "active": True} for index in range(1000)
+]
+COLUMNS = ["id", "name", "active"]
+TUPLES = [tuple(row.values()) for row in ROWS]
+
+
+class PydanticAuthorSchema(PydanticSchema):
+    id: int
+    name: str
+    active: bool = True
+
+
+class PydanticAuthorListSchema(PydanticListSchema):
+    id: int
+    name: str
+    active: bool = True
+
+
+class TypesystemAuthorSchema(TypesystemSchema):
+    id = typesystem_fields.Integer()
+    name = typesystem_fields.String()
+    active = typesystem_fields.Boolean(default=True)
+
+
+class TypesystemAuthorListSchema(TypesystemListSchema):
+    id = typesystem_fields.Integer()
+    name = typesystem_fields.String()
+    active = typesystem_fields.Boolean(default=True)
+
+
+def run(label: str, func: typing.Callable, number: int) -> float:
+    seconds = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print(f"{label:<48} {seconds * 1e6:>10.2f} us")
+    return seconds
+
+
+def main() -> None:
+    for schema, list_schema in (
+        (PydanticAuthorSchema, PydanticAuthorListSchema),
+        (TypesystemAuthorSchema, TypesystemAuthorListSchema),
+    ):
+        row = ROWS[0]
+        generic = run(
+            f"{schema.__name__} generic", lambda: schema.generic_validate(row), 10000
+        )
+        compiled = run(
+            f"{schema.__name__} compiled", lambda: schema.perform_load(row), 10000
+        )
+        print(f"{'speed up':<48} {generic / compiled:>10.1f} x")
+
+        generic = run(
+            f"{list_schema.__name__} generic x{len(ROWS)}",
+            lambda: [list_schema.generic_validate(item) for item in ROWS],
+            20,
+        )
+        validator = list_schema.compile()
+        assert validator is not None
+        compiled = run(
+            f"{list_schema.__name__} compiled x{len(ROWS)}",
+            lambda: [validator(item) for item in ROWS],
+            20,
+        )
+        print(f"{'speed up':<48} {generic / compiled:>10.1f} x")
+        batch = run(
+            f"{list_schema.__name__} batch x{len(ROWS)}",
+            lambda: list_schema.perform_batch_validation(ROWS),
+            20,
+        )
+        print(f"{'speed up':<48} {generic / batch:>10.1f} x")
+        batch = run(
+            f"{list_schema.__name__} batch tuples x{len(ROWS)}",
+            lambda: list_schema.perform_batch_validation(TUPLES, columns=COLUMNS),
+            20,
+        )
+        print(f"{'speed up':<48} {generic / batch:>10.1f} x")
+
+
+if __name__ == "__main__":
+    main()
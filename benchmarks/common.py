@@ -0,0 +1,194 @@
+"""
+Measurement, reporting and baselines shared by the benchmarks.
+
+Every operation is timed call by call, so the results have the latency
+percentiles along with the throughput. The allocations are measured
+in a separate pass under `tracemalloc` (it slows the calls down a lot),
+as the mean peak of the memory traced during a call.
+
+Baselines are the JSON results saved with `--save NAME` to `benchmarks/baselines/`,
+`--compare NAME` prints the change against one.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+import tracemalloc
+import typing
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+BASELINES_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+ALLOCATION_CALLS = 20
+
+
+class Result(typing.NamedTuple):
+    label: str
+    calls: int
+    per_second: float
+    p50_ms: float
+    p99_ms: float
+    alloc_kib: float
+
+
+def percentile(latencies: Sequence[float], fraction: float) -> float:
+    index = min(int(len(latencies) * fraction), len(latencies) - 1)
+    return latencies[index]
+
+
+def make_result(
+    label: str, latencies: List[float], elapsed: float, alloc_kib: float
+) -> Result:
+    latencies = sorted(latencies)
+    return Result(
+        label,
+        len(latencies),
+        len(latencies) / elapsed,
+        percentile(latencies, 0.5) * 1000,
+        percentile(latencies, 0.99) * 1000,
+        alloc_kib,
+    )
+
+
+def measure(label: str, func: Callable[[], Any], number: int) -> Result:
+    """
+    Times the sync calls of `func`.
+    """
+    func()  # Warm up, eg. the compiled validators
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(number):
+        call_started = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+
+    peaks = []
+    tracemalloc.start()
+    for _ in range(min(number, ALLOCATION_CALLS)):
+        tracemalloc.clear_traces()
+        func()
+        peaks.append(tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    return make_result(label, latencies, elapsed, sum(peaks) / len(peaks) / 1024)
+
+
+async def measure_async(
+    label: str, func: Callable[[], Awaitable[Any]], number: int, concurrency: int = 1,
+) -> Result:
+    """
+    Times the awaited calls of `func`, `concurrency` of them at a time.
+    """
+    await func()
+    latencies: List[float] = []
+
+    async def worker(calls: int) -> None:
+        for _ in range(calls):
+            call_started = time.perf_counter()
+            await func()
+            latencies.append(time.perf_counter() - call_started)
+
+    calls = [
+        number // concurrency + (index < number % concurrency)
+        for index in range(concurrency)
+    ]
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(count) for count in calls if count))
+    elapsed = time.perf_counter() - started
+
+    peaks = []
+    tracemalloc.start()
+    for _ in range(min(number, ALLOCATION_CALLS)):
+        tracemalloc.clear_traces()
+        await func()
+        peaks.append(tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    return make_result(label, latencies, elapsed, sum(peaks) / len(peaks) / 1024)
+
+
+def get_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "-k", dest="pattern", default="", help="Runs the benchmarks with the label part"
+    )
+    parser.add_argument(
+        "--factor",
+        type=float,
+        default=1.0,
+        help="Multiplier of the number of calls, eg. 0.1 for a quick run",
+    )
+    parser.add_argument(
+        "--save", metavar="NAME", help="Saves the results as a baseline"
+    )
+    parser.add_argument(
+        "--compare", metavar="NAME", help="Compares the results with a baseline"
+    )
+    return parser
+
+
+def get_baseline_path(suite: str, name: str) -> str:
+    return os.path.join(BASELINES_DIR, f"{suite}-{name}.json")
+
+
+def load_baseline(suite: str, name: str) -> Dict[str, Dict[str, float]]:
+    with open(get_baseline_path(suite, name)) as baseline_file:
+        return json.load(baseline_file)
+
+
+def save_baseline(suite: str, name: str, results: Sequence[Result]) -> str:
+    os.makedirs(BASELINES_DIR, exist_ok=True)
+    path = get_baseline_path(suite, name)
+    with open(path, "w") as baseline_file:
+        json.dump(
+            {result.label: result._asdict() for result in results},
+            baseline_file,
+            indent=2,
+            sort_keys=True,
+        )
+    return path
+
+
+def format_change(value: float, baseline: Optional[float]) -> str:
+    if not baseline:
+        return ""
+    return f" ({(value - baseline) / baseline * 100:+.0f}%)"
+
+
+def report(
+    results: Sequence[Result], baseline: Optional[Dict[str, Dict[str, float]]] = None,
+) -> None:
+    print(
+        f"{'benchmark':<52} {'calls':>7} {'per s':>16} {'p50 ms':>16} "
+        f"{'p99 ms':>16} {'alloc KiB':>16}"
+    )
+    for result in results:
+        previous = (baseline or {}).get(result.label, {})
+        columns: List[Tuple[float, str, str]] = [
+            (result.per_second, "per_second", "{:.0f}"),
+            (result.p50_ms, "p50_ms", "{:.3f}"),
+            (result.p99_ms, "p99_ms", "{:.3f}"),
+            (result.alloc_kib, "alloc_kib", "{:.1f}"),
+        ]
+        cells = [
+            (template.format(value) + format_change(value, previous.get(key))).rjust(16)
+            for value, key, template in columns
+        ]
+        print(f"{result.label:<52} {result.calls:>7} {' '.join(cells)}")
+
+
+def finish(suite: str, args: argparse.Namespace, results: Sequence[Result]) -> None:
+    """
+    Reports the results, compared with the baseline if requested, and saves them.
+    """
+    baseline = load_baseline(suite, args.compare) if args.compare else None
+    report(results, baseline)
+    if args.save:
+        print(f"Saved to {save_baseline(suite, args.save, results)}")
+
+
+def scale(number: int, factor: float) -> int:
+    return max(int(number * factor), 1)
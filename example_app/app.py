@@ -1,15 +1,24 @@
 from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
 from starlette.routing import Route, Router
 from starlette.schemas import SchemaGenerator
 
+from starlette_cbge.schema_generator_backends import OpenAPIv3SchemaGenerator
+
 from example_app.db import database
 from example_app.base_api import base_pydantic
 from example_app.base_api import base_typesystem
+from example_app.base_api.base_common import profiler, timing_sink
 
 
 base_pydantic_api = Router(
     [
-        Route("/authors", endpoint=base_pydantic.Authors, methods=["GET", "POST"]),
+        Route(
+            "/authors", endpoint=base_pydantic.Authors, methods=["GET", "POST", "PATCH"]
+        ),
+        Route("/authors/pages", endpoint=base_pydantic.AuthorsPages, methods=["GET"]),
+        Route("/authors/stream", endpoint=base_pydantic.AuthorsStream, methods=["GET"]),
         Route(
             "/authors/{id}",
             endpoint=base_pydantic.Author,
@@ -20,7 +29,15 @@ base_pydantic_api = Router(
 
 base_typesystem_api = Router(
     [
-        Route("/authors", endpoint=base_typesystem.Authors, methods=["GET", "POST"]),
+        Route(
+            "/authors",
+            endpoint=base_typesystem.Authors,
+            methods=["GET", "POST", "PATCH"],
+        ),
+        Route("/authors/pages", endpoint=base_typesystem.AuthorsPages, methods=["GET"]),
+        Route(
+            "/authors/stream", endpoint=base_typesystem.AuthorsStream, methods=["GET"]
+        ),
         Route(
             "/authors/{id}",
             endpoint=base_typesystem.Author,
@@ -37,18 +54,45 @@ base_pydantic_schemas = SchemaGenerator(
     }
 )
 
+schemas = OpenAPIv3SchemaGenerator(
+    {"openapi": "3.0.0", "info": {"title": "Example API", "version": "0.1.0"}}
+)
+
 app = Starlette()
 
 app.mount("/base_pydantic_api", app=base_pydantic_api)
 app.mount("/base_typesystem_api", app=base_typesystem_api)
 
 
+@app.route("/schema", include_in_schema=False)
+async def openapi_schema(request: Request) -> Response:
+    """
+    The cached OpenAPI document.
+    """
+    return schemas.OpenAPIResponse(request)
+
+
+@app.route("/metrics", include_in_schema=False)
+async def metrics(request: Request) -> Response:
+    """
+    Phase timings of the item endpoints in the Prometheus text format.
+    """
+    return PlainTextResponse(
+        timing_sink.exposition(), media_type="text/plain; version=0.0.4"
+    )
+
+
+# Debug only, the profiles disclose the internals
+app.add_route("/debug/profiles", profiler.endpoint, include_in_schema=False)
+
+
 @app.on_event("startup")
 async def startup() -> None:
     """
     Sets environment vars and creates db connections on the server start up.
     """
     await database.connect()
+    schemas.warm_up(app.routes)
 
 
 @app.on_event("shutdown")
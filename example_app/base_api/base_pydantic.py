@@ -1,11 +1,25 @@
 """
 Example endpoints with the pydantic backend
 """
-
-from starlette_cbge.endpoints import PydanticBaseEndpoint
+from typing import ClassVar
+
+from starlette_cbge.endpoints import (
+    PydanticBaseEndpoint,
+    ListEndpoint,
+    ModelCollectionEndpoint,
+    ModelItemEndpoint,
+)
 from starlette_cbge.schema_backends import PydanticSchema, PydanticListSchema
+from starlette_cbge.model_backends import DatabasesModel
+from starlette_cbge.filtering import Filtering
+from starlette_cbge.pagination import CursorPagination, OffsetPagination
 
-from example_app.base_api.base_common import AuthorsEndpoint, AuthorEndpoint
+from example_app.base_api.base_common import (
+    AuthorsStreamEndpoint,
+    profiler,
+    timing_sink,
+)
+from example_app.db import database
 
 
 class AuthorGetCoolectionRequestSchema(PydanticSchema):
@@ -26,40 +40,110 @@ class AuthorPutReuqestSchema(PydanticSchema):
     name: str
 
 
+class AuthorPostRequestListSchema(PydanticListSchema):
+    name: str
+
+
+class AuthorPatchRequestListSchema(PydanticListSchema):
+    id: int
+    name: str
+
+
 class AuthorResponseSchema(PydanticSchema):
     id: int
     name: str
 
 
 class AuthorResponseListSchema(PydanticListSchema):
+    # Rows come straight from the typed DB columns
+    trusted_dump: ClassVar[bool] = True
+
     id: int
     name: str
 
 
+class BlankRequestSchema(PydanticSchema):
+    pass
+
+
 class BlankResponseSchema(PydanticSchema):
     pass
 
 
-class Authors(PydanticBaseEndpoint, AuthorsEndpoint):
+class AuthorsModel(DatabasesModel):
+    database = database
+    table = "authors"
+    schema = AuthorResponseSchema
+
+
+class Authors(PydanticBaseEndpoint, ListEndpoint, ModelCollectionEndpoint):
     """
     Collection endpoint.
     """
 
+    model = AuthorsModel()
+    pagination = OffsetPagination()
+    # `?fields=name` selects and dumps only the names
+    sparse_fieldsets = (("GET", "fields"),)
+    profiler = profiler
+    # Bulk payloads and pages of over 5k items are validated in the thread pool
+    offload_threshold = 5000
+    # `?name__prefix=Auth&sort=-name` is filtered and sorted by the DB
+    filtering = Filtering(
+        {"id": ("eq", "in", "range"), "name": ("eq", "prefix")},
+        sort_fields=("id", "name"),
+        field_types={"id": int},
+        indexes=(("id",), ("name",)),
+    )
+
     request_schemas = (
-        ("GET", AuthorGetCoolectionRequestSchema),
+        ("GET", BlankRequestSchema),
         ("POST", AuthorPostRequestSchema),
     )
     response_schemas = (
         ("GET", AuthorResponseListSchema),
         ("POST", AuthorResponseSchema),
     )
+    bulk_request_schemas = (
+        ("POST", AuthorPostRequestListSchema),
+        ("PATCH", AuthorPatchRequestListSchema),
+    )
+    bulk_response_schemas = (
+        ("POST", AuthorResponseListSchema),
+        ("PATCH", AuthorResponseListSchema),
+    )
 
 
-class Author(PydanticBaseEndpoint, AuthorEndpoint):
+class AuthorsPages(PydanticBaseEndpoint, ListEndpoint, ModelCollectionEndpoint):
+    """
+    Collection endpoint paginated by name with cursors.
+    """
+
+    model = AuthorsModel()
+    pagination = CursorPagination(sort_keys=("name", "id"))
+    pagination_envelope = True
+
+    request_schemas = (("GET", BlankRequestSchema),)
+    response_schemas = (("GET", AuthorResponseListSchema),)
+
+
+class AuthorsStream(PydanticBaseEndpoint, AuthorsStreamEndpoint):
+    """
+    Collection endpoint streaming new line delimited JSON.
+    """
+
+    request_schemas = (("GET", AuthorGetCoolectionRequestSchema),)
+    response_schemas = (("GET", AuthorResponseListSchema),)
+    streaming_responses = (("GET", "ndjson"),)
+
+
+class Author(PydanticBaseEndpoint, ModelItemEndpoint):
     """
     Item endpoint.
     """
 
+    model = AuthorsModel()
+
     request_schemas = (
         ("GET", AuthorIDRequestSchema),
         ("PUT", AuthorPutReuqestSchema),
@@ -70,3 +154,8 @@ class Author(PydanticBaseEndpoint, AuthorEndpoint):
         ("PUT", AuthorResponseSchema),
         ("DELETE", BlankResponseSchema),
     )
+    # Clients re-polling the item get `304 Not Modified` for the unchanged one
+    etag_fields = (("GET", None), ("PUT", None), ("DELETE", None))
+    # Bursts of the identical polls share a single DB query
+    coalesced_methods = (("GET", 5),)
+    timing_sinks = (timing_sink,)
@@ -2,14 +2,27 @@
 Example endpoints with the typesystem backend
 """
 
-from starlette_cbge.endpoints import TypesystemBaseEndpoint
+from starlette_cbge.endpoints import (
+    TypesystemBaseEndpoint,
+    ListEndpoint,
+    ModelCollectionEndpoint,
+    ModelItemEndpoint,
+)
 from starlette_cbge.schema_backends import (
     TypesystemSchema,
     TypesystemListSchema,
     typesystem_fields,
 )
-
-from example_app.base_api.base_common import AuthorsEndpoint, AuthorEndpoint
+from starlette_cbge.model_backends import DatabasesModel
+from starlette_cbge.filtering import Filtering
+from starlette_cbge.pagination import CursorPagination, OffsetPagination
+
+from example_app.base_api.base_common import (
+    AuthorsStreamEndpoint,
+    profiler,
+    timing_sink,
+)
+from example_app.db import database
 
 
 class AuthorGetCoolectionRequestSchema(TypesystemSchema):
@@ -30,40 +43,110 @@ class AuthorPutReuqestSchema(TypesystemSchema):
     name = typesystem_fields.String()
 
 
+class AuthorPostRequestListSchema(TypesystemListSchema):
+    name = typesystem_fields.String()
+
+
+class AuthorPatchRequestListSchema(TypesystemListSchema):
+    id = typesystem_fields.Integer()
+    name = typesystem_fields.String()
+
+
 class AuthorResponseSchema(TypesystemSchema):
     id = typesystem_fields.Integer()
     name = typesystem_fields.String()
 
 
 class AuthorResponseListSchema(TypesystemListSchema):
+    # Rows come straight from the typed DB columns
+    trusted_dump = True
+
     id = typesystem_fields.Integer()
     name = typesystem_fields.String()
 
 
+class BlankRequestSchema(TypesystemSchema):
+    pass
+
+
 class BlankResponseSchema(TypesystemSchema):
     pass
 
 
-class Authors(TypesystemBaseEndpoint, AuthorsEndpoint):
+class AuthorsModel(DatabasesModel):
+    database = database
+    table = "authors"
+    schema = AuthorResponseSchema
+
+
+class Authors(TypesystemBaseEndpoint, ListEndpoint, ModelCollectionEndpoint):
     """
     Collection endpoint.
     """
 
+    model = AuthorsModel()
+    pagination = OffsetPagination()
+    # `?fields=name` selects and dumps only the names
+    sparse_fieldsets = (("GET", "fields"),)
+    profiler = profiler
+    # Bulk payloads and pages of over 5k items are validated in the thread pool
+    offload_threshold = 5000
+    # `?name__prefix=Auth&sort=-name` is filtered and sorted by the DB
+    filtering = Filtering(
+        {"id": ("eq", "in", "range"), "name": ("eq", "prefix")},
+        sort_fields=("id", "name"),
+        field_types={"id": int},
+        indexes=(("id",), ("name",)),
+    )
+
     request_schemas = (
-        ("GET", AuthorGetCoolectionRequestSchema),
+        ("GET", BlankRequestSchema),
         ("POST", AuthorPostRequestSchema),
     )
     response_schemas = (
         ("GET", AuthorResponseListSchema),
         ("POST", AuthorResponseSchema),
     )
+    bulk_request_schemas = (
+        ("POST", AuthorPostRequestListSchema),
+        ("PATCH", AuthorPatchRequestListSchema),
+    )
+    bulk_response_schemas = (
+        ("POST", AuthorResponseListSchema),
+        ("PATCH", AuthorResponseListSchema),
+    )
+
+
+class AuthorsPages(TypesystemBaseEndpoint, ListEndpoint, ModelCollectionEndpoint):
+    """
+    Collection endpoint paginated by name with cursors.
+    """
 
+    model = AuthorsModel()
+    pagination = CursorPagination(sort_keys=("name", "id"))
+    pagination_envelope = True
 
-class Author(TypesystemBaseEndpoint, AuthorEndpoint):
+    request_schemas = (("GET", BlankRequestSchema),)
+    response_schemas = (("GET", AuthorResponseListSchema),)
+
+
+class AuthorsStream(TypesystemBaseEndpoint, AuthorsStreamEndpoint):
+    """
+    Collection endpoint streaming new line delimited JSON.
+    """
+
+    request_schemas = (("GET", AuthorGetCoolectionRequestSchema),)
+    response_schemas = (("GET", AuthorResponseListSchema),)
+    streaming_responses = (("GET", "ndjson"),)
+
+
+class Author(TypesystemBaseEndpoint, ModelItemEndpoint):
     """
     Item endpoint.
     """
 
+    model = AuthorsModel()
+
     request_schemas = (
         ("GET", AuthorIDRequestSchema),
         ("PUT", AuthorPutReuqestSchema),
@@ -74,3 +157,8 @@ class Author(TypesystemBaseEndpoint, AuthorEndpoint):
         ("PUT", AuthorResponseSchema),
         ("DELETE", BlankResponseSchema),
     )
+    # Clients re-polling the item get `304 Not Modified` for the unchanged one
+    etag_fields = (("GET", None), ("PUT", None), ("DELETE", None))
+    # Bursts of the identical polls share a single DB query
+    coalesced_methods = (("GET", 5),)
+    timing_sinks = (timing_sink,)
@@ -13,6 +13,8 @@ async def create_tables() -> None:
         );
     """
     await database.execute(query=query)
+    query = "CREATE INDEX IF NOT EXISTS authors_name ON authors(name);"
+    await database.execute(query=query)
 
     # Create Posts
     query = """
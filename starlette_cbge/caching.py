@@ -0,0 +1,125 @@
+"""
+Caching of the encoded responses of the idempotent endpoints.
+
+Keys are derived from the deserialized request payload rather than the raw URL,
+so `?limit=100` and the schema default of `limit=100` share the entry,
+while the order of the query params doesn't matter.
+The cached value is the final encoded body with the headers,
+a hit skips the handler, the response schema dump and the encoding.
+
+Every key includes the version of its namespace (by default the endpoint class),
+a successful POST, PUT, PATCH or DELETE bumps the version,
+so the entries cached before are never read again.
+A response computed while the version was bumped is stored under the old key,
+so it doesn't resurrect the stale data either.
+"""
+import collections
+import hashlib
+import json
+import time
+import typing
+
+from typing import Any, Dict, Optional, Tuple
+
+from starlette.responses import Response
+
+from starlette_cbge.interfaces import CacheBackendInterface
+
+
+class CachedResponse(typing.NamedTuple):
+    content: bytes
+    status_code: int
+    raw_headers: Tuple[Tuple[bytes, bytes], ...]
+
+    @classmethod
+    def from_response(cls, response: Response) -> "CachedResponse":
+        return cls(response.body, response.status_code, tuple(response.raw_headers))
+
+    @property
+    def size(self) -> int:
+        return len(self.content) + sum(
+            len(name) + len(value) for name, value in self.raw_headers
+        )
+
+    def to_response(self) -> Response:
+        response = Response(self.content, status_code=self.status_code)
+        response.raw_headers = list(self.raw_headers)
+        return response
+
+
+def make_cache_key(namespace: str, version: int, key_data: Any) -> str:
+    """
+    Stable digest of the key data, dict keys are sorted
+    and values unknown to JSON are taken as strings.
+    """
+    data = json.dumps(key_data, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+    return f"{namespace}:{version}:{digest}"
+
+
+class LRUCache(CacheBackendInterface):
+    """
+    In-process cache, evicts the least recently used entries
+    when there are more than `max_entries` of them or their total size
+    (of the `CachedResponse` values) exceeds `max_size` bytes.
+    Expired entries are dropped when they are looked up.
+
+    Every worker process has its own copy, so an invalidation made by one worker
+    is not seen by the others, use a shared backend if it matters.
+    """
+
+    def __init__(
+        self, max_entries: int = 1024, max_size: int = 64 * 1024 * 1024
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.size = 0
+        # key -> (expires at, size, value)
+        self.entries: typing.OrderedDict[
+            str, Tuple[float, int, Any]
+        ] = collections.OrderedDict()
+        self.versions: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, _, value = entry
+        if expires_at <= time.monotonic():
+            self.discard(key)
+            return None
+
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        size = getattr(value, "size", 0)
+        if size > self.max_size:
+            return
+
+        self.discard(key)
+        self.entries[key] = (time.monotonic() + ttl, size, value)
+        self.size += size
+
+        while len(self.entries) > self.max_entries or self.size > self.max_size:
+            _, (_, evicted_size, _) = self.entries.popitem(last=False)
+            self.size -= evicted_size
+
+    async def get_version(self, namespace: str) -> int:
+        return self.versions.get(namespace, 0)
+
+    async def invalidate(self, namespace: str) -> None:
+        self.versions[namespace] = self.versions.get(namespace, 0) + 1
+
+    def discard(self, key: str) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.size = 0
@@ -0,0 +1,84 @@
+"""
+Helpers of the conditional requests (RFC 7232), see `BaseEndpoint.etag_fields`.
+
+ETags are weak: they are computed from the serialized body,
+which may differ byte by byte between the codecs, or from a version field,
+which changes with the data but not with the representation.
+"""
+import datetime
+import email.utils
+import hashlib
+
+from typing import Any, Optional
+
+
+def make_etag(content: bytes) -> str:
+    return f'W/"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+
+
+def make_version_etag(version: Any) -> str:
+    return 'W/"' + str(version).replace('"', "") + '"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of the `If-None-Match` or `If-Match` header value.
+
+    NOTE: RFC 7232 requires the strong comparison for `If-Match`,
+    which never succeeds for the weak ETags, so the weak one is used for both.
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque_tag = etag[2:] if etag.startswith("W/") else etag
+    for tag in header.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == opaque_tag:
+            return True
+    return False
+
+
+def get_field(data: Any, name: str) -> Any:
+    """
+    Field of a mapping, a DB row or an object, `None` if it's missing.
+    """
+    try:
+        return data[name]
+    except (TypeError, KeyError, IndexError):
+        return getattr(data, name, None)
+
+
+def to_datetime(value: Any) -> Optional[datetime.datetime]:
+    """
+    Aware datetime out of a datetime or an ISO 8601 string, naive ones are taken as UTC.
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if not isinstance(value, datetime.datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    # HTTP dates have the second precision
+    return value.replace(microsecond=0)
+
+
+def format_http_date(value: datetime.datetime) -> str:
+    return email.utils.format_datetime(
+        value.astimezone(datetime.timezone.utc), usegmt=True
+    )
+
+
+def parse_http_date(value: Optional[str]) -> Optional[datetime.datetime]:
+    if not value:
+        return None
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed
@@ -0,0 +1,131 @@
+"""
+Request scoped batching of the look ups, see `BaseEndpoint.dataloaders`.
+
+Keys requested within one event loop iteration are collected and loaded
+with a single call of the batch function (eg. one `IN (...)` query),
+the results are memoized for the rest of the request.
+
+Only concurrent loads are batched, so the items are enriched with `gather`:
+
+    async def acquire_response_context(self, request_data, raw_response):
+        posts = self.get_loader("posts")
+        authors_posts = await asyncio.gather(
+            *(posts.load(author["id"]) for author in raw_response)
+        )
+        return [
+            {**author, "posts": author_posts}
+            for author, author_posts in zip(raw_response, authors_posts)
+        ]
+"""
+import asyncio
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Sequence, Tuple
+
+BatchLoadFunction = Callable[[List[Any]], Awaitable[Sequence[Any]]]
+
+
+class DataLoader:
+    """
+    Calls `batch_load` with the list of the unique keys, it must return
+    the values in the same order, eg. `None` for the missing ones.
+    Batches are split by `max_batch_size` keys (the SQLite parameters limit by default).
+    """
+
+    def __init__(
+        self, batch_load: BatchLoadFunction, max_batch_size: int = 999
+    ) -> None:
+        self.batch_load = batch_load
+        self.max_batch_size = max_batch_size
+        self.cache: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self.queue: List[Tuple[Hashable, "asyncio.Future[Any]"]] = []
+
+    def load(self, key: Hashable) -> "asyncio.Future[Any]":
+        """
+        Future of the value of the key, the memoized one if it was loaded already.
+        """
+        future = self.cache.get(key)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_event_loop()
+        future = self.cache[key] = loop.create_future()
+        self.queue.append((key, future))
+        if len(self.queue) == 1:
+            # Dispatched after the rest of the callbacks of this iteration
+            loop.call_soon(self.dispatch)
+        return future
+
+    async def load_many(self, keys: Sequence[Hashable]) -> List[Any]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: Hashable, value: Any) -> None:
+        """
+        Memoizes the value known already, eg. out of another query.
+        """
+        if key not in self.cache:
+            future = asyncio.get_event_loop().create_future()
+            future.set_result(value)
+            self.cache[key] = future
+
+    def clear(self, key: Hashable) -> None:
+        self.cache.pop(key, None)
+
+    def dispatch(self) -> None:
+        queue, self.queue = self.queue, []
+        for start in range(0, len(queue), self.max_batch_size):
+            asyncio.ensure_future(
+                self.run_batch(queue[start : start + self.max_batch_size])
+            )
+
+    async def run_batch(
+        self, batch: List[Tuple[Hashable, "asyncio.Future[Any]"]]
+    ) -> None:
+        keys = [key for key, _ in batch]
+        futures = [future for _, future in batch]
+        try:
+            values = await self.batch_load(keys)
+            if len(values) != len(keys):
+                raise ValueError(
+                    f"Batch load returned {len(values)} values for {len(keys)} keys."
+                )
+        except BaseException as exc:
+            for key, future in zip(keys, futures):
+                # Not memoized, so the next load tries again
+                if self.cache.get(key) is future:
+                    del self.cache[key]
+                if future.done():
+                    continue
+                if isinstance(exc, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(exc)
+            if isinstance(exc, Exception):
+                # Delivered to the loads
+                return
+            raise
+
+        for future, value in zip(futures, values):
+            if not future.done():
+                future.set_result(value)
+
+
+def index_by(rows: Sequence[Any], column: str, keys: Sequence[Hashable]) -> List[Any]:
+    """
+    Rows in the order of the keys, `None` for the missing ones.
+    """
+    rows_by_key = {row[column]: row for row in rows}
+    return [rows_by_key.get(key) for key in keys]
+
+
+def group_by(
+    rows: Sequence[Any], column: str, keys: Sequence[Hashable]
+) -> List[List[Any]]:
+    """
+    Lists of the rows per key in the order of the keys, eg. posts per author.
+    """
+    groups: Dict[Hashable, List[Any]] = {key: [] for key in keys}
+    for row in rows:
+        group = groups.get(row[column])
+        if group is not None:
+            group.append(row)
+    return [groups[key] for key in keys]
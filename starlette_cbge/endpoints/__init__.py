@@ -2,3 +2,7 @@ from starlette_cbge.endpoints.base import BaseEndpoint
 from starlette_cbge.endpoints.list_endpoint import ListEndpoint
 from starlette_cbge.endpoints.pydantic_base import PydanticBaseEndpoint
 from starlette_cbge.endpoints.typesystem_base import TypesystemBaseEndpoint
+from starlette_cbge.endpoints.model_endpoints import (
+    ModelCollectionEndpoint,
+    ModelItemEndpoint,
+)
@@ -0,0 +1,1003 @@
+"""
+The core of the endpoints: the action plans, the request payload and
+the response processing. The features (caching, streaming...) extend it
+as the mixins of `starlette_cbge.endpoints.mixins`.
+"""
+import asyncio
+import functools
+import inspect
+import typing
+
+from typing import Dict, Any, List, Union, Optional, Tuple, Iterable
+
+from starlette.background import BackgroundTasks
+from starlette.concurrency import run_in_threadpool
+from starlette.endpoints import HTTPEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Message, Receive, Scope, Send
+
+from starlette_cbge.dataloader import DataLoader
+from starlette_cbge.executors import call_in_process
+from starlette_cbge.exceptions import (
+    BadRequestException,
+    ExecutorSaturated,
+    ExtendedHTTPException,
+    ImproperlyConfigured,
+    InvalidRequestException,
+    NotFoundException,
+    ServiceUnavailableException,
+    UnsupportedMediaTypeException,
+)
+from starlette_cbge.interfaces import (
+    ExecutorInterface,
+    JSONCodecInterface,
+    ListSchemaInterface,
+)
+from starlette_cbge.json_codecs import JSONCodecResponse, get_json_codec
+from starlette_cbge.streaming import collect_items
+from starlette_cbge.timing import NULL_TIMER, NullTimer, PhaseTimer
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None  # type: ignore
+
+
+HTTP_METHODS = ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")
+BODY_METHODS = ("POST", "PUT", "PATCH")
+# Successful requests of these methods invalidate the cached responses
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+READ_METHODS = ("GET", "HEAD")
+
+DEFAULT_EXCEPTION_CLASSES = (
+    ("400", BadRequestException),
+    ("404", NotFoundException),
+    ("415", UnsupportedMediaTypeException),
+    ("422", InvalidRequestException),
+)
+
+FeaturePlan = typing.TypeVar("FeaturePlan")
+
+
+class ActionPlan(typing.NamedTuple):
+    """
+    Everything required to process a request of a particular method,
+    resolved once at the endpoint class creation. The features keep
+    their own plans, see `CoreEndpoint.compile_feature_plans`.
+    """
+
+    method: str
+    handler: Optional[typing.Callable]  # `None` for bulk only methods
+    is_async: bool
+    is_async_generator: bool
+    validator: Optional[typing.Callable]
+    request_schema: Any
+    response_schema: Any
+    exception_classes: Dict[str, Any]
+    response_class: typing.Type[Response]
+    # Plan for the JSON array payloads, see `bulk_request_schemas`
+    bulk_plan: Optional[Any] = None
+    # Loads the context of the request, see `context_resolvers`
+    resolver: Optional[typing.Callable] = None
+    validator_takes_context: bool = False
+    handler_takes_context: bool = False
+    # Query param of the sparse fieldset, see `sparse_fieldsets`
+    fields_param: Optional[str] = None
+    # Pool of the sync handler, see `handler_executors`
+    executor: Optional[ExecutorInterface] = None
+    # The process pool handler returns the response dumped by the response schema
+    # (and encoded by the codec responses), see `starlette_cbge.executors`
+    dumps_in_executor: bool = False
+
+
+def takes_context(func: Optional[typing.Callable]) -> bool:
+    """
+    Validators and handlers get the request context if they have the `context` argument.
+    """
+    return func is not None and "context" in inspect.signature(func).parameters
+
+
+def get_handler_name(method: str) -> str:
+    """
+    HEAD requests are served by the GET handler.
+    """
+    return "get" if method == "HEAD" else method.lower()
+
+
+def get_schema_key(method: str) -> str:
+    """
+    HEAD shares the schemas and the features with GET.
+    """
+    return "GET" if method == "HEAD" else method
+
+
+class CoreEndpoint(HTTPEndpoint):
+    request_schemas: Iterable[Tuple[str, Any]]
+    response_schemas: Iterable[Tuple[str, Any]]
+    # Methods with the context loaded before the validation, names of the endpoint
+    # methods, eg. `(("GET", "read_record"),)`. The resolver gets the request data
+    # and returns the context (eg. the record of the path param) or `None`
+    # to respond with 404. The context is passed to the validator and the handler
+    # as the `context` argument if they have it, a validator can return a new one.
+    context_resolvers: Iterable[Tuple[str, str]]
+
+    # TODO run with `exception_handler`?
+    exception_classes: Iterable[Tuple[str, Any]] = DEFAULT_EXCEPTION_CLASSES
+
+    # Request body decoders per media type, names of the endpoint methods
+    body_decoders: Iterable[Tuple[str, str]] = (
+        ("application/json", "decode_json_body"),
+        ("application/x-www-form-urlencoded", "decode_form_body"),
+        ("multipart/form-data", "decode_form_body"),
+        ("application/msgpack", "decode_msgpack_body"),
+        ("application/x-msgpack", "decode_msgpack_body"),
+        ("application/octet-stream", "decode_raw_body"),
+    )
+    # Assumed if the request comes without the `Content-Type` header
+    default_media_type = "application/json"
+
+    # TODO make it vary per method (?)
+    response_class: typing.Type[Response] = JSONCodecResponse
+    # JSON codec for the request and response bodies, the app-wide one if not set
+    json_codec: Optional[JSONCodecInterface] = None
+    base_exception_class = ExtendedHTTPException
+
+    # List schemas for the bulk operations, a JSON array payload is validated
+    # as a whole and passed to the `{method}_many` handler, eg. `post_many`
+    bulk_request_schemas: Iterable[Tuple[str, Any]] = ()
+    bulk_response_schemas: Iterable[Tuple[str, Any]] = ()
+
+    # Methods with the sparse fieldsets and their query params, eg. `(("GET", "fields"),)`.
+    # `?fields=id,name` is validated against the response schema fields, only those
+    # are dumped and the handler gets them as `self.fields` (eg. to select only them).
+    sparse_fieldsets: Iterable[Tuple[str, str]] = ()
+
+    # Request scoped loaders, names and the batch load methods of the endpoint,
+    # eg. `(("posts", "load_posts"),)`, see `get_loader` and `starlette_cbge.dataloader`
+    dataloaders: Iterable[Tuple[str, str]] = ()
+
+    # Methods with the sync handlers run in the bounded pools instead of the shared
+    # thread pool, eg. `(("GET", ThreadPool("reports", max_workers=4, max_queue=16)),)`.
+    # Requests are shed with 503 if the pool and its queue are full.
+    # The `ProcessPool` handlers must be static methods, see `starlette_cbge.executors`.
+    handler_executors: Iterable[Tuple[str, ExecutorInterface]] = ()
+
+    # Populated by `compile_action_plans` for every subclass
+    _action_plans: Dict[str, ActionPlan] = {}
+    _request_schema_map: Dict[str, Any] = {}
+    _response_schema_map: Dict[str, Any] = {}
+    _exception_class_map: Dict[str, Any] = {}
+    _body_decoder_map: Dict[str, typing.Callable] = {}
+    _response_class: typing.Type[Response] = JSONCodecResponse
+    _dataloader_map: Dict[str, typing.Callable] = {}
+
+    # Context of the request being processed, see `context_resolvers`
+    context: Any = None
+    # Sparse fieldset of the request being processed, see `sparse_fieldsets`
+    fields: Optional[Tuple[str, ...]] = None
+    _perform_action_is_async = True
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)  # type: ignore
+        cls.compile_action_plans()
+
+    @classmethod
+    def compile_action_plans(cls) -> None:
+        """
+        Freezes the per method processing plans, so the request processing
+        requires a single dict look up instead of resolving schemas, handlers
+        and validators on every call. The features extend it to compile
+        their own plans.
+
+        Raises `ImproperlyConfigured` if a schema is declared for a method
+        without a handler.
+        """
+        cls._request_schema_map = dict(getattr(cls, "request_schemas", None) or ())
+        cls._response_schema_map = dict(getattr(cls, "response_schemas", None) or ())
+        # Default exception classes are always available for the internal use
+        cls._exception_class_map = {
+            **dict(DEFAULT_EXCEPTION_CLASSES),
+            **dict(cls.exception_classes or ()),
+        }
+        cls._perform_action_is_async = asyncio.iscoroutinefunction(cls.perform_action)
+
+        for resource_name, resources in (
+            ("request_schemas", cls._request_schema_map),
+            ("response_schemas", cls._response_schema_map),
+        ):
+            for method in resources:
+                if method not in HTTP_METHODS:
+                    raise ImproperlyConfigured(
+                        f"{cls.__name__}.{resource_name} has a schema for unknown method {method}."
+                    )
+                if getattr(cls, get_handler_name(method), None) is None:
+                    raise ImproperlyConfigured(
+                        f"{cls.__name__}.{resource_name} has a schema for {method} method, "
+                        f"but there's no `{get_handler_name(method)}` handler."
+                    )
+
+        cls._response_class = cls.response_class
+        if issubclass(cls.response_class, JSONCodecResponse):
+            cls._response_class = cls.response_class.with_codec(cls.json_codec)
+
+        body_decoder_map: Dict[str, typing.Callable] = {}
+        for media_type, decoder_name in cls.body_decoders:
+            decoder = getattr(cls, decoder_name, None)
+            if decoder is None:
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} has no `{decoder_name}` body decoder for {media_type}."
+                )
+            body_decoder_map[media_type.lower()] = decoder
+        cls._body_decoder_map = body_decoder_map
+
+        bulk_request_schema_map = dict(cls.bulk_request_schemas or ())
+        bulk_response_schema_map = dict(cls.bulk_response_schemas or ())
+        for resource_name, resources in (
+            ("bulk_request_schemas", bulk_request_schema_map),
+            ("bulk_response_schemas", bulk_response_schema_map),
+        ):
+            for method, schema in resources.items():
+                if method not in BODY_METHODS:
+                    raise ImproperlyConfigured(
+                        f"{cls.__name__}.{resource_name} has a schema for {method} method, "
+                        f"bulk operations are supported for {', '.join(BODY_METHODS)} only."
+                    )
+                if getattr(cls, f"{method.lower()}_many", None) is None:
+                    raise ImproperlyConfigured(
+                        f"{cls.__name__}.{resource_name} has a schema for {method} method, "
+                        f"but there's no `{method.lower()}_many` handler."
+                    )
+                if not (
+                    inspect.isclass(schema) and issubclass(schema, ListSchemaInterface)
+                ):
+                    raise ImproperlyConfigured(
+                        f"{cls.__name__}.{resource_name} has a schema for {method} method "
+                        f"that is not a list schema."
+                    )
+
+        fields_params = dict(cls.sparse_fieldsets or ())
+        for method in fields_params:
+            if method != "GET":
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} has a sparse fieldset for {method} method, "
+                    "only GET responses are supported."
+                )
+            if method not in cls._response_schema_map:
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} has a sparse fieldset for {method} method, "
+                    "but there's no response schema to validate it."
+                )
+
+        dataloader_map: Dict[str, typing.Callable] = {}
+        for name, batch_load_name in cls.dataloaders or ():
+            batch_load = getattr(cls, batch_load_name, None)
+            if batch_load is None:
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} has no `{batch_load_name}` batch load method for {name} loader."
+                )
+            dataloader_map[name] = batch_load
+        cls._dataloader_map = dataloader_map
+
+        resolvers: Dict[str, typing.Callable] = {}
+        for method, resolver_name in getattr(cls, "context_resolvers", None) or ():
+            if getattr(cls, get_handler_name(method), None) is None:
+                raise ImproperlyConfigured(
+                    f"{cls.__name__}.context_resolvers has a resolver for {method} method, "
+                    f"but there's no `{get_handler_name(method)}` handler."
+                )
+            resolver = getattr(cls, resolver_name, None)
+            if resolver is None:
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} has no `{resolver_name}` context resolver for {method}."
+                )
+            resolvers[method] = resolver
+
+        executors = dict(cls.handler_executors or ())
+        for method, executor in executors.items():
+            handler_names = [get_handler_name(method)]
+            if method in bulk_request_schema_map:
+                handler_names.append(f"{handler_names[0]}_many")
+            for handler_name in handler_names:
+                cls.check_executor_handler(method, handler_name, executor)
+            if not executor.crosses_processes:
+                continue
+            for method_map, feature in (
+                (fields_params, "has a sparse fieldset"),
+                (resolvers, "has a context resolver"),
+            ):
+                if method in method_map:
+                    raise ImproperlyConfigured(
+                        f"{cls.__name__} {feature} for {method} method, "
+                        "it's not supported by the process pool handlers."
+                    )
+        if executors:
+            cls._exception_class_map.setdefault("503", ServiceUnavailableException)
+
+        action_plans: Dict[str, ActionPlan] = {}
+        for method in HTTP_METHODS:
+            handler_name = get_handler_name(method)
+            handler = getattr(cls, handler_name, None)
+
+            bulk_plan = None
+            if method in bulk_request_schema_map:
+                bulk_handler = getattr(cls, f"{handler_name}_many")
+                bulk_validator = getattr(
+                    cls, f"validate_{handler_name}_many_action", None
+                )
+                bulk_plan = ActionPlan(
+                    method=method,
+                    handler=bulk_handler,
+                    is_async=asyncio.iscoroutinefunction(bulk_handler),
+                    is_async_generator=inspect.isasyncgenfunction(bulk_handler),
+                    validator=bulk_validator,
+                    request_schema=bulk_request_schema_map[method],
+                    response_schema=bulk_response_schema_map.get(method),
+                    exception_classes=cls._exception_class_map,
+                    response_class=cls._response_class,
+                    validator_takes_context=takes_context(bulk_validator),
+                    handler_takes_context=takes_context(bulk_handler),
+                    executor=executors.get(method),
+                    dumps_in_executor=cls.is_dumped_in_executor(
+                        executors.get(method), bulk_response_schema_map.get(method)
+                    ),
+                )
+
+            if handler is None and bulk_plan is None:
+                continue
+
+            schema_key = get_schema_key(method)
+            validator = getattr(cls, f"validate_{handler_name}_action", None)
+            action_plans[method] = ActionPlan(
+                method=method,
+                handler=handler,
+                is_async=asyncio.iscoroutinefunction(handler),
+                is_async_generator=inspect.isasyncgenfunction(handler),
+                validator=validator,
+                request_schema=cls._request_schema_map.get(schema_key),
+                response_schema=cls._response_schema_map.get(schema_key),
+                exception_classes=cls._exception_class_map,
+                response_class=cls._response_class,
+                bulk_plan=bulk_plan,
+                resolver=resolvers.get(schema_key),
+                validator_takes_context=takes_context(validator),
+                handler_takes_context=takes_context(handler),
+                fields_param=fields_params.get(schema_key),
+                executor=executors.get(schema_key),
+                dumps_in_executor=cls.is_dumped_in_executor(
+                    executors.get(schema_key), cls._response_schema_map.get(schema_key),
+                ),
+            )
+
+        cls._action_plans = action_plans
+
+    @classmethod
+    def is_dumped_in_executor(
+        cls, executor: Optional[ExecutorInterface], response_schema: Any
+    ) -> bool:
+        """
+        The process pool handlers dump the responses in the worker, unless
+        the endpoint acquires the response context, it runs in the event loop.
+        """
+        return (
+            executor is not None
+            and executor.crosses_processes
+            and response_schema is not None
+            and cls.acquire_response_context is CoreEndpoint.acquire_response_context
+        )
+
+    @classmethod
+    def compile_feature_plans(
+        cls, feature_plans: Dict[str, FeaturePlan]
+    ) -> Dict[str, FeaturePlan]:
+        """
+        Per method plans of a feature for the methods with the handlers,
+        HEAD shares the GET one.
+        """
+        return {
+            method: feature_plans[get_schema_key(method)]
+            for method in cls._action_plans
+            if get_schema_key(method) in feature_plans
+        }
+
+    @classmethod
+    def get_exception_classes(cls) -> Dict[str, Any]:
+        """
+        Exception classes by the status, the defaults and the ones
+        of the features (eg. 412 of the ETags) included.
+        """
+        return cls._exception_class_map
+
+    @classmethod
+    def is_streamed(cls, method: str) -> bool:
+        """
+        The responses of the method are streamed, so they can't be buffered
+        (eg. cached or hashed), see `StreamingMixin`.
+        """
+        return False
+
+    @classmethod
+    def check_executor_handler(
+        cls, method: str, handler_name: str, executor: ExecutorInterface
+    ) -> None:
+        """
+        Raises `ImproperlyConfigured` unless the handler can run in the executor.
+        """
+        handler = getattr(cls, handler_name, None)
+        if handler is None:
+            raise ImproperlyConfigured(
+                f"{cls.__name__}.handler_executors has {method} method, "
+                f"but there's no `{handler_name}` handler."
+            )
+        if asyncio.iscoroutinefunction(handler) or inspect.isasyncgenfunction(handler):
+            raise ImproperlyConfigured(
+                f"{cls.__name__}.{handler_name} is async, "
+                "only the sync handlers run in the executors."
+            )
+        if executor.crosses_processes and not isinstance(
+            inspect.getattr_static(cls, handler_name), staticmethod
+        ):
+            raise ImproperlyConfigured(
+                f"{cls.__name__}.{handler_name} runs in the {executor.name} process pool, "
+                "it must be a static method, the endpoint instance can't be passed."
+            )
+
+    def get_action_plan(self, method: str) -> ActionPlan:
+        """
+        Action plan look up, raises if the method is not supported.
+        """
+        action_plan = self._action_plans.get(method.upper())
+        if action_plan is None:
+            raise NotImplementedError(f"No handler for {method} method.")
+        return action_plan
+
+    def get_current_plan(self, method: str) -> ActionPlan:
+        """
+        Plan of the request being processed (eg. the bulk one),
+        or the regular one for the method.
+        """
+        action_plan = self.action_plan
+        if action_plan is None or action_plan.method != method.upper():
+            action_plan = self.get_action_plan(method)
+        return action_plan
+
+    def get_feature_plan(
+        self, feature_plans: Dict[str, FeaturePlan]
+    ) -> Optional[FeaturePlan]:
+        """
+        Plan of the feature for the request being processed,
+        the bulk operations have none.
+        """
+        action_plan = self.action_plan
+        if action_plan is None or action_plan is not self._action_plans.get(
+            action_plan.method
+        ):
+            return None
+        return feature_plans.get(action_plan.method)
+
+    @property
+    def request_schema(self) -> Dict[str, Any]:
+        if self._request_schema_map:
+            return self._request_schema_map
+        else:
+            raise NotImplementedError("No request schemas provided")
+
+    @property
+    def response_schema(self) -> Dict[str, Any]:
+        if self._response_schema_map:
+            return self._response_schema_map
+        else:
+            raise NotImplementedError("No response schemas provided")
+
+    @property
+    def exception_class(self) -> Dict[str, Any]:
+        if self._exception_class_map:
+            return self._exception_class_map
+        else:
+            raise NotImplementedError("No exception classes provided")
+
+    def get_resource(self, key: str, resource_name: str) -> Any:
+        """
+        Get a resource class depending on the request method (for schemas)
+        or status code (for exceptions),
+        be it a request or response schema or an exception class.
+        """
+        resources = getattr(self, resource_name, None)
+        if resources is None:
+            raise NotImplementedError(
+                f"Resources of {resource_name} type are not provided"
+            )
+
+        resource = resources.get(key.upper(), None)
+        if resource is None:
+            raise NotImplementedError(
+                f"Resource {resource_name} has no class for {key} {'status code' if resource_name == 'exception_class' else 'method'}."
+            )
+
+        return resource
+
+    def get_request_schema(self, method: str) -> Any:
+        """
+        Request schema look up
+        """
+        request_schema = self.get_current_plan(method).request_schema
+        if request_schema is None:
+            raise NotImplementedError(
+                f"Resource request_schema has no class for {method} method."
+            )
+        return request_schema
+
+    def get_response_schema(self, method: str) -> Any:
+        """
+        Response schema look up
+        """
+        response_schema = self.get_current_plan(method).response_schema
+        if response_schema is None:
+            raise NotImplementedError(
+                f"Resource response_schema has no class for {method} method."
+            )
+        if self.fields is not None:
+            return response_schema.project(self.fields)
+        return response_schema
+
+    def get_exception_class(self, status: str) -> Any:
+        """
+        Exception class look up
+        """
+        return self.get_resource(status, resource_name="exception_class")
+
+    def __init__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Adds the background tasks pool, the request loaders and the phase timer.
+        """
+        super().__init__(scope, receive, send)
+        self.tasks = BackgroundTasks()
+        self.action_plan = self._action_plans.get(scope["method"])
+        self.loaders: Dict[str, DataLoader] = {}
+        self.timer: Union[PhaseTimer, NullTimer] = NULL_TIMER
+
+    def get_loader(self, name: str) -> DataLoader:
+        """
+        Loader of the request, created on the first use,
+        so the values are memoized for this request only.
+        """
+        loader = self.loaders.get(name)
+        if loader is None:
+            batch_load = self._dataloader_map.get(name)
+            if batch_load is None:
+                raise NotImplementedError(f"No {name} loader.")
+            loader = self.loaders[name] = DataLoader(
+                functools.partial(batch_load, self)
+            )
+        return loader
+
+    async def dispatch(self) -> None:
+        """
+        Overriding of the existing method.
+        """
+        request = Request(self.scope, receive=self.receive)
+        response = await self.get_response(request)
+        await response(self.scope, self.receive, self.send)
+
+    async def get_response(self, request: Request) -> Response:
+        """
+        Response of the request, before it's sent.
+        """
+        # In case the `perform_action` method is overridden with a sync one.
+        if self._perform_action_is_async:
+            return await self.perform_action(request)
+        return await run_in_threadpool(self.perform_action, request)
+
+    async def acquire_request_payload(self, request: Request) -> Dict[str, Any]:
+        """
+        Grab all details from the request, including:
+        - path params
+        - query params
+        - body payload, decoded by the decoder registered for the request
+          content type in `body_decoders`
+        """
+        payload = {
+            "path_params": request.path_params,
+            "query_params": dict(request.query_params),
+        }
+
+        if request.method not in BODY_METHODS:
+            action_plan = self.get_current_plan(request.method)
+            if action_plan.fields_param is not None:
+                self.fields = self.parse_fields(
+                    action_plan,
+                    payload["query_params"].pop(action_plan.fields_param, None),
+                )
+            return payload
+
+        content_type = request.headers.get("content-type")
+        if content_type:
+            media_type = content_type.split(";", 1)[0].strip().lower()
+        else:
+            media_type = self.default_media_type
+
+        decoder = self._body_decoder_map.get(media_type)
+        if decoder is None:
+            raise self.get_exception_class("415")()
+
+        body_data = await decoder(self, request)
+        action_plan = self.get_current_plan(request.method)
+
+        if isinstance(body_data, list) and action_plan.bulk_plan is not None:
+            # Switch to the bulk operation
+            self.action_plan = action_plan.bulk_plan
+        elif not isinstance(body_data, dict):
+            raise self.get_exception_class("400")(detail="Object expected")
+        elif action_plan.handler is None:
+            raise self.get_exception_class("400")(detail="Array expected")
+
+        payload["body_data"] = body_data
+
+        return payload
+
+    def parse_fields(
+        self, action_plan: ActionPlan, value: Optional[str]
+    ) -> Optional[Tuple[str, ...]]:
+        """
+        Sparse fieldset out of the comma separated query param,
+        in the order of the response schema fields.
+        """
+        if value is None:
+            return None
+
+        requested = {field.strip() for field in value.split(",")} - {""}
+        field_keys = action_plan.response_schema.field_keys()
+        unknown = requested.difference(field_keys)
+        if not requested or unknown:
+            raise self.get_exception_class("400")(
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+                if unknown
+                else "Fields expected"
+            )
+        return tuple(key for key in field_keys if key in requested)
+
+    async def decode_json_body(self, request: Request) -> Any:
+        """
+        JSON body decoder, an empty body is treated as an empty object.
+        """
+        body = await request.body()
+        if not body:
+            return {}
+
+        try:
+            return (self.json_codec or get_json_codec()).loads(body)
+        except ValueError:
+            raise self.get_exception_class("400")(detail="Malformed JSON body")
+
+    async def decode_form_body(self, request: Request) -> Dict[str, Any]:
+        """
+        Url encoded and multipart form decoder, the body is streamed to the parser.
+        """
+        form_data = await request.form()
+        return dict(form_data)
+
+    async def decode_msgpack_body(self, request: Request) -> Any:
+        """
+        MessagePack body decoder, requires `msgpack` to be installed.
+        """
+        if msgpack is None:
+            raise self.get_exception_class("415")()
+
+        body = await request.body()
+        if not body:
+            return {}
+
+        try:
+            return msgpack.unpackb(body, raw=False)
+        except (
+            msgpack.ExtraData,
+            msgpack.FormatError,
+            msgpack.StackError,
+            msgpack.UnpackException,
+            ValueError,  # incomplete input, invalid UTF-8, non string map keys
+        ):
+            raise self.get_exception_class("400")(detail="Malformed MessagePack body")
+
+    async def decode_raw_body(self, request: Request) -> Dict[str, Any]:
+        """
+        Raw body, passed to the request schema as the `body` field.
+        """
+        return {"body": await request.body()}
+
+    async def shape_request_data(
+        self, request: Request
+    ) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Shaping of the raw request data to the form required for the request schema.
+        Items of the bulk payload are shaped one by one.
+
+        TODO: Implement `request` and `params` parts for the OpenAPI v3
+        """
+        # Place to override
+        with self.timer.phase("payload"):
+            request_payload = await self.acquire_request_payload(request)
+
+        body_data = request_payload.get("body_data")
+        if isinstance(body_data, list):
+            shared_data: Dict[str, Any] = {
+                **request_payload["path_params"],
+                **request_payload["query_params"],
+            }
+            if not all(isinstance(item, dict) for item in body_data):
+                raise self.get_exception_class("400")(
+                    detail="Array of objects expected"
+                )
+            return [{**shared_data, **item} for item in body_data]
+
+        data: Dict[str, Any] = {}
+
+        for section, data_dict in request_payload.items():
+            # TODO check fields are not overridden
+            data.update(data_dict)
+
+        return data
+
+    async def deserialize_payload(self, request: Request) -> Dict[str, Any]:
+        """
+        Run the shaped raw request data through the request model to perform:
+        - deserialization where/if required
+        - request data validation
+        - request data post-processing if required
+
+        Should be implemented in the particular schema back-end class.
+        """
+        raise NotImplementedError()
+
+    async def acquire_request_context(self, request: Request) -> Dict[str, Any]:
+        """
+        Get additional context required for the request schema.
+        """
+        with self.timer.phase("deserialize"):
+            deserialized_payload = await self.deserialize_payload(request)
+        # TODO to implement custom context
+        return deserialized_payload
+
+    async def validate_action(self, request: Request) -> Dict[str, Any]:
+        """
+        Performs user defined validation.
+        Can be done here by overriding this method or by per method definitions
+        defining new method as `async def validate_{request.method}_action`.
+        """
+        payload = await self.acquire_request_context(request)
+        with self.timer.phase("validate"):
+            await self.run_validator(request.method, payload)
+        return payload
+
+    async def run_validator(self, method: str, payload: Dict[str, Any]) -> None:
+        """
+        Loads the context with the resolver and calls the `validate_{method}_action`
+        validator, if there are ones. The context returned by the validator
+        replaces the resolved one.
+        """
+        action_plan = self.action_plan or self.get_action_plan(method)
+        if action_plan.resolver is not None:
+            self.context = await action_plan.resolver(self, payload)
+            if self.context is None:
+                raise self.get_exception_class("404")()
+
+        if action_plan.validator is None:
+            return
+
+        if action_plan.validator_takes_context:
+            context = await action_plan.validator(self, payload, context=self.context)
+        else:
+            context = await action_plan.validator(self, payload)
+        if context is not None:
+            self.context = context
+
+    # async def acquire_query_results(self, request):
+    #     """
+    #     For common queries usage, per method??
+    #     """
+    #     raise NotImplementedError()
+
+    async def collect_background_tasks(
+        self, request_data: Dict[str, Any], raw_response: Any
+    ) -> None:
+        """
+        Method to be overridden to set all user defined background tasks.
+        """
+        pass
+
+    def get_cache_key_data(self, request: Request, request_data: Dict[str, Any]) -> Any:
+        """
+        Everything the response depends on, the cached and the coalesced
+        requests are keyed by it. The deserialized payload is taken
+        instead of the raw query.
+        """
+        return {
+            "path": request.url.path,
+            "method": get_schema_key(request.method),
+            "data": request_data,
+            "fields": self.fields,
+        }
+
+    async def perform_action(self, request: Request) -> Response:
+        """
+        The heartbeat of the endpoint - method triggered by dispatch.
+        Orchestrates request data retrieval, method call and response processing.
+        Also handles user defined exception that are subclassed from `self.base_exception_class`.
+        """
+        action_plan = self.action_plan
+
+        if action_plan is None:
+            return await self.method_not_allowed(request)
+
+        try:
+            request_data = await self.validate_action(request)
+            return await self.process_action(request, request_data)
+
+        except self.base_exception_class as exception:
+            return await self.process_failure(exception)
+
+    async def process_action(
+        self, request: Request, request_data: Dict[str, Any]
+    ) -> Response:
+        """
+        Calls the handler with the validated request data and processes the response.
+        """
+        # Might be switched to the bulk one by the payload
+        action_plan = typing.cast(ActionPlan, self.action_plan)
+
+        handler = typing.cast(typing.Callable, action_plan.handler)
+        if action_plan.handler_takes_context:
+            handler = functools.partial(handler, context=self.context)
+        with self.timer.phase("handler"):
+            if action_plan.is_async:
+                raw_response = await handler(self, request_data)
+            elif action_plan.is_async_generator:
+                # Items are pulled lazily while the response is being sent
+                raw_response = handler(self, request_data)
+            else:
+                raw_response = await self.run_sync_handler(
+                    action_plan, handler, request_data
+                )
+
+        # Collect background tasks
+        await self.collect_background_tasks(request_data, raw_response)
+
+        return await self.respond(request, request_data, raw_response)
+
+    async def respond(
+        self, request: Request, request_data: Dict[str, Any], raw_response: Any
+    ) -> Response:
+        """
+        Turns the raw response of the handler into the response,
+        the features that depend on the raw response wrap it.
+        """
+        return await self.process_response(request, request_data, raw_response)
+
+    async def run_sync_handler(
+        self,
+        action_plan: ActionPlan,
+        handler: typing.Callable,
+        request_data: Dict[str, Any],
+    ) -> Any:
+        """
+        Runs the sync handler in its executor, the shared thread pool by default.
+        Raises the 503 exception if the executor is full.
+        """
+        executor = action_plan.executor
+        if executor is None:
+            return await run_in_threadpool(handler, self, request_data)
+
+        try:
+            if action_plan.dumps_in_executor:
+                return await executor.run(
+                    call_in_process,
+                    handler,
+                    request_data,
+                    action_plan.response_schema,
+                    self.get_response_codec(),
+                )
+            if executor.crosses_processes:
+                return await executor.run(call_in_process, handler, request_data)
+            return await executor.run(handler, self, request_data)
+        except ExecutorSaturated:
+            raise self.get_exception_class("503")(
+                detail=f"The {executor.name} executor is busy, try again later."
+            )
+
+    async def acquire_response_context(
+        self, request_data: Dict[str, Any], raw_response: Any
+    ) -> Any:
+        """
+        User defined procedure to acquire additional context required for the response schema.
+        """
+        return raw_response
+
+    async def serialise_response(
+        self, request: Request, request_data: Dict[str, Any], raw_response: Any
+    ) -> Dict[str, Any]:
+        """
+        Run the raw response data through the request model to perform:
+        - response data validation (not handled exception)
+        - response data post-processing if required
+        - response data serialization
+
+        Should be implemented in the particular schema back-end class.
+        """
+        raise NotImplementedError()
+
+    async def process_response(
+        self, request: Request, request_data: Dict[str, Any], raw_response: Any
+    ) -> Response:
+        """
+        Orchestrates the response processing flow.
+        """
+        if request.method.lower() == "delete" and raw_response is None:
+            return await self.process_success(response_data=None, status_code=204)
+
+        if self.action_plan is not None and self.action_plan.dumps_in_executor:
+            # Dumped in the worker, and encoded there if there's the codec
+            if isinstance(raw_response, bytes):
+                return await self.process_encoded(raw_response)
+            return await self.process_success(raw_response)
+
+        if hasattr(raw_response, "__aiter__"):
+            raw_response = await collect_items(raw_response)
+
+        with self.timer.phase("serialise"):
+            response_data = await self.serialise_response(
+                request, request_data, raw_response
+            )
+        return await self.process_success(response_data)
+
+    async def process_failure(self, exception: ExtendedHTTPException) -> Response:
+        """
+        Handles failure during this request for handled exceptions.
+        """
+        with self.timer.phase("encode"):
+            return self._response_class(
+                exception.to_dict(), status_code=exception.status_code
+            )
+
+    async def process_success(
+        self,
+        response_data: Optional[Dict[str, Any]],
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        """
+        Handles final response wrapping to the Response class
+        """
+        with self.timer.phase("encode"):
+            return self._response_class(
+                response_data,
+                background=self.tasks,
+                status_code=status_code,
+                headers=headers,  # type: ignore
+            )
+
+    async def process_encoded(
+        self,
+        content: bytes,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        """
+        Wraps the body encoded by the codec out of the event loop.
+        """
+        response_class = typing.cast(
+            typing.Type[JSONCodecResponse], self._response_class
+        )
+        return Response(
+            content,
+            background=self.tasks,
+            status_code=status_code,
+            headers=headers,  # type: ignore
+            media_type=response_class.media_type,
+        )
+
+    def get_response_codec(self) -> Optional[JSONCodecInterface]:
+        """
+        Codec of the `JSONCodecResponse` classes, `None` for the other ones.
+        """
+        if not issubclass(self._response_class, JSONCodecResponse):
+            return None
+        return self._response_class.codec or get_json_codec()
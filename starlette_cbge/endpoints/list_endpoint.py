@@ -1,5 +1,135 @@
+import typing
+
+from typing import Any, ClassVar, Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
 from starlette_cbge.endpoints import BaseEndpoint
+from starlette_cbge.exceptions import ImproperlyConfigured
+from starlette_cbge.interfaces import FilteringInterface, PaginationInterface
+from starlette_cbge.streaming import collect_items
 
 
 class ListEndpoint(BaseEndpoint):
-    pass
+    """
+    Collection endpoint with the GET responses paginated by the `pagination` strategy.
+    The handler gets the parsed page as `self.page_request`,
+    see `starlette_cbge.pagination`.
+
+    Links to the next and previous pages are sent in the `Link` header,
+    `pagination_envelope` also wraps the items as
+    `{"items": [...], "next": url, "prev": url}`.
+
+    The GET requests are filtered and sorted by the `filtering` declaration,
+    the handler gets the parsed query as `self.filter_query`,
+    see `starlette_cbge.filtering`.
+    """
+
+    pagination: ClassVar[Optional[PaginationInterface]] = None
+    pagination_envelope: ClassVar[bool] = False
+    filtering: ClassVar[Optional[FilteringInterface]] = None
+
+    page_request: Optional[Any] = None
+    filter_query: Optional[Any] = None
+
+    @classmethod
+    def compile_action_plans(cls) -> None:
+        super().compile_action_plans()
+
+        if (
+            cls.filtering is not None
+            and cls.filtering.sort_fields
+            and getattr(cls.pagination, "sort_keys", None)
+        ):
+            raise ImproperlyConfigured(
+                f"{cls.__name__} is sorted by the keyset pagination, "
+                "the filtering can't declare the sort fields."
+            )
+
+        get_plan = cls._action_plans.get("GET")
+        if (
+            get_plan is not None
+            and getattr(get_plan.executor, "crosses_processes", False)
+            and (cls.pagination is not None or cls.filtering is not None)
+        ):
+            raise ImproperlyConfigured(
+                f"{cls.__name__}.get runs in the process pool, "
+                "it can't get the page and the filter query of the endpoint."
+            )
+
+    async def acquire_request_payload(self, request: Request) -> Dict[str, Any]:
+        """
+        The pagination and the filtering params are consumed here,
+        so the request schema doesn't see them.
+        """
+        payload = await super().acquire_request_payload(request)
+
+        if request.method not in ("GET", "HEAD"):
+            return payload
+
+        query_params = payload["query_params"]
+        try:
+            if self.pagination is not None:
+                self.page_request = self.pagination.parse(query_params)
+            if self.filtering is not None:
+                self.filter_query = self.filtering.parse(query_params)
+        except ValueError as exc:
+            raise self.get_exception_class("400")(detail=str(exc))
+
+        for strategy in (self.pagination, self.filtering):
+            for name in strategy.param_names if strategy is not None else ():
+                query_params.pop(name, None)
+
+        return payload
+
+    def get_cache_key_data(self, request: Request, request_data: Dict[str, Any]) -> Any:
+        """
+        The parsed page, the filter query and the base URL of the page links
+        are cached as well.
+        """
+        key_data = super().get_cache_key_data(request, request_data)
+        if self.filter_query is not None:
+            key_data["query"] = self.filter_query
+        if self.page_request is not None:
+            key_data["page"] = self.page_request
+            key_data["origin"] = f"{request.url.scheme}://{request.url.netloc}"
+        return key_data
+
+    async def process_response(
+        self, request: Request, request_data: Dict[str, Any], raw_response: Any
+    ) -> Response:
+        if self.page_request is None:
+            return await super().process_response(request, request_data, raw_response)
+
+        if hasattr(raw_response, "__aiter__"):
+            raw_response = await collect_items(raw_response)
+
+        pagination = typing.cast(PaginationInterface, self.pagination)
+        page = pagination.paginate(list(raw_response), self.page_request)
+        with self.timer.phase("serialise"):
+            response_data: Any = await self.serialise_response(
+                request, request_data, page.items
+            )
+
+        base_url = request.url.remove_query_params(pagination.param_names)
+        links = {
+            rel: str(base_url.include_query_params(**params))
+            for rel, params in (("next", page.next), ("prev", page.prev))
+            if params is not None
+        }
+
+        if self.pagination_envelope:
+            response_data = {
+                "items": response_data,
+                "next": links.get("next"),
+                "prev": links.get("prev"),
+            }
+
+        headers = None
+        if links:
+            headers = {
+                "link": ", ".join(f'<{url}>; rel="{rel}"' for rel, url in links.items())
+            }
+
+        return await self.process_success(response_data, headers=headers)
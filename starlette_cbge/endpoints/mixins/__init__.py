@@ -0,0 +1,6 @@
+from starlette_cbge.endpoints.mixins.caching import CachingMixin
+from starlette_cbge.endpoints.mixins.coalescing import CoalescingMixin
+from starlette_cbge.endpoints.mixins.conditional import ConditionalMixin
+from starlette_cbge.endpoints.mixins.offload import OffloadMixin
+from starlette_cbge.endpoints.mixins.streaming import StreamingMixin
+from starlette_cbge.endpoints.mixins.timing import TimingMixin
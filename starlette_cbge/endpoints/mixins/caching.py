@@ -0,0 +1,105 @@
+import typing
+
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from starlette_cbge.caching import CachedResponse, make_cache_key
+from starlette_cbge.endpoints.core import WRITE_METHODS, CoreEndpoint
+from starlette_cbge.exceptions import ImproperlyConfigured
+from starlette_cbge.interfaces import CacheBackendInterface
+
+
+class CachePlan(typing.NamedTuple):
+    # Seconds the responses are cached for
+    ttl: float
+
+
+class CachingMixin(CoreEndpoint):
+    """
+    Cached responses, see `starlette_cbge.caching`.
+    """
+
+    # Methods with the cached responses and their TTL in seconds, eg. `(("GET", 60),)`,
+    # see `starlette_cbge.caching`. HEAD requests share the GET responses.
+    cached_methods: Iterable[Tuple[str, float]] = ()
+    cache_backend: Optional[CacheBackendInterface] = None
+    # Endpoints of the same resource (eg. collection and item) should share
+    # the namespace, so writes to either invalidate both. The class by default.
+    cache_namespace: Optional[str] = None
+
+    _cache_plans: Dict[str, CachePlan] = {}
+    _cache_namespace = ""
+
+    @classmethod
+    def compile_action_plans(cls) -> None:
+        super().compile_action_plans()
+
+        cache_ttls = dict(cls.cached_methods or ())
+        for method in cache_ttls:
+            if method != "GET":
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} caches {method} responses, only GET ones can be cached."
+                )
+            if cls.cache_backend is None:
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} caches {method} responses, but has no `cache_backend`."
+                )
+            if cls.is_streamed(method):
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} streams {method} responses, they can't be cached."
+                )
+        cls._cache_namespace = (
+            cls.cache_namespace or f"{cls.__module__}.{cls.__qualname__}"
+        )
+        cls._cache_plans = cls.compile_feature_plans(
+            {method: CachePlan(ttl) for method, ttl in cache_ttls.items()}
+        )
+
+    async def get_cache_key(
+        self, request: Request, request_data: Dict[str, Any]
+    ) -> str:
+        """
+        Key of the response in the `cache_backend`, depends on the namespace version.
+        """
+        backend = typing.cast(CacheBackendInterface, self.cache_backend)
+        version = await backend.get_version(self._cache_namespace)
+        return make_cache_key(
+            self._cache_namespace,
+            version,
+            self.get_cache_key_data(request, request_data),
+        )
+
+    async def process_action(
+        self, request: Request, request_data: Dict[str, Any]
+    ) -> Response:
+        """
+        Responds with the cached response if there's one, caches the new one.
+        The successful writes invalidate the namespace.
+        """
+        cache_backend = self.cache_backend
+        if cache_backend is None:
+            return await super().process_action(request, request_data)
+
+        cache_plan = self.get_feature_plan(self._cache_plans)
+        if cache_plan is None:
+            response = await super().process_action(request, request_data)
+            if request.method in WRITE_METHODS and response.status_code < 400:
+                with self.timer.phase("cache"):
+                    await cache_backend.invalidate(self._cache_namespace)
+            return response
+
+        with self.timer.phase("cache"):
+            cache_key = await self.get_cache_key(request, request_data)
+            cached_response = await cache_backend.get(cache_key)
+        if cached_response is not None:
+            return cached_response.to_response()
+
+        response = await super().process_action(request, request_data)
+        if response.status_code == 200:
+            with self.timer.phase("cache"):
+                await cache_backend.set(
+                    cache_key, CachedResponse.from_response(response), cache_plan.ttl
+                )
+        return response
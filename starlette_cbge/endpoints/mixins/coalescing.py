@@ -0,0 +1,160 @@
+import asyncio
+import functools
+import typing
+
+from typing import Any, Dict, Iterable, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from starlette_cbge.caching import CachedResponse, make_cache_key
+from starlette_cbge.endpoints.core import CoreEndpoint
+from starlette_cbge.exceptions import ImproperlyConfigured
+
+
+class CoalescePlan(typing.NamedTuple):
+    # Seconds to wait for the identical in-flight request
+    timeout: float
+
+
+class Flight(typing.NamedTuple):
+    """
+    Response of the coalesced request and its copy for the other requests.
+    """
+
+    response: Response
+    snapshot: CachedResponse
+
+
+def finish_flight(
+    in_flight: Dict[str, "asyncio.Future[Flight]"],
+    key: str,
+    flight: "asyncio.Future[Flight]",
+) -> None:
+    """
+    Removes the finished flight, so the next requests start a new one.
+    """
+    if in_flight.get(key) is flight:
+        del in_flight[key]
+    if not flight.cancelled():
+        # Marks the exception as retrieved if no request has waited for it
+        flight.exception()
+
+
+class CoalescingMixin(CoreEndpoint):
+    """
+    Identical concurrent requests coalesced into a single handler call (single-flight).
+    """
+
+    # Methods with the identical concurrent requests coalesced (single-flight)
+    # and the max seconds a request waits for the in-flight one, eg. `(("GET", 5),)`.
+    # Requests are identical if their deserialized payloads are, see `get_cache_key_data`,
+    # the handler runs once and the encoded response is shared. Every request
+    # is validated with `validate_action` on its own before it joins the flight.
+    # The responses that depend on the caller must add it to the key,
+    # see `get_coalesce_identity`.
+    coalesced_methods: Iterable[Tuple[str, float]] = ()
+
+    _coalesce_plans: Dict[str, CoalescePlan] = {}
+    _in_flight: Dict[str, "asyncio.Future[Flight]"] = {}
+
+    @classmethod
+    def compile_action_plans(cls) -> None:
+        super().compile_action_plans()
+
+        coalesce_timeouts = dict(cls.coalesced_methods or ())
+        for method in coalesce_timeouts:
+            if method != "GET":
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} coalesces {method} requests, only GET ones can be coalesced."
+                )
+            if cls.is_streamed(method):
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} streams {method} responses, they can't be shared."
+                )
+        cls._coalesce_plans = cls.compile_feature_plans(
+            {
+                method: CoalescePlan(timeout)
+                for method, timeout in coalesce_timeouts.items()
+            }
+        )
+        cls._in_flight = {}
+
+    async def process_action(
+        self, request: Request, request_data: Dict[str, Any]
+    ) -> Response:
+        """
+        Joins the identical in-flight request or starts a new one,
+        the request has been validated already.
+
+        The flight runs in its own task, so it's not cancelled with the request
+        that has started it, the rest of the requests still get the response.
+        A request that has waited for the plan's timeout runs on its own.
+        """
+        coalesce_plan = self.get_feature_plan(self._coalesce_plans)
+        if coalesce_plan is None:
+            return await super().process_action(request, request_data)
+
+        key = make_cache_key(
+            type(self).__qualname__,
+            0,
+            self.get_coalesce_key_data(request, request_data),
+        )
+
+        flight = self._in_flight.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(self.perform_flight(request, request_data))
+            self._in_flight[key] = flight
+            flight.add_done_callback(
+                functools.partial(finish_flight, self._in_flight, key)
+            )
+            response, _ = await asyncio.shield(flight)
+            return response
+
+        try:
+            with self.timer.phase("coalesce"):
+                _, snapshot = await asyncio.wait_for(
+                    asyncio.shield(flight), coalesce_plan.timeout
+                )
+        except asyncio.TimeoutError:
+            response, _ = await self.perform_flight(request, request_data)
+            return response
+
+        # Another request's response, without its background tasks
+        return snapshot.to_response()
+
+    async def perform_flight(
+        self, request: Request, request_data: Dict[str, Any]
+    ) -> Flight:
+        """
+        Processing of the coalesced request, the handled exceptions are shared
+        as the failure responses. The response is copied for the other requests
+        before the one that has started the flight adds its own headers.
+        """
+        try:
+            response = await super().process_action(request, request_data)
+        except self.base_exception_class as exception:
+            response = await self.process_failure(exception)
+        return Flight(response, CachedResponse.from_response(response))
+
+    def get_coalesce_key_data(
+        self, request: Request, request_data: Dict[str, Any]
+    ) -> Any:
+        """
+        The cache key data with the conditional headers and the caller identity,
+        the requests are answered with the same response only if they match too.
+        """
+        return {
+            "request": self.get_cache_key_data(request, request_data),
+            "identity": self.get_coalesce_identity(request),
+            "if-none-match": request.headers.get("if-none-match"),
+            "if-modified-since": request.headers.get("if-modified-since"),
+        }
+
+    def get_coalesce_identity(self, request: Request) -> Any:
+        """
+        The caller the response depends on, eg. `request.headers.get("authorization")`
+        or the user id, only the requests of the same caller share the response.
+        Nothing by default, the response is the same for all the callers.
+        """
+        return None
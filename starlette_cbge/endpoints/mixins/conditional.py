@@ -0,0 +1,270 @@
+import functools
+import typing
+
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from starlette_cbge.conditional import (
+    etag_matches,
+    format_http_date,
+    get_field,
+    make_etag,
+    make_version_etag,
+    parse_http_date,
+    to_datetime,
+)
+from starlette_cbge.endpoints.core import (
+    READ_METHODS,
+    WRITE_METHODS,
+    ActionPlan,
+    CoreEndpoint,
+)
+from starlette_cbge.exceptions import ImproperlyConfigured, PreconditionFailedException
+
+# Headers kept by the `304 Not Modified` responses
+NOT_MODIFIED_HEADERS = ("etag", "last-modified", "cache-control", "vary")
+
+
+class ConditionalPlan(typing.NamedTuple):
+    etag: bool
+    etag_field: Optional[str]
+    last_modified_field: Optional[str]
+
+
+class ConditionalMixin(CoreEndpoint):
+    """
+    Conditional requests, see `starlette_cbge.conditional`.
+    """
+
+    # Methods with the ETags, GET ones are checked against `If-None-Match`,
+    # PUT, PATCH and DELETE ones against `If-Match`, eg. `(("GET", None), ("PUT", None))`.
+    # The value is the field of the raw response holding the version of the resource,
+    # `None` to hash the serialized GET response, see `starlette_cbge.conditional`.
+    # NOTE: `If-Match` is checked before the handler runs, so a write committed
+    # in between isn't detected, the check is advisory. A handler that needs it atomic
+    # has to compare the version in the write itself (eg. `UPDATE ... WHERE id = :id
+    # AND version = :version`) and raise the 412 exception if no row was updated.
+    etag_fields: Iterable[Tuple[str, Optional[str]]] = ()
+    # GET responses with the `Last-Modified` header out of the raw response field,
+    # checked against `If-Modified-Since`, eg. `(("GET", "updated_at"),)`
+    last_modified_fields: Iterable[Tuple[str, str]] = ()
+
+    _conditional_plans: Dict[str, ConditionalPlan] = {}
+
+    @classmethod
+    def compile_action_plans(cls) -> None:
+        super().compile_action_plans()
+
+        etag_fields = dict(cls.etag_fields or ())
+        last_modified_fields = dict(cls.last_modified_fields or ())
+        for method, etag_field in etag_fields.items():
+            if method not in ("GET", "PUT", "PATCH", "DELETE"):
+                raise ImproperlyConfigured(
+                    f"{cls.__name__}.etag_fields has {method} method, "
+                    "ETags are supported for GET, PUT, PATCH and DELETE only."
+                )
+            if getattr(cls, "get", None) is None:
+                raise ImproperlyConfigured(
+                    f"{cls.__name__}.etag_fields has {method} method, "
+                    "but there's no `get` handler to fetch the current resource."
+                )
+            if etag_field is None and cls.is_streamed("GET"):
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} streams GET responses, they can't be hashed for ETags."
+                )
+        if etag_fields:
+            cls._exception_class_map.setdefault("412", PreconditionFailedException)
+        for method in last_modified_fields:
+            if method != "GET":
+                raise ImproperlyConfigured(
+                    f"{cls.__name__}.last_modified_fields has {method} method, "
+                    "only GET responses are supported."
+                )
+
+        cls._conditional_plans = cls.compile_feature_plans(
+            {
+                method: ConditionalPlan(
+                    etag=method in etag_fields,
+                    etag_field=etag_fields.get(method),
+                    last_modified_field=last_modified_fields.get(method),
+                )
+                for method in {**etag_fields, **last_modified_fields}
+            }
+        )
+
+    def get_validators(
+        self, conditional_plan: ConditionalPlan, raw_response: Any
+    ) -> Dict[str, str]:
+        """
+        `ETag` and `Last-Modified` headers out of the fields of the raw response.
+        """
+        validators = {}
+        if conditional_plan.etag_field is not None:
+            version = get_field(raw_response, conditional_plan.etag_field)
+            if version is not None:
+                validators["etag"] = make_version_etag(version)
+        if conditional_plan.last_modified_field is not None:
+            last_modified = to_datetime(
+                get_field(raw_response, conditional_plan.last_modified_field)
+            )
+            if last_modified is not None:
+                validators["last-modified"] = format_http_date(last_modified)
+        return validators
+
+    def add_validators(
+        self,
+        conditional_plan: ConditionalPlan,
+        response: Response,
+        validators: Dict[str, str],
+    ) -> None:
+        """
+        Sets the validators of the successful response,
+        the GET body is hashed if there's no version field.
+        """
+        for name, value in validators.items():
+            response.headers[name] = value
+        if (
+            conditional_plan.etag
+            and conditional_plan.etag_field is None
+            and typing.cast(ActionPlan, self.action_plan).method in READ_METHODS
+            and getattr(response, "body", None) is not None
+        ):
+            response.headers["etag"] = make_etag(response.body)
+
+    def is_not_modified(self, request: Request, validators: Dict[str, str]) -> bool:
+        """
+        `If-None-Match` takes precedence, `If-Modified-Since` is checked without it.
+        """
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            etag = validators.get("etag")
+            return etag is not None and etag_matches(if_none_match, etag)
+
+        if_modified_since = parse_http_date(request.headers.get("if-modified-since"))
+        last_modified = parse_http_date(validators.get("last-modified"))
+        if if_modified_since is None or last_modified is None:
+            return False
+        return last_modified <= if_modified_since
+
+    def process_not_modified(self, headers: Dict[str, str]) -> Response:
+        return Response(
+            status_code=304,
+            headers={
+                name: value
+                for name, value in headers.items()
+                if name in NOT_MODIFIED_HEADERS
+            },
+        )
+
+    def process_conditional(self, request: Request, response: Response) -> Response:
+        """
+        Replaces the successful GET response with `304 Not Modified`
+        if the client has got the same one.
+        """
+        if (
+            self.get_feature_plan(self._conditional_plans) is None
+            or request.method not in READ_METHODS
+            or response.status_code != 200
+        ):
+            return response
+
+        headers = dict(response.headers)
+        if self.is_not_modified(request, headers):
+            return self.process_not_modified(headers)
+        return response
+
+    async def check_preconditions(
+        self, request: Request, request_data: Dict[str, Any]
+    ) -> None:
+        """
+        Raises the 412 exception if `If-Match` doesn't match
+        the current version of the resource. Advisory, see `etag_fields`.
+        """
+        if_match = request.headers.get("if-match")
+        if if_match is None:
+            return
+
+        etag = await self.get_current_etag(request, request_data)
+        if etag is None or not etag_matches(if_match, etag):
+            raise self.get_exception_class("412")()
+
+    async def get_current_etag(
+        self, request: Request, request_data: Dict[str, Any]
+    ) -> Optional[str]:
+        """
+        ETag of the current resource, `None` if it doesn't exist.
+        The resource is fetched with the GET handler,
+        can be overridden with a cheaper look up (eg. of the version column only).
+        """
+        get_plan = self.get_action_plan("GET")
+        handler = typing.cast(typing.Callable, get_plan.handler)
+        try:
+            if get_plan.resolver is not None:
+                context = await get_plan.resolver(self, request_data)
+                if context is None:
+                    return None
+                if get_plan.handler_takes_context:
+                    handler = functools.partial(handler, context=context)
+            if get_plan.is_async:
+                raw_response = await handler(self, request_data)
+            else:
+                raw_response = await self.run_sync_handler(
+                    get_plan, handler, request_data
+                )
+        except self.base_exception_class as exception:
+            if exception.status_code == 404:
+                return None
+            raise
+
+        conditional_plan = self.get_feature_plan(self._conditional_plans)
+        if conditional_plan is not None and conditional_plan.etag_field is not None:
+            version = get_field(raw_response, conditional_plan.etag_field)
+            return None if version is None else make_version_etag(version)
+
+        if get_plan.dumps_in_executor:
+            # The worker's response as it is, it's not dumped again
+            if isinstance(raw_response, bytes):
+                return make_etag(raw_response)
+            return make_etag(self._response_class(raw_response).body)
+
+        raw_response = await self.acquire_response_context(request_data, raw_response)
+        response_data = get_plan.response_schema.perform_dump(raw_response)
+        return make_etag(self._response_class(response_data).body)
+
+    async def process_action(
+        self, request: Request, request_data: Dict[str, Any]
+    ) -> Response:
+        """
+        Checks `If-Match` of the writes, the GET responses
+        (eg. the cached ones) are checked against the client's validators.
+        """
+        if self.get_feature_plan(self._conditional_plans) is None:
+            return await super().process_action(request, request_data)
+
+        if request.method in WRITE_METHODS:
+            await self.check_preconditions(request, request_data)
+        response = await super().process_action(request, request_data)
+        return self.process_conditional(request, response)
+
+    async def respond(
+        self, request: Request, request_data: Dict[str, Any], raw_response: Any
+    ) -> Response:
+        """
+        Adds the validators out of the raw response, the response isn't
+        serialized at all if the client has got the same one.
+        """
+        conditional_plan = self.get_feature_plan(self._conditional_plans)
+        if conditional_plan is None:
+            return await super().respond(request, request_data, raw_response)
+
+        validators = self.get_validators(conditional_plan, raw_response)
+        if request.method in READ_METHODS and self.is_not_modified(request, validators):
+            # Known out of the raw response, the serialization is skipped
+            return self.process_not_modified(validators)
+
+        response = await super().respond(request, request_data, raw_response)
+        if response.status_code < 300:
+            self.add_validators(conditional_plan, response, validators)
+        return response
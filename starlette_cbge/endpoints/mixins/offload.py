@@ -0,0 +1,176 @@
+import functools
+import inspect
+import typing
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+
+from starlette_cbge.endpoints.core import CoreEndpoint
+from starlette_cbge.exceptions import (
+    ExecutorSaturated,
+    ImproperlyConfigured,
+    ServiceUnavailableException,
+)
+from starlette_cbge.interfaces import (
+    ExecutorInterface,
+    JSONCodecInterface,
+    ListSchemaInterface,
+)
+from starlette_cbge.json_codecs import JSONCodecResponse
+
+
+class OffloadMixin(CoreEndpoint):
+    """
+    The large payloads and list responses processed off the event loop.
+    """
+
+    # Bulk payloads and list responses of more than `offload_threshold` items
+    # are loaded and dumped in `offload_executor` (the shared thread pool by default),
+    # `offload_chunk_size` items at a time, so the event loop serves the other
+    # requests in between the chunks. The smaller ones are processed inline.
+    # The list responses are then encoded there too, as a whole, if the response
+    # class is a `JSONCodecResponse` (the `ProcessPool` needs a picklable codec).
+    # NOTE: the `ProcessPool` gets the raw items pickled, eg. the DB rows must allow it.
+    offload_threshold: Optional[int] = None
+    offload_chunk_size = 1000
+    offload_executor: Optional[ExecutorInterface] = None
+
+    @classmethod
+    def compile_action_plans(cls) -> None:
+        super().compile_action_plans()
+
+        if cls.offload_chunk_size < 1:
+            raise ImproperlyConfigured(
+                f"{cls.__name__}.offload_chunk_size must be positive."
+            )
+        offload_executor = cls.offload_executor
+        if offload_executor is None:
+            return
+        cls._exception_class_map.setdefault("503", ServiceUnavailableException)
+        if (
+            cls.offload_threshold is not None
+            and offload_executor.crosses_processes
+            and cls.sparse_fieldsets
+        ):
+            raise ImproperlyConfigured(
+                f"{cls.__name__} offloads to the {offload_executor.name} process pool, "
+                "the projected schemas of the sparse fieldsets can't be pickled."
+            )
+
+    def should_offload(self, schema: Any, data: Any) -> bool:
+        """
+        Only the lists over `offload_threshold` of the list schemas are offloaded.
+        """
+        return (
+            self.offload_threshold is not None
+            and isinstance(data, list)
+            and len(data) > self.offload_threshold
+            and inspect.isclass(schema)
+            and issubclass(schema, ListSchemaInterface)
+        )
+
+    def should_offload_encoding(self, response_data: Any) -> bool:
+        """
+        The lists over `offload_threshold` are encoded in the offload executor,
+        only with the codec responses, the other response classes encode inline.
+        """
+        return (
+            self.offload_threshold is not None
+            and isinstance(response_data, list)
+            and len(response_data) > self.offload_threshold
+            and issubclass(self._response_class, JSONCodecResponse)
+        )
+
+    async def run_chunks(
+        self, func: typing.Callable, items: List[Any]
+    ) -> List[Tuple[int, Any]]:
+        """
+        Calls `func` with the chunks of the items in the offload executor,
+        one chunk at a time, returns the offsets of the chunks with the results.
+        """
+        results = []
+        for offset in range(0, len(items), self.offload_chunk_size):
+            chunk = items[offset : offset + self.offload_chunk_size]
+            results.append((offset, await self.run_offloaded(func, chunk)))
+        return results
+
+    async def run_offloaded(self, func: typing.Callable, *args: Any) -> Any:
+        """
+        Calls `func` in the offload executor, 503 if the executor is full.
+        """
+        executor = self.offload_executor
+        if executor is None:
+            return await run_in_threadpool(func, *args)
+        try:
+            return await executor.run(func, *args)
+        except ExecutorSaturated:
+            raise self.get_exception_class("503")(
+                detail=f"The {executor.name} executor is busy, try again later."
+            )
+
+    async def load_offloaded(self, request_schema: Any, items: Any) -> Any:
+        """
+        Loads the bulk payload in chunks, the errors of all the chunks are reported.
+        """
+        loaded: List[Dict[str, Any]] = []
+        errors = []
+        for offset, (chunk_items, chunk_errors) in await self.run_chunks(
+            functools.partial(self.load_chunk, request_schema), items
+        ):
+            if chunk_errors is None:
+                loaded.extend(chunk_items)
+            else:
+                errors.append((offset, chunk_errors))
+
+        if errors:
+            raise self.get_exception_class("422")(
+                errors=self.merge_chunk_errors(errors)
+            )
+        return loaded
+
+    async def dump_offloaded(self, response_schema: Any, items: Any) -> Any:
+        """
+        Dumps the list response in chunks.
+        """
+        dumped: List[Dict[str, Any]] = []
+        for _, chunk_items in await self.run_chunks(
+            response_schema.perform_dump, items
+        ):
+            dumped.extend(chunk_items)
+        return dumped
+
+    @staticmethod
+    def load_chunk(request_schema: Any, chunk: List[Any]) -> Tuple[Any, Any]:
+        """
+        Loads a chunk of the offloaded payload, returns the items or the validation
+        errors as the plain data, so they can be sent from a worker process.
+
+        Should be implemented in the particular schema back-end class.
+        """
+        raise NotImplementedError()
+
+    def merge_chunk_errors(self, errors: List[Tuple[int, Any]]) -> Any:
+        """
+        Validation errors of the chunks with the item indices of the whole payload.
+
+        Should be implemented in the particular schema back-end class.
+        """
+        raise NotImplementedError()
+
+    async def process_success(
+        self,
+        response_data: Optional[Dict[str, Any]],
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        if not self.should_offload_encoding(response_data):
+            return await super().process_success(response_data, status_code, headers)
+
+        with self.timer.phase("encode"):
+            codec = typing.cast(JSONCodecInterface, self.get_response_codec())
+            # The whole list is encoded in one call, the chunks of a JSON
+            # array can't be encoded apart with every codec
+            content = await self.run_offloaded(codec.dumps, response_data)
+        return await self.process_encoded(content, status_code, headers)
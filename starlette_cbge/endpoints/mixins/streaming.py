@@ -0,0 +1,98 @@
+import inspect
+import typing
+
+from typing import Any, Dict, Iterable, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from starlette_cbge.endpoints.core import ActionPlan, CoreEndpoint
+from starlette_cbge.exceptions import ImproperlyConfigured
+from starlette_cbge.interfaces import ListSchemaInterface
+from starlette_cbge.json_codecs import get_json_codec
+from starlette_cbge.streaming import STREAM_ENCODERS, STREAM_MEDIA_TYPES
+
+
+class StreamPlan(typing.NamedTuple):
+    stream_format: str
+
+
+class StreamingMixin(CoreEndpoint):
+    """
+    Streamed list responses, see `starlette_cbge.streaming`.
+    """
+
+    # Methods with the streamed list responses, `json_array` or `ndjson` format
+    streaming_responses: Iterable[Tuple[str, str]] = ()
+    stream_batch_size = 500
+
+    _stream_plans: Dict[str, StreamPlan] = {}
+
+    @classmethod
+    def compile_action_plans(cls) -> None:
+        super().compile_action_plans()
+
+        stream_formats = dict(cls.streaming_responses or ())
+        for method, stream_format in stream_formats.items():
+            if stream_format not in STREAM_ENCODERS:
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} has unknown stream format {stream_format} for {method} method."
+                )
+            response_schema = cls._response_schema_map.get(method)
+            if not (
+                inspect.isclass(response_schema)
+                and issubclass(response_schema, ListSchemaInterface)
+            ):
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} streams {method} responses, but its response schema is not a list schema."
+                )
+            executor = getattr(cls._action_plans.get(method), "executor", None)
+            if executor is not None and executor.crosses_processes:
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} streams the responses for {method} method, "
+                    "it's not supported by the process pool handlers."
+                )
+
+        cls._stream_plans = cls.compile_feature_plans(
+            {
+                method: StreamPlan(stream_format)
+                for method, stream_format in stream_formats.items()
+            }
+        )
+
+    @classmethod
+    def is_streamed(cls, method: str) -> bool:
+        return method in cls._stream_plans or super().is_streamed(method)
+
+    async def process_response(
+        self, request: Request, request_data: Dict[str, Any], raw_response: Any
+    ) -> Response:
+        stream_plan = self.get_feature_plan(self._stream_plans)
+        if stream_plan is None:
+            return await super().process_response(request, request_data, raw_response)
+        return await self.process_stream(stream_plan, request_data, raw_response)
+
+    async def process_stream(
+        self, stream_plan: StreamPlan, request_data: Dict[str, Any], raw_response: Any
+    ) -> Response:
+        """
+        Wraps the collection into the streaming response,
+        items are dumped with the list response schema one by one.
+        """
+        action_plan = typing.cast(ActionPlan, self.action_plan)
+        with self.timer.phase("context"):
+            raw_response = await self.acquire_response_context(
+                request_data, raw_response
+            )
+        stream_encoder = STREAM_ENCODERS[stream_plan.stream_format]
+        content = stream_encoder(
+            raw_response,
+            self.get_response_schema(action_plan.method).perform_dump_item,
+            self.json_codec or get_json_codec(),
+            self.stream_batch_size,
+        )
+        return StreamingResponse(
+            content,
+            media_type=STREAM_MEDIA_TYPES[stream_plan.stream_format],
+            background=self.tasks,
+        )
@@ -0,0 +1,67 @@
+import typing
+
+from typing import Iterable, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from starlette_cbge.endpoints.core import CoreEndpoint
+from starlette_cbge.interfaces import TimingSinkInterface
+from starlette_cbge.profiling import RequestProfiler
+from starlette_cbge.timing import PhaseTimer
+
+
+class TimingMixin(CoreEndpoint):
+    """
+    Request phase timings and profiles,
+    see `starlette_cbge.timing` and `starlette_cbge.profiling`.
+    """
+
+    # Consumers of the request phase timings, see `starlette_cbge.timing`,
+    # `server_timing` also sends them in the `Server-Timing` header.
+    # NOTE: the header discloses the processing details, don't enable it for the public APIs.
+    timing_sinks: Iterable[TimingSinkInterface] = ()
+    server_timing = False
+    # Profiles of the sampled and the slow requests, see `starlette_cbge.profiling`
+    profiler: Optional[RequestProfiler] = None
+
+    def __init__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        super().__init__(scope, receive, send)
+        if self.timing_sinks or self.server_timing:
+            self.timer = PhaseTimer()
+
+    async def get_response(self, request: Request) -> Response:
+        profiler = self.profiler
+        capture = None if profiler is None else profiler.start()
+        try:
+            response = await super().get_response(request)
+        except BaseException:
+            if capture is not None:
+                typing.cast(RequestProfiler, profiler).abort(capture)
+            raise
+
+        if isinstance(self.timer, PhaseTimer):
+            self.record_timing(request, response)
+        if capture is not None:
+            typing.cast(RequestProfiler, profiler).finish(
+                capture,
+                type(self).__name__,
+                request,
+                response,
+                getattr(self.timer, "durations", None),
+            )
+        return response
+
+    def record_timing(self, request: Request, response: Response) -> None:
+        """
+        Passes the phase timings to the sinks and the `Server-Timing` header.
+        """
+        timer = typing.cast(PhaseTimer, self.timer)
+        total = timer.finish()
+        if self.server_timing:
+            response.headers["server-timing"] = timer.server_timing(total)
+        for sink in self.timing_sinks:
+            sink.record(
+                type(self).__name__, request.method, response.status_code, timer, total
+            )
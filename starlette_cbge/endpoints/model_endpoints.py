@@ -0,0 +1,105 @@
+"""
+Generic handlers backed by a model, mixed into a schema backend endpoint:
+
+    class Authors(PydanticBaseEndpoint, ModelCollectionEndpoint):
+        model = AuthorsModel()
+        request_schemas = ...
+        response_schemas = ...
+"""
+from typing import Any, ClassVar, Dict, Iterable, List, Optional, Tuple
+
+from starlette_cbge.exceptions import NotFoundException
+from starlette_cbge.interfaces import ModelInterface
+
+
+class ModelCollectionEndpoint:
+    model: ClassVar[ModelInterface]
+
+    async def get(self, request_data: Dict[str, Any]) -> List[Any]:
+        """
+        Retrieves the list of records limited with `limit` and `offset` fields,
+        or the page of records if the endpoint is paginated.
+        Only the fields of the sparse fieldset are selected, if it's requested,
+        and the records are filtered by the filter query, if there's one.
+        """
+        # Not passed at all otherwise, so the models without them still work
+        options: Dict[str, Any] = {}
+        fields = getattr(self, "fields", None)
+        if fields:
+            options["fields"] = fields
+        query = getattr(self, "filter_query", None)
+        if query is not None:
+            options["query"] = query
+        page_request = getattr(self, "page_request", None)
+        if page_request is not None:
+            return await self.model.read_page(request_data, page_request, **options)
+        return await self.model.read_many(request_data, **options)
+
+    async def post(self, request_data: Dict[str, Any]) -> Any:
+        """
+        Creates a new record and returns it.
+        """
+        return await self.model.create(request_data)
+
+    async def post_many(self, request_data: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Creates records in bulk and returns them.
+        """
+        return await self.model.create_many(request_data)
+
+    async def patch_many(self, request_data: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Updates records in bulk and returns them.
+        """
+        return await self.model.update_many(request_data)
+
+
+class ModelItemEndpoint:
+    """
+    The record is loaded before the GET validation, so a validator can check it
+    without querying it again:
+
+        async def validate_get_action(self, request_data, context):
+            if context["owner_id"] != request_data["user_id"]:
+                raise ExtendedHTTPException(403)
+    """
+
+    model: ClassVar[ModelInterface]
+    context_resolvers: Iterable[Tuple[str, str]] = (("GET", "read_record"),)
+
+    async def read_record(self, request_data: Dict[str, Any]) -> Optional[Any]:
+        """
+        Context resolver, 404 is responded if the record doesn't exist.
+        """
+        fields = getattr(self, "fields", None)
+        options = {"fields": fields} if fields else {}
+        return await self.model.read(request_data, **options)
+
+    async def get(self, request_data: Dict[str, Any], context: Any = None) -> Any:
+        """
+        Retrieves the record for the given primary key,
+        already loaded by the context resolver.
+        """
+        if context is not None:
+            return context
+        record = await self.read_record(request_data)
+        if record is None:
+            raise NotFoundException()
+        return record
+
+    async def put(self, request_data: Dict[str, Any]) -> Any:
+        """
+        Updates the record for the given primary key and returns it.
+        """
+        record = await self.model.update(request_data)
+        if record is None:
+            raise NotFoundException()
+        return record
+
+    async def delete(self, request_data: Dict[str, Any]) -> Optional[Any]:
+        """
+        Deletes the record for the given primary key.
+        """
+        if not await self.model.delete(request_data):
+            raise NotFoundException()
+        return None
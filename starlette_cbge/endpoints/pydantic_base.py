@@ -2,7 +2,7 @@
 Implementation of the base pydantic endpoint
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 
 from starlette.requests import Request
 
@@ -24,10 +24,16 @@ class PydanticBaseEndpoint(BaseEndpoint):
 
         Implementation for the pydantic schema back-end.
         """
-        request_payload = await self.shape_request_data(request)
+        with self.timer.phase("shape"):
+            request_payload = await self.shape_request_data(request)
         request_schema = self.get_request_schema(request.method)
         try:
-            deserialized_payload = request_schema.perform_load(request_payload)
+            if self.should_offload(request_schema, request_payload):
+                deserialized_payload = await self.load_offloaded(
+                    request_schema, request_payload
+                )
+            else:
+                deserialized_payload = request_schema.perform_load(request_payload)
         except pydantic.ValidationError as exc:
             raise self.get_exception_class("422")(errors=exc.errors())
 
@@ -45,6 +51,25 @@ class PydanticBaseEndpoint(BaseEndpoint):
         Should be implemented in the particular schema back-end class.
         """
         response_schema = self.get_response_schema(request.method)
-        raw_response = await self.acquire_response_context(request_data, raw_response)
+        with self.timer.phase("context"):
+            raw_response = await self.acquire_response_context(
+                request_data, raw_response
+            )
+        if self.should_offload(response_schema, raw_response):
+            return await self.dump_offloaded(response_schema, raw_response)
         response_data = response_schema.perform_dump(raw_response)
         return response_data
+
+    @staticmethod
+    def load_chunk(request_schema: Any, chunk: List[Any]) -> Tuple[Any, Any]:
+        try:
+            return request_schema.perform_load(chunk), None
+        except pydantic.ValidationError as exc:
+            return None, exc.errors()
+
+    def merge_chunk_errors(self, errors: List[Tuple[int, Any]]) -> Any:
+        return [
+            {**error, "loc": (error["loc"][0] + offset, *error["loc"][1:])}
+            for offset, chunk_errors in errors
+            for error in chunk_errors
+        ]
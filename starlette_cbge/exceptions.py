@@ -1,18 +1,36 @@
 import http
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Union
 
 from starlette.exceptions import HTTPException
 
 
 INVALID_REQUEST = "Invalid request"
+BAD_REQUEST = "Malformed request body"
+UNSUPPORTED_MEDIA_TYPE = "Unsupported media type"
 CONFLICT = "Conflict"
+BULK_OPERATION_FAILED = "Bulk operation failed"
 NOT_FOUND = "Not found"
+PRECONDITION_FAILED = "Precondition failed"
+SERVICE_UNAVAILABLE = "Service unavailable"
+
+
+class ImproperlyConfigured(Exception):
+    """
+    Raised at the class creation time for misconfigured endpoints.
+    """
+
+
+class ExecutorSaturated(Exception):
+    """
+    Raised by the bounded executors with all the workers busy and the queue full,
+    see `starlette_cbge.executors`.
+    """
 
 
 class ExtendedHTTPException(HTTPException):
     def __init__(
-        self, status_code: int, detail: str = None, errors: Dict = None
+        self, status_code: int, detail: str = None, errors: Union[Dict, List] = None,
     ) -> None:
         super(ExtendedHTTPException, self).__init__(status_code, detail)
         self.errors = errors
@@ -50,6 +68,26 @@ class InvalidRequestException(ExtendedHTTPException):
         return INVALID_REQUEST
 
 
+class BadRequestException(ExtendedHTTPException):
+    def __init__(self, status_code: int = 400, detail: str = BAD_REQUEST) -> None:
+        super(BadRequestException, self).__init__(status_code, detail)
+
+    @classmethod
+    def description(cls) -> str:
+        return BAD_REQUEST
+
+
+class UnsupportedMediaTypeException(ExtendedHTTPException):
+    def __init__(
+        self, status_code: int = 415, detail: str = UNSUPPORTED_MEDIA_TYPE
+    ) -> None:
+        super(UnsupportedMediaTypeException, self).__init__(status_code, detail)
+
+    @classmethod
+    def description(cls) -> str:
+        return UNSUPPORTED_MEDIA_TYPE
+
+
 class ConflictException(ExtendedHTTPException):
     def __init__(self, status_code: int = 409, detail: str = CONFLICT) -> None:
         super(ConflictException, self).__init__(status_code, detail)
@@ -58,3 +96,48 @@ class ConflictException(ExtendedHTTPException):
 class NotFoundException(ExtendedHTTPException):
     def __init__(self, status_code: int = 404, detail: str = NOT_FOUND) -> None:
         super(NotFoundException, self).__init__(status_code, detail)
+
+    @classmethod
+    def description(cls) -> str:
+        return NOT_FOUND
+
+
+class PreconditionFailedException(ExtendedHTTPException):
+    def __init__(
+        self, status_code: int = 412, detail: str = PRECONDITION_FAILED
+    ) -> None:
+        super(PreconditionFailedException, self).__init__(status_code, detail)
+
+    @classmethod
+    def description(cls) -> str:
+        return PRECONDITION_FAILED
+
+
+class ServiceUnavailableException(ExtendedHTTPException):
+    def __init__(
+        self, status_code: int = 503, detail: str = SERVICE_UNAVAILABLE
+    ) -> None:
+        super(ServiceUnavailableException, self).__init__(status_code, detail)
+
+    @classmethod
+    def description(cls) -> str:
+        return SERVICE_UNAVAILABLE
+
+
+class BulkOperationException(ExtendedHTTPException):
+    """
+    Errors of the particular items of the bulk operation,
+    as a list of `{"index": ..., "description": ...}`.
+    """
+
+    def __init__(
+        self,
+        status_code: int = 409,
+        detail: str = BULK_OPERATION_FAILED,
+        errors: List[Dict[str, Any]] = None,
+    ) -> None:
+        super(BulkOperationException, self).__init__(status_code, detail, errors)
+
+    @classmethod
+    def description(cls) -> str:
+        return BULK_OPERATION_FAILED
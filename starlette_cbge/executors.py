@@ -0,0 +1,157 @@
+"""
+Bounded pools for the sync handlers, see `BaseEndpoint.handler_executors`.
+
+Sync handlers run in the Starlette's shared thread pool by default,
+so a slow endpoint can take all of its threads. A pool of its own caps
+the threads and the queued calls of the endpoint:
+
+    reports_pool = ThreadPool("reports", max_workers=4, max_queue=16)
+
+    class Reports(PydanticBaseEndpoint):
+        handler_executors = (("GET", reports_pool),)
+
+        def get(self, data: Dict[str, Any]) -> Any:
+            ...
+
+With `max_workers` calls running and `max_queue` waiting, further requests
+are shed with `503 Service Unavailable` instead of queueing up.
+
+`ProcessPool` runs the CPU bound handlers in the worker processes,
+out of reach of the GIL. The endpoint instance stays in the server process,
+so the handler must be a `staticmethod` of the request data:
+
+    class Reports(PydanticBaseEndpoint):
+        handler_executors = (("GET", ProcessPool("reports", max_workers=2)),)
+
+        @staticmethod
+        def get(data: Dict[str, Any]) -> Any:
+            ...
+
+The handler gets the request data as loaded by the request schema,
+its return value is dumped with the response schema and encoded by the codec
+of the `JSONCodecResponse` in the worker process, so only the response body
+crosses the process boundary. The handler and the schema are pickled
+by reference, so they must be importable (eg. defined at the module level).
+If the endpoint overrides `acquire_response_context`, the raw response
+is sent back instead, the context is acquired and the response is dumped
+in the server process.
+
+Pools are created on the first call, `shutdown` them on the app shutdown.
+"""
+import asyncio
+import concurrent.futures
+
+from typing import Any, Callable, Dict, Optional
+
+from starlette_cbge.exceptions import ExecutorSaturated
+from starlette_cbge.interfaces import ExecutorInterface, JSONCodecInterface
+
+
+def call_in_process(
+    handler: Callable,
+    request_data: Any,
+    response_schema: Any = None,
+    codec: Optional[JSONCodecInterface] = None,
+) -> Any:
+    """
+    Runs in the worker process, the response is dumped by the response schema
+    and encoded by the codec, if they are given, before it's pickled back.
+    """
+    raw_response = handler(request_data)
+    if response_schema is None or raw_response is None:
+        return raw_response
+    response_data = response_schema.perform_dump(raw_response)
+    if codec is None:
+        return response_data
+    return codec.dumps(response_data)
+
+
+class BoundedExecutor(ExecutorInterface):
+    """
+    Pool of `max_workers` with up to `max_queue` calls waiting for them.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int = 0) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        # Calls submitted and not finished yet, both running and queued
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[concurrent.futures.Executor] = None
+
+    def create_executor(self) -> concurrent.futures.Executor:
+        raise NotImplementedError()
+
+    @property
+    def executor(self) -> concurrent.futures.Executor:
+        if self._executor is None:
+            self._executor = self.create_executor()
+        return self._executor
+
+    def release(self, future: "concurrent.futures.Future[Any]") -> None:
+        self.pending -= 1
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        if self.pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise ExecutorSaturated(self.name)
+
+        loop = asyncio.get_event_loop()
+        future = self.executor.submit(func, *args)
+        self.pending += 1
+        # Released once the call has finished, not when the request has given up
+        # waiting for it, a cancelled request doesn't stop the running call
+        future.add_done_callback(
+            lambda future: loop.call_soon_threadsafe(self.release, future)
+        )
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self.pending,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+class ThreadPool(BoundedExecutor):
+    def create_executor(self) -> concurrent.futures.Executor:
+        return concurrent.futures.ThreadPoolExecutor(
+            self.max_workers, thread_name_prefix=f"starlette-cbge-{self.name}"
+        )
+
+
+class ProcessPool(BoundedExecutor):
+    crosses_processes = True
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        max_queue: int = 0,
+        mp_context: Optional[Any] = None,
+    ) -> None:
+        super().__init__(name, max_workers, max_queue)
+        self.mp_context = mp_context
+
+    def create_executor(self) -> concurrent.futures.Executor:
+        return concurrent.futures.ProcessPoolExecutor(
+            self.max_workers, mp_context=self.mp_context
+        )
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        try:
+            return await super().run(func, *args)
+        except concurrent.futures.process.BrokenProcessPool:
+            # A worker has died (eg. killed for the memory), the next calls
+            # get a new pool instead of failing for good
+            self.shutdown(wait=False)
+            raise
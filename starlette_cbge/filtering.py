@@ -0,0 +1,207 @@
+"""
+Filtering and sorting of the collection endpoints, see `ListEndpoint.filtering`.
+
+The allowed fields and their operators are declared once:
+
+    filtering = Filtering(
+        {"id": ("eq", "in", "range"), "name": ("eq", "prefix")},
+        sort_fields=("id", "name"),
+        field_types={"id": int},
+    )
+
+and the query params are parsed to a `FilterQuery`:
+
+- `name=Author 1` - equality
+- `id__in=1,2,3` - membership, up to `max_in_values` comma separated values
+- `id__gte=1&id__lt=10` - range, `gt`, `gte`, `lt` and `lte` bounds
+- `name__prefix=Auth` - case sensitive prefix
+- `sort=-name,id` - order, `-` for the descending one
+
+The query is plain data, the model compiles it to a parameterized
+`WHERE ... ORDER BY ...` (see `DatabasesModel`), so the rows are filtered
+by the DB and the statements are cached per shape of the query, not per values.
+
+With `indexes` declared, the sorts not covered by one of them
+(the sort fields must be its prefix, in the same direction) are refused,
+so a client can't make the DB sort the whole table.
+"""
+import typing
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from starlette_cbge.exceptions import ImproperlyConfigured
+from starlette_cbge.interfaces import FilteringInterface
+
+
+OPERATORS = ("eq", "in", "range", "prefix")
+RANGE_OPERATORS = ("gt", "gte", "lt", "lte")
+
+
+class Condition(typing.NamedTuple):
+    field: str
+    operator: str  # `eq`, `in`, `prefix` or one of `RANGE_OPERATORS`
+    value: Any  # tuple of the values for `in`
+
+
+class FilterQuery(typing.NamedTuple):
+    conditions: Tuple[Condition, ...] = ()
+    sort: Tuple[Tuple[str, bool], ...] = ()  # fields and if they are descending
+
+    def shape(self) -> Tuple[Any, ...]:
+        """
+        The query without the values, the compiled statements are cached per shape.
+        """
+        conditions = tuple(
+            (
+                condition.field,
+                condition.operator,
+                len(condition.value) if condition.operator == "in" else 1,
+            )
+            for condition in self.conditions
+        )
+        return (conditions, self.sort)
+
+
+class Filtering(FilteringInterface):
+    def __init__(
+        self,
+        fields: Dict[str, Sequence[str]],
+        sort_fields: Sequence[str] = (),
+        field_types: Optional[Dict[str, Callable[[str], Any]]] = None,
+        indexes: Optional[Sequence[Sequence[str]]] = None,
+        sort_param: str = "sort",
+        max_in_values: int = 100,
+    ) -> None:
+        for field, operators in fields.items():
+            unknown = set(operators).difference(OPERATORS)
+            if unknown:
+                raise ImproperlyConfigured(
+                    f"Unknown operators of the {field} filter: "
+                    f"{', '.join(sorted(unknown))}."
+                )
+
+        self.fields = {field: tuple(operators) for field, operators in fields.items()}
+        self.sort_fields = tuple(sort_fields)
+        self.field_types = field_types or {}
+        self.indexes = (
+            None if indexes is None else tuple(tuple(index) for index in indexes)
+        )
+        self.sort_param = sort_param
+        self.max_in_values = max_in_values
+
+        # Query param per field and operator
+        self.params: Dict[str, Tuple[str, str]] = {}
+        for field, operators in self.fields.items():
+            for operator in operators:
+                if operator == "eq":
+                    self.params[field] = (field, "eq")
+                elif operator == "range":
+                    for bound in RANGE_OPERATORS:
+                        self.params[f"{field}__{bound}"] = (field, bound)
+                else:
+                    self.params[f"{field}__{operator}"] = (field, operator)
+
+        self.param_names = (*self.params, *((sort_param,) if sort_fields else ()))
+
+    def convert(self, field: str, value: str) -> Any:
+        try:
+            return self.field_types.get(field, str)(value)
+        except ValueError:
+            raise ValueError(f"Invalid {field} value")
+
+    def parse_condition(self, param: str, value: str) -> Condition:
+        field, operator = self.params[param]
+
+        if operator == "in":
+            values = tuple(
+                self.convert(field, item) for item in value.split(",") if item
+            )
+            if not values or len(values) > self.max_in_values:
+                raise ValueError(
+                    f"From 1 to {self.max_in_values} values of {param} are expected"
+                )
+            return Condition(field, operator, values)
+
+        if operator == "prefix" and (not value or value.endswith("\U0010ffff")):
+            raise ValueError(f"Invalid {param} value")
+
+        return Condition(field, operator, self.convert(field, value))
+
+    def parse_sort(self, value: str) -> Tuple[Tuple[str, bool], ...]:
+        sort = []
+        for item in value.split(","):
+            field = item.lstrip("-")
+            if field not in self.sort_fields:
+                raise ValueError(f"Sorting by {field or 'nothing'} is not allowed")
+            sort.append((field, item.startswith("-")))
+
+        fields = [field for field, _ in sort]
+        if len(set(fields)) != len(fields):
+            raise ValueError("Sort fields are repeated")
+
+        if self.indexes is not None:
+            covered = any(
+                tuple(fields) == index[: len(fields)] for index in self.indexes
+            )
+            uniform = len({descending for _, descending in sort}) == 1
+            if not (covered and uniform):
+                raise ValueError(f"Sorting by {value} is not supported")
+
+        return tuple(sort)
+
+    def parse(self, query_params: Dict[str, str]) -> Optional[FilterQuery]:
+        conditions = tuple(
+            self.parse_condition(param, query_params[param])
+            for param in self.params
+            if param in query_params
+        )
+
+        sort: Tuple[Tuple[str, bool], ...] = ()
+        if self.sort_fields and self.sort_param in query_params:
+            sort = self.parse_sort(query_params[self.sort_param])
+
+        if not conditions and not sort:
+            return None
+        return FilterQuery(conditions, sort)
+
+    def get_schema(self, field: str) -> Dict[str, Any]:
+        field_type = self.field_types.get(field, str)
+        if field_type is int:
+            return {"type": "integer"}
+        if field_type is float:
+            return {"type": "number"}
+        return {"type": "string"}
+
+    def openapi_parameters(self) -> List[Dict[str, Any]]:
+        parameters = []
+        for param, (field, operator) in self.params.items():
+            parameter = {
+                "name": param,
+                "in": "query",
+                "required": False,
+                "schema": self.get_schema(field),
+            }
+            if operator == "in":
+                parameter["schema"] = {"type": "string"}
+                parameter["description"] = (
+                    f"Comma separated values of {field}, "
+                    f"up to {self.max_in_values} of them."
+                )
+            elif operator == "prefix":
+                parameter["description"] = f"Case sensitive prefix of {field}."
+            parameters.append(parameter)
+
+        if self.sort_fields:
+            parameters.append(
+                {
+                    "name": self.sort_param,
+                    "in": "query",
+                    "required": False,
+                    "description": (
+                        "Comma separated sort fields, `-` for the descending order: "
+                        f"{', '.join(self.sort_fields)}."
+                    ),
+                    "schema": {"type": "string"},
+                }
+            )
+        return parameters
@@ -1,7 +1,31 @@
-from typing import Dict, List, Any
+from typing import Callable, ClassVar, Dict, List, Any, Optional, Sequence, Tuple
 
 
 class SchemaInterface:
+    # Dump projects the declared fields without validation, see `projection`
+    trusted_dump: ClassVar[bool] = False
+
+    @classmethod
+    def compile(cls) -> Optional[Callable[[Any], Dict[str, Any]]]:
+        """
+        Specialised validator generated for the schema, `None` if not supported.
+        """
+        return None
+
+    @classmethod
+    def field_keys(cls) -> List[str]:
+        """
+        Input keys of the declared fields, eg. the columns to select.
+        """
+        raise NotImplementedError()
+
+    @classmethod
+    def project(cls, keys: Sequence[str]) -> Any:
+        """
+        Schema restricted to the fields of the given keys, see `field_keys`.
+        """
+        raise NotImplementedError()
+
     @classmethod
     def perform_load(cls, data: Dict[str, Any]) -> Dict[str, Any]:
         raise NotImplementedError()
@@ -22,15 +46,57 @@ class SchemaInterface:
 
 
 class ListSchemaInterface:
+    trusted_dump: ClassVar[bool] = False
+
     @classmethod
-    def perform_load(cls, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def compile(cls) -> Optional[Callable[[Any], Dict[str, Any]]]:
+        """
+        Specialised validator of the list item, `None` if not supported.
+        """
+        return None
+
+    @classmethod
+    def field_keys(cls) -> List[str]:
+        """
+        Input keys of the item fields, eg. the columns to select.
+        """
+        raise NotImplementedError()
+
+    @classmethod
+    def project(cls, keys: Sequence[str]) -> Any:
+        """
+        List schema restricted to the item fields of the given keys.
+        """
+        raise NotImplementedError()
+
+    @classmethod
+    def perform_batch_validation(
+        cls, data: Sequence[Any], columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Validates the whole list at once, rows are mappings
+        or tuples along with the column names.
+        Errors are reported with the row indices.
+        """
+        raise NotImplementedError()
+
+    @classmethod
+    def perform_load(
+        cls, data: List[Any], columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
         raise NotImplementedError()
 
     def perform_loads(self, data: List[Dict[str, Any]]) -> str:
         raise NotImplementedError()
 
     @classmethod
-    def perform_dump(cls, data: List[Any]) -> List[Dict[str, Any]]:
+    def perform_dump(
+        cls, data: List[Any], columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        raise NotImplementedError()
+
+    @classmethod
+    def perform_dump_item(cls, data: Any) -> Dict[str, Any]:
         raise NotImplementedError()
 
     def perform_dumps(self, data: List[Any]) -> str:
@@ -46,19 +112,195 @@ class ValidationErrorInterface:
         raise NotImplementedError()
 
 
+class JSONCodecInterface:
+    name: str
+
+    def dumps(self, data: Any) -> bytes:
+        raise NotImplementedError()
+
+    def loads(self, data: bytes) -> Any:
+        raise NotImplementedError()
+
+
+class PaginationInterface:
+    # Query params consumed by the pagination, hidden from the request schema
+    param_names: Tuple[str, ...] = ()
+
+    def parse(self, query_params: Dict[str, str]) -> Any:
+        """
+        Page request out of the query params, raises `ValueError` if they are invalid.
+        """
+        raise NotImplementedError()
+
+    def paginate(self, rows: List[Any], page_request: Any) -> Any:
+        """
+        Page out of the fetched rows, with the query params of the next
+        and the previous pages.
+        """
+        raise NotImplementedError()
+
+    def openapi_parameters(self) -> List[Dict[str, Any]]:
+        raise NotImplementedError()
+
+
+class FilteringInterface:
+    # Query params consumed by the filtering, hidden from the request schema
+    param_names: Tuple[str, ...] = ()
+    sort_fields: Tuple[str, ...] = ()
+
+    def parse(self, query_params: Dict[str, str]) -> Any:
+        """
+        Filter query out of the query params, `None` if there's nothing to filter,
+        raises `ValueError` if they are invalid.
+        """
+        raise NotImplementedError()
+
+    def openapi_parameters(self) -> List[Dict[str, Any]]:
+        raise NotImplementedError()
+
+
+class TimingSinkInterface:
+    """
+    Consumer of the request phase timings, see `starlette_cbge.timing`.
+    Called in the request task once the response is ready, so it must be cheap.
+    """
+
+    def record(
+        self, endpoint: str, method: str, status_code: int, timer: Any, total: float
+    ) -> None:
+        """
+        Records the durations of the finished `PhaseTimer` and the total seconds.
+        """
+        raise NotImplementedError()
+
+
+class ExecutorInterface:
+    """
+    Bounded pool the sync handlers run in, see `starlette_cbge.executors`.
+    """
+
+    name: str
+    # The calls run in the other processes, so the endpoint instance isn't passed
+    crosses_processes: ClassVar[bool] = False
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        """
+        Runs the call in the pool and returns its result,
+        raises `ExecutorSaturated` if the pool and its queue are full.
+        """
+        raise NotImplementedError()
+
+
+class CacheBackendInterface:
+    """
+    Storage of the encoded responses, see `starlette_cbge.caching`.
+
+    Keys include the namespace version, so `invalidate` only has to bump it,
+    the stale entries are never read again and expire on their own.
+    """
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Returns the stored value, `None` if it's missing or expired.
+        """
+        raise NotImplementedError()
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        """
+        Stores the value for `ttl` seconds.
+        """
+        raise NotImplementedError()
+
+    async def get_version(self, namespace: str) -> int:
+        """
+        Current version of the namespace, `0` if it was never invalidated.
+        """
+        raise NotImplementedError()
+
+    async def invalidate(self, namespace: str) -> None:
+        """
+        Bumps the version of the namespace, so all of its entries become stale.
+        """
+        raise NotImplementedError()
+
+
 class SchemaGeneratorInterface:
     pass
 
 
 class ModelInterface:
-    async def create(self) -> None:
+    async def create(self, values: Dict[str, Any]) -> Any:
+        """
+        Creates the record and returns it.
+        """
+        raise NotImplementedError()
+
+    async def read(
+        self, values: Dict[str, Any], fields: Optional[Sequence[str]] = None
+    ) -> Optional[Any]:
+        """
+        Returns the record identified by the primary key, `None` if it doesn't exist.
+        `fields` limits the returned fields (eg. a sparse fieldset), all by default.
+        """
+        raise NotImplementedError()
+
+    async def read_many(
+        self,
+        values: Dict[str, Any],
+        fields: Optional[Sequence[str]] = None,
+        query: Optional[Any] = None,
+    ) -> List[Any]:
+        """
+        Returns the records limited with `limit` and `offset`,
+        `query` filters and sorts them, see `starlette_cbge.filtering`.
+        """
+        raise NotImplementedError()
+
+    async def read_in(self, column: str, keys: Sequence[Any]) -> List[Any]:
+        """
+        Returns the records with the column value in the keys,
+        eg. the batch load of a dataloader, see `starlette_cbge.dataloader`.
+        """
+        raise NotImplementedError()
+
+    async def read_page(
+        self,
+        values: Dict[str, Any],
+        page_request: Any,
+        fields: Optional[Sequence[str]] = None,
+        query: Optional[Any] = None,
+    ) -> List[Any]:
+        """
+        Returns up to `limit + 1` records of the page in the seek order,
+        so the pagination can tell if there are more of them, see `pagination`.
+        """
+        raise NotImplementedError()
+
+    async def update(self, values: Dict[str, Any]) -> Optional[Any]:
+        """
+        Updates the given fields of the record identified by the primary key
+        and returns it, `None` if it doesn't exist.
+        """
         raise NotImplementedError()
 
-    async def read(self) -> None:
+    async def delete(self, values: Dict[str, Any]) -> bool:
+        """
+        Deletes the record identified by the primary key, `False` if it doesn't exist.
+        """
         raise NotImplementedError()
 
-    async def update(self) -> None:
+    async def create_many(self, values: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Creates all the records in one transaction and returns them in the same order.
+        Raises `BulkOperationException` with the failed item indices,
+        nothing is created in this case.
+        """
         raise NotImplementedError()
 
-    async def delete(self) -> None:
+    async def update_many(self, values: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Updates all the records in one transaction and returns them in the same order.
+        Raises `BulkOperationException` with the failed item indices,
+        nothing is updated in this case.
+        """
         raise NotImplementedError()
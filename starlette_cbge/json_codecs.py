@@ -0,0 +1,148 @@
+"""
+JSON codecs used for the request body decoding and the response encoding.
+
+The default codec is picked by availability: `orjson`, then `ujson`,
+then the standard library `json` module.
+It can be changed app-wide with `set_json_codec`
+or per endpoint with the `json_codec` attribute.
+"""
+
+import datetime
+import decimal
+import json
+import typing
+import uuid
+
+from typing import Any, Optional
+
+from starlette.responses import Response
+
+from starlette_cbge.interfaces import JSONCodecInterface
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
+try:
+    import ujson
+except ImportError:
+    ujson = None  # type: ignore
+
+
+def encode_default(obj: Any) -> Any:
+    """
+    Fallback for types that are not supported by the codec natively.
+    """
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+
+class StdlibJSONCodec(JSONCodecInterface):
+    name = "json"
+
+    def dumps(self, data: Any) -> bytes:
+        return json.dumps(
+            data, ensure_ascii=False, separators=(",", ":"), default=encode_default
+        ).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class UjsonCodec(JSONCodecInterface):
+    name = "ujson"
+
+    def __init__(self) -> None:
+        assert ujson is not None, "`ujson` must be installed to use UjsonCodec."
+
+    def dumps(self, data: Any) -> bytes:
+        # `default` is called for the unsupported values only, eg. datetime and UUID
+        # (ujson >= 4.2, the older ones encode datetime as the epoch number)
+        return ujson.dumps(data, ensure_ascii=False, default=encode_default).encode(
+            "utf-8"
+        )
+
+    def loads(self, data: bytes) -> Any:
+        return ujson.loads(data)
+
+
+class OrjsonCodec(JSONCodecInterface):
+    name = "orjson"
+
+    def __init__(self) -> None:
+        assert orjson is not None, "`orjson` must be installed to use OrjsonCodec."
+
+    def dumps(self, data: Any) -> bytes:
+        # datetime and UUID are supported natively,
+        # `default` is called for the rest only, eg. Decimal
+        try:
+            return orjson.dumps(data, default=encode_default)
+        except TypeError:
+            # Non str keys, eg. row indices of errors, the option is slower
+            return orjson.dumps(
+                data, default=encode_default, option=orjson.OPT_NON_STR_KEYS
+            )
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+def get_available_codec() -> JSONCodecInterface:
+    """
+    The fastest codec out of installed ones.
+    """
+    if orjson is not None:
+        return OrjsonCodec()
+    if ujson is not None:
+        return UjsonCodec()
+    return StdlibJSONCodec()
+
+
+_json_codec: Optional[JSONCodecInterface] = None
+
+
+def get_json_codec() -> JSONCodecInterface:
+    """
+    App-wide JSON codec.
+    """
+    global _json_codec
+    if _json_codec is None:
+        _json_codec = get_available_codec()
+    return _json_codec
+
+
+def set_json_codec(codec: Optional[JSONCodecInterface]) -> None:
+    """
+    Sets the app-wide JSON codec, `None` restores the default one.
+    """
+    global _json_codec
+    _json_codec = codec
+
+
+class JSONCodecResponse(Response):
+    """
+    JSON response encoded with the class codec or the app-wide one.
+    """
+
+    media_type = "application/json"
+    codec: Optional[JSONCodecInterface] = None
+
+    def render(self, content: Any) -> bytes:
+        return (self.codec or get_json_codec()).dumps(content)
+
+    @classmethod
+    def with_codec(
+        cls, codec: Optional[JSONCodecInterface]
+    ) -> typing.Type["JSONCodecResponse"]:
+        """
+        Response class bound to the particular codec.
+        """
+        if codec is None or codec is cls.codec:
+            return cls
+        return type(cls.__name__, (cls,), {"codec": codec})
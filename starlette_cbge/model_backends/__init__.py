@@ -0,0 +1 @@
+from starlette_cbge.model_backends.databases import DatabasesModel
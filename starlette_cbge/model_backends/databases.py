@@ -0,0 +1,548 @@
+"""
+Generic CRUD model on top of `databases`.
+
+The SQL is generated out of the table, the primary key and the schema fields
+once per model class (and per set of the written columns) and cached,
+so a call costs a single execution of a ready statement.
+Rows are returned as they come from the driver (`sqlite3.Row`, `databases` records),
+the schemas consume such mappings without conversion.
+The writes return the rows with `RETURNING`, SQLite 3.35 or later is required.
+
+With SQLite the statements are executed on the raw `aiosqlite` connection:
+the SQL strings are stable, so `sqlite3` reuses the prepared statements
+from its per connection cache and the SQLAlchemy query compilation is skipped.
+Other backends go through the `databases` connection.
+
+Filter queries (see `starlette_cbge.filtering`) are compiled to the parameterized
+`WHERE` and `ORDER BY` clauses, cached per shape of the query like the rest.
+"""
+import itertools
+import sqlite3
+import typing
+
+from typing import Any, ClassVar, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import aiosqlite
+except ImportError:
+    aiosqlite = None  # type: ignore
+
+from starlette_cbge.exceptions import BulkOperationException, ImproperlyConfigured
+from starlette_cbge.interfaces import ModelInterface
+
+
+# Keeps the number of the statement parameters below the SQLite limit
+MAX_PARAMETERS = 999
+
+# `RETURNING` of the writes is supported since SQLite 3.35
+SQLITE_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+COMPARISONS = {"eq": "=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+class Statement(typing.NamedTuple):
+    sql: str
+    keys: Tuple[str, ...]  # keys of the bound values, repeated per row
+
+    def bind(self, *rows: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Statement parameters out of the values of the rows.
+        """
+        params = [row[key] for row in rows for key in self.keys]
+        return {f"p{index}": param for index, param in enumerate(params)}
+
+
+def quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def placeholders(count: int, start: int = 0) -> str:
+    return ", ".join(f":p{index}" for index in range(start, start + count))
+
+
+async def fetch_all(connection: Any, sql: str, params: Dict[str, Any]) -> List[Any]:
+    raw_connection = connection.raw_connection
+    if aiosqlite is not None and isinstance(raw_connection, aiosqlite.Connection):
+        if not SQLITE_RETURNING:
+            raise ImproperlyConfigured(
+                f"DatabasesModel requires SQLite 3.35 or later, "
+                f"found {sqlite3.sqlite_version}."
+            )
+        if raw_connection.row_factory is not sqlite3.Row:
+            raw_connection.row_factory = sqlite3.Row
+        return list(await raw_connection.execute_fetchall(sql, params))
+    return await connection.fetch_all(sql, params)
+
+
+async def execute_many(connection: Any, sql: str, params: List[Dict[str, Any]]) -> None:
+    raw_connection = connection.raw_connection
+    if aiosqlite is not None and isinstance(raw_connection, aiosqlite.Connection):
+        await raw_connection.executemany(sql, params)
+    else:
+        await connection.execute_many(sql, params)
+
+
+def get_query_values(query: Any) -> Dict[str, Any]:
+    """
+    Values of the filter query conditions, keyed as the compiled statement expects,
+    see `DatabasesModel.build_conditions`.
+    """
+    values = {}
+    for field, operator, value in query.conditions:
+        key = f"{field}__{operator}"
+        if operator == "in":
+            for index, item in enumerate(value):
+                values[f"{key}__{index}"] = item
+        elif operator == "prefix":
+            # Range of the strings starting with the prefix, it can use an index
+            values[key] = value
+            values[f"{key}__end"] = value[:-1] + chr(ord(value[-1]) + 1)
+        else:
+            values[key] = value
+    return values
+
+
+def chunks(items: Sequence[Any], size: int) -> typing.Iterator[Sequence[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+class DatabasesModel(ModelInterface):
+    """
+    Records of a single table with a single column primary key.
+
+    Columns are the fields of `schema` (eg. the item response schema),
+    unless `columns` are declared explicitly.
+    """
+
+    database: ClassVar[Any]  # `databases.Database`
+    table: ClassVar[str]
+    schema: ClassVar[Any] = None
+    columns: ClassVar[Sequence[str]] = ()
+    primary_key: ClassVar[str] = "id"
+    default_limit: ClassVar[int] = 100
+
+    # Errors reported per item by the bulk operations, the rest is propagated
+    integrity_errors: ClassVar[Tuple[typing.Type[Exception], ...]] = (
+        sqlite3.DatabaseError,
+    )
+
+    @classmethod
+    def get_columns(cls) -> Tuple[str, ...]:
+        """
+        Selected columns, cached on the model class on the first use.
+        """
+        try:
+            return cls.__dict__["_columns"]
+        except KeyError:
+            pass
+
+        columns = tuple(cls.columns or cls.schema.field_keys())
+        assert columns, f"{cls.__name__} must declare `schema` or `columns`."
+        setattr(cls, "_columns", columns)
+        return columns
+
+    @classmethod
+    def get_write_columns(cls, values: Dict[str, Any]) -> Tuple[str, ...]:
+        """
+        Known columns present in the values, the primary key is excluded.
+        """
+        return tuple(
+            column
+            for column in cls.get_columns()
+            if column in values and column != cls.primary_key
+        )
+
+    @classmethod
+    def get_insert_columns(cls, values: Dict[str, Any]) -> Tuple[str, ...]:
+        """
+        Write columns with the primary key, if it is given.
+        """
+        columns = cls.get_write_columns(values)
+        if cls.primary_key in values:
+            columns = (cls.primary_key, *columns)
+        return columns
+
+    @classmethod
+    def get_selected_columns(
+        cls, fields: Optional[Sequence[str]], *required: str
+    ) -> Tuple[str, ...]:
+        """
+        Columns of the requested fields (eg. a sparse fieldset) in the declared order,
+        with the primary key and the `required` ones (eg. the sort keys).
+        Empty for all the columns.
+        """
+        if fields is None:
+            return ()
+        selected = {*fields, cls.primary_key, *required}
+        return tuple(column for column in cls.get_columns() if column in selected)
+
+    @classmethod
+    def build_conditions(
+        cls, conditions: Tuple[Tuple[str, str, int], ...]
+    ) -> Tuple[List[str], Tuple[str, ...]]:
+        """
+        Predicates of the filter query conditions, by their fields, operators
+        and numbers of values, with the placeholders from `:p0`,
+        and the keys of the bound values, see `get_query_values`.
+        """
+        predicates = []
+        keys: List[str] = []
+        for field, operator, count in conditions:
+            column = quote(field)
+            key = f"{field}__{operator}"
+            if operator == "in":
+                predicates.append(f"{column} IN ({placeholders(count, len(keys))})")
+                keys.extend(f"{key}__{index}" for index in range(count))
+            elif operator == "prefix":
+                predicates.append(
+                    f"{column} >= :p{len(keys)} AND {column} < :p{len(keys) + 1}"
+                )
+                keys.extend((key, f"{key}__end"))
+            else:
+                predicates.append(f"{column} {COMPARISONS[operator]} :p{len(keys)}")
+                keys.append(key)
+        return predicates, tuple(keys)
+
+    @classmethod
+    def build_statement(
+        cls,
+        kind: str,
+        columns: Tuple[str, ...],
+        rows: int,
+        selected_columns: Tuple[str, ...] = (),
+        query_shape: Tuple[Any, ...] = (),
+    ) -> Statement:
+        table = quote(cls.table)
+        primary_key = quote(cls.primary_key)
+        selected = ", ".join(
+            quote(column) for column in selected_columns or cls.get_columns()
+        )
+        # Shape of the filter query, see `FilterQuery.shape`
+        conditions, sort = query_shape or ((), ())
+        predicates, filter_keys = cls.build_conditions(conditions)
+        start = len(filter_keys)
+
+        if kind == "select":
+            sql = f"SELECT {selected} FROM {table} WHERE {primary_key} = :p0"
+            return Statement(sql, (cls.primary_key,))
+
+        if kind == "select_many":
+            where = f" WHERE {' AND '.join(predicates)}" if predicates else ""
+            order_by = primary_key
+            if sort:
+                order_by = ", ".join(
+                    f"{quote(field)} {'DESC' if descending else 'ASC'}"
+                    for field, descending in sort
+                )
+                if cls.primary_key not in (field for field, _ in sort):
+                    # The order must be total, or the offset pages overlap
+                    order_by += f", {primary_key} ASC"
+            sql = (
+                f"SELECT {selected} FROM {table}{where} ORDER BY {order_by} "
+                f"LIMIT :p{start} OFFSET :p{start + 1}"
+            )
+            return Statement(sql, (*filter_keys, "limit", "offset"))
+
+        if kind in ("select_first", "select_after", "select_before"):
+            # Keyset pagination, the sort keys are passed as `columns`
+            keys = ", ".join(quote(column) for column in columns)
+            order = "DESC" if kind == "select_before" else "ASC"
+            order_by = ", ".join(f"{quote(column)} {order}" for column in columns)
+            if kind == "select_first":
+                where = f"WHERE {' AND '.join(predicates)} " if predicates else ""
+                sql = (
+                    f"SELECT {selected} FROM {table} {where}"
+                    f"ORDER BY {order_by} LIMIT :p{start}"
+                )
+                return Statement(sql, (*filter_keys, "limit"))
+
+            operator = "<" if kind == "select_before" else ">"
+            if len(columns) > 1:
+                # Row value comparison, matches a composite index on the sort keys
+                predicate = f"({keys}) {operator} ({placeholders(len(columns), start)})"
+            else:
+                predicate = f"{keys} {operator} :p{start}"
+            sql = (
+                f"SELECT {selected} FROM {table} "
+                f"WHERE {' AND '.join((*predicates, predicate))} "
+                f"ORDER BY {order_by} LIMIT :p{start + len(columns)}"
+            )
+            return Statement(sql, (*filter_keys, *columns, "limit"))
+
+        if kind == "select_where_in":
+            # Look up by a non unique column, eg. the foreign key
+            column = quote(columns[0])
+            sql = (
+                f"SELECT {selected} FROM {table} "
+                f"WHERE {column} IN ({placeholders(rows)}) ORDER BY {primary_key}"
+            )
+            return Statement(sql, columns)
+
+        if kind in ("select_in", "select_keys_in"):
+            if kind == "select_keys_in":
+                selected = primary_key
+            sql = (
+                f"SELECT {selected} FROM {table} "
+                f"WHERE {primary_key} IN ({placeholders(rows)})"
+            )
+            return Statement(sql, (cls.primary_key,))
+
+        if kind == "insert":
+            inserted = ", ".join(quote(column) for column in columns)
+            rows_values = ", ".join(
+                f"({placeholders(len(columns), row * len(columns))})"
+                for row in range(rows)
+            )
+            sql = (
+                f"INSERT INTO {table} ({inserted}) VALUES {rows_values} "
+                f"RETURNING {selected}"
+            )
+            return Statement(sql, columns)
+
+        if kind in ("update", "update_many"):
+            assignments = ", ".join(
+                f"{quote(column)} = :p{index}" for index, column in enumerate(columns)
+            )
+            sql = (
+                f"UPDATE {table} SET {assignments} "
+                f"WHERE {primary_key} = :p{len(columns)}"
+            )
+            if kind == "update":
+                sql += f" RETURNING {selected}"
+            return Statement(sql, (*columns, cls.primary_key))
+
+        if kind == "delete":
+            sql = (
+                f"DELETE FROM {table} WHERE {primary_key} = :p0 RETURNING {primary_key}"
+            )
+            return Statement(sql, (cls.primary_key,))
+
+        raise ValueError(f"Unknown statement kind: {kind}")
+
+    @classmethod
+    def get_statement(
+        cls,
+        kind: str,
+        columns: Tuple[str, ...] = (),
+        rows: int = 1,
+        selected_columns: Tuple[str, ...] = (),
+        query_shape: Tuple[Any, ...] = (),
+    ) -> Statement:
+        """
+        Statement cached on the model class on the first use.
+        """
+        try:
+            statements = cls.__dict__["_statements"]
+        except KeyError:
+            statements = {}
+            setattr(cls, "_statements", statements)
+
+        key = (kind, columns, rows, selected_columns, query_shape)
+        try:
+            return statements[key]
+        except KeyError:
+            statement = statements[key] = cls.build_statement(
+                kind, columns, rows, selected_columns, query_shape
+            )
+            return statement
+
+    async def fetch(self, statement: Statement, *rows: Dict[str, Any]) -> List[Any]:
+        async with self.database.connection() as connection:
+            return await fetch_all(connection, statement.sql, statement.bind(*rows))
+
+    async def create(self, values: Dict[str, Any]) -> Any:
+        columns = self.get_insert_columns(values)
+        rows = await self.fetch(self.get_statement("insert", columns), values)
+        return rows[0]
+
+    async def read(
+        self, values: Dict[str, Any], fields: Optional[Sequence[str]] = None
+    ) -> Optional[Any]:
+        statement = self.get_statement(
+            "select", selected_columns=self.get_selected_columns(fields)
+        )
+        rows = await self.fetch(statement, values)
+        return rows[0] if rows else None
+
+    async def read_many(
+        self,
+        values: Dict[str, Any],
+        fields: Optional[Sequence[str]] = None,
+        query: Optional[Any] = None,
+    ) -> List[Any]:
+        page = {
+            "limit": values.get("limit", self.default_limit),
+            "offset": values.get("offset", 0),
+        }
+        query_shape = ()
+        if query is not None:
+            query_shape = query.shape()
+            page.update(get_query_values(query))
+        statement = self.get_statement(
+            "select_many",
+            selected_columns=self.get_selected_columns(fields),
+            query_shape=query_shape,
+        )
+        return await self.fetch(statement, page)
+
+    async def read_page(
+        self,
+        values: Dict[str, Any],
+        page_request: Any,
+        fields: Optional[Sequence[str]] = None,
+        query: Optional[Any] = None,
+    ) -> List[Any]:
+        limit = page_request.limit + 1
+        sort_keys = page_request.sort_keys
+        selected_columns = self.get_selected_columns(fields, *sort_keys)
+        query_shape = () if query is None else query.shape()
+        query_values = {} if query is None else get_query_values(query)
+
+        if not sort_keys:
+            page = {"limit": limit, "offset": page_request.offset, **query_values}
+            statement = self.get_statement(
+                "select_many",
+                selected_columns=selected_columns,
+                query_shape=query_shape,
+            )
+            return await self.fetch(statement, page)
+
+        if page_request.after is not None:
+            kind = "select_after"
+            page = dict(zip(sort_keys, page_request.after), limit=limit)
+        elif page_request.before is not None:
+            kind = "select_before"
+            page = dict(zip(sort_keys, page_request.before), limit=limit)
+        else:
+            kind = "select_first"
+            page = {"limit": limit}
+
+        statement = self.get_statement(
+            kind, sort_keys, selected_columns=selected_columns, query_shape=query_shape,
+        )
+        return await self.fetch(statement, {**page, **query_values})
+
+    async def read_in(self, column: str, keys: Sequence[Any]) -> List[Any]:
+        """
+        A query per `MAX_PARAMETERS` keys, the rows are ordered by the primary key.
+        """
+        rows: List[Any] = []
+        async with self.database.connection() as connection:
+            for chunk in chunks(keys, MAX_PARAMETERS):
+                statement = self.get_statement("select_where_in", (column,), len(chunk))
+                params = statement.bind(*({column: key} for key in chunk))
+                rows.extend(await fetch_all(connection, statement.sql, params))
+        return rows
+
+    async def update(self, values: Dict[str, Any]) -> Optional[Any]:
+        columns = self.get_write_columns(values)
+        if not columns:
+            return await self.read(values)
+        rows = await self.fetch(self.get_statement("update", columns), values)
+        return rows[0] if rows else None
+
+    async def delete(self, values: Dict[str, Any]) -> bool:
+        rows = await self.fetch(self.get_statement("delete"), values)
+        return bool(rows)
+
+    async def create_many(self, values: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Multi-row INSERT per chunk, all in one transaction.
+        The chunks are taken from the runs of the items with the same columns,
+        so the rows are returned in the order of the items.
+        If a chunk fails, its rows are inserted one by one to find the failed ones.
+        """
+        if not values:
+            return []
+
+        rows: List[Any] = []
+        errors = []
+        runs = itertools.groupby(
+            enumerate(values), key=lambda pair: self.get_insert_columns(pair[1])
+        )
+        async with self.database.connection() as connection:
+            async with connection.transaction():
+                for columns, run in runs:
+                    chunk_size = MAX_PARAMETERS // max(len(columns), 1)
+                    for chunk in chunks(list(run), chunk_size):
+                        statement = self.get_statement("insert", columns, len(chunk))
+                        params = statement.bind(*(item for _, item in chunk))
+                        try:
+                            # Savepoint, the transaction survives the failed chunk
+                            async with connection.transaction():
+                                rows.extend(
+                                    await fetch_all(connection, statement.sql, params)
+                                )
+                            continue
+                        except self.integrity_errors:
+                            pass
+
+                        statement = self.get_statement("insert", columns)
+                        for index, item in chunk:
+                            try:
+                                async with connection.transaction():
+                                    rows.extend(
+                                        await fetch_all(
+                                            connection,
+                                            statement.sql,
+                                            statement.bind(item),
+                                        )
+                                    )
+                            except self.integrity_errors as exc:
+                                errors.append({"index": index, "description": str(exc)})
+
+                if errors:
+                    # Rolls the transaction back
+                    raise BulkOperationException(errors=errors)
+
+        return rows
+
+    async def update_many(self, values: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Missing records are checked with a query per chunk of keys,
+        then the records are updated with an `executemany` per set of the columns.
+        """
+        if not values:
+            return []
+
+        keys = [item[self.primary_key] for item in values]
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for item in values:
+            groups.setdefault(self.get_write_columns(item), []).append(item)
+
+        async with self.database.connection() as connection:
+            async with connection.transaction():
+                existing_keys = set()
+                for chunk in chunks(keys, MAX_PARAMETERS):
+                    statement = self.get_statement("select_keys_in", rows=len(chunk))
+                    params = statement.bind(*({self.primary_key: key} for key in chunk))
+                    for row in await fetch_all(connection, statement.sql, params):
+                        existing_keys.add(row[self.primary_key])
+
+                errors = [
+                    {"index": index, "description": "Not found"}
+                    for index, key in enumerate(keys)
+                    if key not in existing_keys
+                ]
+                if errors:
+                    raise BulkOperationException(errors=errors)
+
+                for columns, items in groups.items():
+                    if not columns:
+                        continue
+                    statement = self.get_statement("update_many", columns)
+                    await execute_many(
+                        connection,
+                        statement.sql,
+                        [statement.bind(item) for item in items],
+                    )
+
+                rows = {}
+                for chunk in chunks(keys, MAX_PARAMETERS):
+                    statement = self.get_statement("select_in", rows=len(chunk))
+                    params = statement.bind(*({self.primary_key: key} for key in chunk))
+                    for row in await fetch_all(connection, statement.sql, params):
+                        rows[row[self.primary_key]] = row
+
+        return [rows[key] for key in keys]
@@ -0,0 +1,276 @@
+"""
+Pagination strategies of the collection endpoints.
+
+- `OffsetPagination` - `limit` and `offset`, the DB still walks through
+  all the skipped rows, so deep pages get slower.
+- `KeysetPagination` - seeks past the last seen row with
+  `WHERE (sort_key, id) > (...)`, every page costs the same with an index
+  on the sort keys. The keys are visible query params, eg. `after_id=3`.
+- `CursorPagination` - the same seek with the keys packed to an opaque `cursor`.
+
+The last sort key must be unique (eg. the primary key), so the order is total.
+The model fetches `limit + 1` rows to tell if there is a next page,
+no extra count query is needed.
+"""
+import base64
+import json
+import typing
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from starlette_cbge.interfaces import PaginationInterface
+from starlette_cbge.json_codecs import encode_default
+
+
+# JSON scalars, bound as the statement parameters as they are
+CURSOR_VALUE_TYPES = (str, int, float, bool, type(None))
+
+
+class PageRequest(typing.NamedTuple):
+    limit: int
+    offset: int = 0
+    sort_keys: Tuple[str, ...] = ()  # empty for the offset pagination
+    after: Optional[Tuple[Any, ...]] = None
+    before: Optional[Tuple[Any, ...]] = None
+
+
+class Page(typing.NamedTuple):
+    items: List[Any]
+    next: Optional[Dict[str, str]]  # query params of the next page
+    prev: Optional[Dict[str, str]]
+
+
+class BasePagination(PaginationInterface):
+    def __init__(self, default_limit: int = 100, max_limit: int = 1000) -> None:
+        self.default_limit = default_limit
+        self.max_limit = max_limit
+
+    def parse_limit(self, query_params: Dict[str, str]) -> int:
+        try:
+            limit = int(query_params.get("limit", self.default_limit))
+        except ValueError:
+            raise ValueError("Invalid limit")
+        if limit < 1:
+            raise ValueError("Invalid limit")
+        return min(limit, self.max_limit)
+
+    def openapi_parameters(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "name": "limit",
+                "in": "query",
+                "required": False,
+                "schema": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "maximum": self.max_limit,
+                    "default": self.default_limit,
+                },
+            }
+        ]
+
+
+class OffsetPagination(BasePagination):
+    param_names = ("limit", "offset")
+
+    def parse(self, query_params: Dict[str, str]) -> PageRequest:
+        try:
+            offset = int(query_params.get("offset", 0))
+        except ValueError:
+            raise ValueError("Invalid offset")
+        if offset < 0:
+            raise ValueError("Invalid offset")
+        return PageRequest(limit=self.parse_limit(query_params), offset=offset)
+
+    def paginate(self, rows: List[Any], page_request: PageRequest) -> Page:
+        limit, offset = page_request.limit, page_request.offset
+
+        next_params = None
+        if len(rows) > limit:
+            next_params = {"limit": str(limit), "offset": str(offset + limit)}
+
+        prev_params = None
+        if offset > 0:
+            prev_params = {"limit": str(limit), "offset": str(max(offset - limit, 0))}
+
+        return Page(rows[:limit], next_params, prev_params)
+
+    def openapi_parameters(self) -> List[Dict[str, Any]]:
+        return [
+            *super().openapi_parameters(),
+            {
+                "name": "offset",
+                "in": "query",
+                "required": False,
+                "schema": {"type": "integer", "minimum": 0, "default": 0},
+            },
+        ]
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keys are passed as `after_{key}` for the next pages
+    and `before_{key}` for the previous ones, converted with `key_types` (str by default).
+    """
+
+    def __init__(
+        self,
+        sort_keys: Sequence[str] = ("id",),
+        key_types: Optional[Dict[str, Callable[[str], Any]]] = None,
+        default_limit: int = 100,
+        max_limit: int = 1000,
+    ) -> None:
+        super().__init__(default_limit, max_limit)
+        self.sort_keys = tuple(sort_keys)
+        self.key_types = key_types or {}
+        self.param_names = (
+            "limit",
+            *(f"after_{key}" for key in self.sort_keys),
+            *(f"before_{key}" for key in self.sort_keys),
+        )
+
+    def parse_keys(
+        self, query_params: Dict[str, str], prefix: str
+    ) -> Optional[Tuple[Any, ...]]:
+        names = [f"{prefix}_{key}" for key in self.sort_keys]
+        present = [name in query_params for name in names]
+        if not any(present):
+            return None
+        if not all(present):
+            raise ValueError(f"All of {', '.join(names)} are expected")
+
+        try:
+            return tuple(
+                self.key_types.get(key, str)(query_params[name])
+                for key, name in zip(self.sort_keys, names)
+            )
+        except ValueError:
+            raise ValueError(f"Invalid {prefix} keys")
+
+    def build_request(
+        self,
+        limit: int,
+        after: Optional[Tuple[Any, ...]],
+        before: Optional[Tuple[Any, ...]],
+    ) -> PageRequest:
+        if after is not None and before is not None:
+            raise ValueError("Either the next or the previous page is expected")
+        return PageRequest(
+            limit=limit, sort_keys=self.sort_keys, after=after, before=before
+        )
+
+    def parse(self, query_params: Dict[str, str]) -> PageRequest:
+        return self.build_request(
+            self.parse_limit(query_params),
+            self.parse_keys(query_params, "after"),
+            self.parse_keys(query_params, "before"),
+        )
+
+    def get_keys(self, row: Any) -> Tuple[Any, ...]:
+        return tuple(row[key] for key in self.sort_keys)
+
+    def encode_keys(
+        self, limit: int, prefix: str, keys: Tuple[Any, ...]
+    ) -> Dict[str, str]:
+        params = {"limit": str(limit)}
+        for key, value in zip(self.sort_keys, keys):
+            params[f"{prefix}_{key}"] = str(value)
+        return params
+
+    def paginate(self, rows: List[Any], page_request: PageRequest) -> Page:
+        limit = page_request.limit
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        if page_request.before is not None:
+            # Fetched backwards
+            rows.reverse()
+            has_next, has_prev = True, has_more
+        else:
+            has_next, has_prev = has_more, page_request.after is not None
+
+        next_params = None
+        if has_next and rows:
+            next_params = self.encode_keys(limit, "after", self.get_keys(rows[-1]))
+
+        prev_params = None
+        if has_prev and rows:
+            prev_params = self.encode_keys(limit, "before", self.get_keys(rows[0]))
+
+        return Page(rows, next_params, prev_params)
+
+    def openapi_parameters(self) -> List[Dict[str, Any]]:
+        parameters = super().openapi_parameters()
+        for prefix in ("after", "before"):
+            for key in self.sort_keys:
+                key_type = self.key_types.get(key, str)
+                parameters.append(
+                    {
+                        "name": f"{prefix}_{key}",
+                        "in": "query",
+                        "required": False,
+                        "schema": {"type": "integer" if key_type is int else "string"},
+                    }
+                )
+        return parameters
+
+
+class CursorPagination(KeysetPagination):
+    """
+    Keys are packed to an opaque `cursor`, the values keep the JSON types.
+    The cursor names the sort keys, so the one of another order is rejected.
+    """
+
+    def __init__(
+        self,
+        sort_keys: Sequence[str] = ("id",),
+        default_limit: int = 100,
+        max_limit: int = 1000,
+    ) -> None:
+        super().__init__(sort_keys, default_limit=default_limit, max_limit=max_limit)
+        self.param_names = ("limit", "cursor")
+
+    def parse(self, query_params: Dict[str, str]) -> PageRequest:
+        limit = self.parse_limit(query_params)
+        cursor = query_params.get("cursor")
+        if not cursor:
+            return self.build_request(limit, None, None)
+
+        try:
+            padding = "=" * (-len(cursor) % 4)
+            direction, keys = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+        if direction not in ("after", "before") or not isinstance(keys, dict):
+            raise ValueError("Invalid cursor")
+        if set(keys) != set(self.sort_keys):
+            raise ValueError("Invalid cursor")
+        values = tuple(keys[key] for key in self.sort_keys)
+        if not all(isinstance(value, CURSOR_VALUE_TYPES) for value in values):
+            raise ValueError("Invalid cursor")
+
+        if direction == "after":
+            return self.build_request(limit, values, None)
+        return self.build_request(limit, None, values)
+
+    def encode_keys(
+        self, limit: int, prefix: str, keys: Tuple[Any, ...]
+    ) -> Dict[str, str]:
+        data = json.dumps(
+            [prefix, dict(zip(self.sort_keys, keys))],
+            separators=(",", ":"),
+            default=encode_default,
+        )
+        cursor = base64.urlsafe_b64encode(data.encode("utf-8")).rstrip(b"=")
+        return {"limit": str(limit), "cursor": cursor.decode("ascii")}
+
+    def openapi_parameters(self) -> List[Dict[str, Any]]:
+        return [
+            *BasePagination.openapi_parameters(self),
+            {
+                "name": "cursor",
+                "in": "query",
+                "required": False,
+                "schema": {"type": "string"},
+            },
+        ]
@@ -0,0 +1,311 @@
+"""
+Profiles of the individual slow requests, see `BaseEndpoint.profiler`.
+
+    profiler = RequestProfiler(sample_rate=0.01, slow_threshold=0.5)
+
+    class Authors(PydanticBaseEndpoint):
+        profiler = profiler
+
+    app.add_route("/debug/profiles", profiler.endpoint, include_in_schema=False)
+    app.add_event_handler("shutdown", profiler.close)
+
+A `sample_rate` fraction of the requests is run under `cProfile` with `tracemalloc`,
+one at a time. With `slow_threshold` a thread samples the stack of the event loop
+thread every `sample_interval` seconds while there are requests in flight,
+a request slower than the threshold gets the stacks sampled while it was processed.
+The thread idles in between the requests, `close` stops it.
+
+NOTE: the requests are interleaved on the event loop, so a profile or the stacks
+may include the work of the concurrent requests. Blocking calls made in the loop
+show up in the stacks of every request that was delayed by them.
+
+The `capacity` slowest captures are kept, `endpoint` responds with them
+as JSON, the slowest first.
+"""
+import collections
+import cProfile
+import datetime
+import heapq
+import itertools
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import tracemalloc
+import typing
+
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+
+class Capture:
+    """
+    Profiling state of a single request.
+    """
+
+    __slots__ = ("started", "wall_started", "profile", "snapshot", "owns_tracing")
+
+    def __init__(self) -> None:
+        self.wall_started = time.time()
+        self.started = time.perf_counter()
+        self.profile: Optional[cProfile.Profile] = None
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.owns_tracing = False
+
+
+def format_frame(frame: Any) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def collapse_stack(frame: Any, max_depth: int) -> str:
+    """
+    Frames from the outermost one, separated with `;` as in the flame graphs.
+    """
+    frames: List[str] = []
+    while frame is not None and len(frames) < max_depth:
+        frames.append(format_frame(frame))
+        frame = frame.f_back
+    return ";".join(reversed(frames))
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples the stack of the thread with the event loop in the background.
+    """
+
+    def __init__(self, thread_id: int, interval: float, max_samples: int) -> None:
+        super().__init__(name="starlette-cbge-stack-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Deque[Tuple[float, str]] = collections.deque(maxlen=max_samples)
+        # Set while there are requests in flight, see `resume` and `pause`
+        self.active = threading.Event()
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while True:
+            self.active.wait()
+            if self.stopped.wait(self.interval):
+                return
+            if not self.active.is_set():
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples.append((time.perf_counter(), collapse_stack(frame, 64)))
+
+    def resume(self) -> None:
+        self.active.set()
+
+    def pause(self) -> None:
+        self.active.clear()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        # Wakes up the idle thread
+        self.active.set()
+
+    def get_stacks(self, started: float, finished: float) -> typing.Counter[str]:
+        # Copied at once, the sampler appends concurrently
+        return collections.Counter(
+            stack
+            for moment, stack in list(self.samples)
+            if started <= moment <= finished
+        )
+
+
+class RequestProfiler:
+    def __init__(
+        self,
+        sample_rate: float = 0.0,
+        slow_threshold: Optional[float] = None,
+        capacity: int = 20,
+        sample_interval: float = 0.005,
+        top: int = 20,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.capacity = capacity
+        # Every sample walks the stack of the event loop thread holding the GIL,
+        # ~50us for a stack of 40 frames, so ~1% of a core at the default 5ms
+        # while the requests are in flight. The last minute of the samples is kept.
+        self.sample_interval = sample_interval
+        self.top = top
+        # Min-heap of the slowest records by the duration
+        self.records: List[Tuple[float, int, Dict[str, Any]]] = []
+        self.counter = itertools.count()
+        self.profiling = False
+        self.sampler: Optional[StackSampler] = None
+        # Requests being processed, the stacks are sampled only while there are any
+        self.in_flight = 0
+
+    def start(self) -> Capture:
+        """
+        Called when the request processing starts.
+        """
+        if self.slow_threshold is not None:
+            if self.sampler is None:
+                self.sampler = StackSampler(
+                    threading.get_ident(),
+                    self.sample_interval,
+                    max_samples=int(60 / self.sample_interval),
+                )
+                self.sampler.start()
+            self.in_flight += 1
+            self.sampler.resume()
+
+        capture = Capture()
+        if not self.profiling and random.random() < self.sample_rate:
+            self.profiling = True
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                capture.owns_tracing = True
+            capture.snapshot = tracemalloc.take_snapshot()
+            capture.profile = cProfile.Profile()
+            capture.profile.enable()
+        return capture
+
+    def finish(
+        self,
+        capture: Capture,
+        endpoint: str,
+        request: Request,
+        response: Response,
+        phases: Optional[Dict[str, float]] = None,
+    ) -> None:
+        """
+        Called when the response is ready, keeps the profile if it's sampled
+        or the request is slow.
+        """
+        finished = time.perf_counter()
+        duration = finished - capture.started
+        self.release()
+
+        record: Dict[str, Any] = {}
+        if capture.profile is not None:
+            capture.profile.disable()
+            record["profile"] = self.get_profile(capture.profile)
+            record["allocations"] = self.get_allocations(
+                typing.cast(tracemalloc.Snapshot, capture.snapshot)
+            )
+            if capture.owns_tracing:
+                tracemalloc.stop()
+            self.profiling = False
+        elif self.slow_threshold is None or duration < self.slow_threshold:
+            return
+
+        if self.sampler is not None:
+            stacks = self.sampler.get_stacks(capture.started, finished)
+            record["stacks"] = [
+                {"stack": stack, "count": count}
+                for stack, count in stacks.most_common(self.top)
+            ]
+
+        record.update(
+            endpoint=endpoint,
+            method=request.method,
+            path=request.url.path,
+            query=request.url.query,
+            status_code=response.status_code,
+            started_at=datetime.datetime.fromtimestamp(
+                capture.wall_started, datetime.timezone.utc
+            ).isoformat(),
+            duration_ms=round(duration * 1000, 3),
+            sampled=capture.profile is not None,
+            phases_ms={
+                phase: round(seconds * 1000, 3)
+                for phase, seconds in (phases or {}).items()
+            },
+        )
+        self.keep(duration, record)
+
+    def abort(self, capture: Capture) -> None:
+        """
+        Called if the request has failed with an unhandled exception.
+        """
+        self.release()
+        if capture.profile is not None:
+            capture.profile.disable()
+            if capture.owns_tracing:
+                tracemalloc.stop()
+            self.profiling = False
+
+    def release(self) -> None:
+        """
+        The request has finished, the sampler idles if it was the last one.
+        """
+        if self.slow_threshold is None:
+            return
+        self.in_flight -= 1
+        if self.in_flight == 0 and self.sampler is not None:
+            self.sampler.pause()
+
+    def close(self) -> None:
+        """
+        Stops the sampler thread, call it on the app shutdown.
+        """
+        sampler = self.sampler
+        if sampler is None:
+            return
+        self.sampler = None
+        sampler.stop()
+        sampler.join()
+
+    def keep(self, duration: float, record: Dict[str, Any]) -> None:
+        item = (duration, next(self.counter), record)
+        if len(self.records) < self.capacity:
+            heapq.heappush(self.records, item)
+        elif duration > self.records[0][0]:
+            heapq.heapreplace(self.records, item)
+
+    def get_profile(self, profile: cProfile.Profile) -> List[Dict[str, Any]]:
+        """
+        Functions with the highest cumulative time.
+        """
+        stats = pstats.Stats(profile).stats  # type: ignore
+        rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                "function": f"{name} ({os.path.basename(filename)}:{line})",
+                "calls": calls,
+                "total_ms": round(total * 1000, 3),
+                "cumulative_ms": round(cumulative * 1000, 3),
+            }
+            for (filename, line, name), (_, calls, total, cumulative, _) in rows[
+                : self.top
+            ]
+        ]
+
+    def get_allocations(self, before: tracemalloc.Snapshot) -> Dict[str, Any]:
+        """
+        Memory allocated during the request and not freed by its end.
+        """
+        differences = tracemalloc.take_snapshot().compare_to(before, "lineno")
+        return {
+            "delta_kib": round(sum(diff.size_diff for diff in differences) / 1024, 1),
+            "top": [
+                {
+                    "location": str(diff.traceback[0]),
+                    "size_kib": round(diff.size_diff / 1024, 1),
+                    "count": diff.count_diff,
+                }
+                for diff in differences[: self.top]
+                if diff.size_diff
+            ],
+        }
+
+    def get_records(self) -> List[Dict[str, Any]]:
+        return [record for _, _, record in sorted(self.records, reverse=True)]
+
+    def clear(self) -> None:
+        self.records.clear()
+
+    async def endpoint(self, request: Request) -> Response:
+        """
+        The kept captures, the slowest first. Don't expose it publicly.
+        """
+        return JSONResponse(self.get_records())
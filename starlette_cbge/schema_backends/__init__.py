@@ -4,3 +4,4 @@ from starlette_cbge.schema_backends.typesystem import (
     TypesystemListSchema,
     typesystem_fields,
 )
+from starlette_cbge.schema_backends.projection import set_strict_dump
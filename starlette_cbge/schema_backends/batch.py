@@ -0,0 +1,153 @@
+"""
+Column by column validation of lists for schemas supported by the compiler.
+
+Every field is checked across all the rows in one pass:
+a set of the value types is compared against the accepted ones,
+and the generated column check runs only if it doesn't match
+or the field has extra conditions.
+Rows with values the column check rejected go through the generic validation,
+either to be coerced or to report the errors with the row index.
+
+Rows can be mappings (dicts, `sqlite3.Row`, etc.)
+or tuples along with the column names, eg. `cursor.description` of aiosqlite results.
+"""
+import copy
+import typing
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from starlette_cbge.schema_backends.compiler import (
+    IMMUTABLE_TYPES,
+    FieldRule,
+    generate_assembler,
+    generate_column_check,
+)
+
+
+MISSING = object()
+
+
+class BatchResult(typing.NamedTuple):
+    items: List[Dict[str, Any]]
+    errors: List[Tuple[int, Exception]]  # row index, backend validation error
+
+
+class BatchFunctions(typing.NamedTuple):
+    column_checks: List[Callable[[Sequence[Any]], List[int]]]
+    assemble: Callable[[Sequence[Sequence[Any]]], List[Dict[str, Any]]]
+
+
+def get_batch_functions(cls: Any, rules: Sequence[FieldRule]) -> BatchFunctions:
+    """
+    Generated column checks and the item assembler,
+    cached on the schema class on the first use.
+    """
+    try:
+        return cls.__dict__["_batch_functions"]
+    except KeyError:
+        pass
+
+    batch_functions = BatchFunctions(
+        column_checks=[generate_column_check(rule) for rule in rules],
+        assemble=generate_assembler(rules),
+    )
+    setattr(cls, "_batch_functions", batch_functions)
+    return batch_functions
+
+
+def get_value(row: Any, key: str) -> Any:
+    try:
+        return row[key]
+    except (KeyError, IndexError):  # `sqlite3.Row` raises IndexError
+        return MISSING
+
+
+def extract_column(
+    rows: Sequence[Any], rule: FieldRule, columns: Optional[Sequence[str]]
+) -> List[Any]:
+    if columns is not None:
+        if rule.key not in columns:
+            return [MISSING] * len(rows)
+        column_index = columns.index(rule.key)
+        return [row[column_index] for row in rows]
+
+    try:
+        return [row[rule.key] for row in rows]
+    except (KeyError, IndexError):
+        return [get_value(row, rule.key) for row in rows]
+
+
+def validate_rows(
+    generic_validate: Callable[[Any], Dict[str, Any]],
+    error_types: Tuple[typing.Type[Exception], ...],
+    rows: Sequence[Any],
+    indices: typing.Iterable[int],
+    columns: Optional[Sequence[str]],
+    items: List[Any],
+) -> List[Tuple[int, Exception]]:
+    """
+    Generic validation of the particular rows, results are placed to `items`.
+    """
+    errors: List[Tuple[int, Exception]] = []
+    for index in indices:
+        row = rows[index] if columns is None else dict(zip(columns, rows[index]))
+        try:
+            items[index] = generic_validate(row)
+        except error_types as exc:
+            errors.append((index, exc))
+    return errors
+
+
+def batch_validate(
+    cls: Any,
+    rules: Optional[Sequence[FieldRule]],
+    generic_validate: Callable[[Any], Dict[str, Any]],
+    error_types: Tuple[typing.Type[Exception], ...],
+    rows: Sequence[Any],
+    columns: Optional[Sequence[str]] = None,
+) -> BatchResult:
+    """
+    Validates the rows column by column,
+    the rows are validated one by one if the schema isn't supported by the compiler.
+    """
+    if not isinstance(rows, list):
+        rows = list(rows)
+
+    if rules is None:
+        items: List[Any] = [None] * len(rows)
+        errors = validate_rows(
+            generic_validate, error_types, rows, range(len(rows)), columns, items
+        )
+        return BatchResult(items, errors)
+
+    if not rules:
+        return BatchResult([{} for _ in rows], [])
+
+    batch_functions = get_batch_functions(cls, rules)
+    invalid: Set[int] = set()
+    value_columns: List[List[Any]] = []
+
+    for rule, check_column in zip(rules, batch_functions.column_checks):
+        column = extract_column(rows, rule, columns)
+
+        accepted_types = {rule.type_, type(None)} if rule.nullable else {rule.type_}
+        if rule.conditions or not set(map(type, column)) <= accepted_types:
+            for index in check_column(column):
+                if column[index] is MISSING and not rule.required:
+                    if rule.default_factory is not None:
+                        column[index] = rule.default_factory()
+                    elif isinstance(rule.default, IMMUTABLE_TYPES):
+                        column[index] = rule.default
+                    else:
+                        column[index] = copy.deepcopy(rule.default)
+                else:
+                    invalid.add(index)
+
+        value_columns.append(column)
+
+    items = batch_functions.assemble(value_columns)
+
+    errors = validate_rows(
+        generic_validate, error_types, rows, sorted(invalid), columns, items
+    )
+    return BatchResult(items, errors)
@@ -0,0 +1,201 @@
+"""
+Code generation of the specialised validators for schemas with simple fields.
+
+Schema backends describe every field with a `FieldRule` - the exact accepted type
+and the extra conditions (as python source snippets on `value`).
+A function is generated out of the rules with the inlined type checks,
+defaults and key projection, no model instance is created.
+
+The generated function only accepts values that the backend would return unchanged,
+anything else (a type coercion, a missing required field, an invalid value)
+raises `CompiledFallback`, so the generic backend path is taken
+to produce exactly the same result or the validation error.
+"""
+import copy
+import math
+import typing
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+IMMUTABLE_TYPES = (type(None), bool, int, float, str, bytes)
+
+
+class CompiledFallback(Exception):
+    """
+    The data can't be handled by the compiled function.
+    """
+
+
+class FieldRule(typing.NamedTuple):
+    name: str  # output key
+    key: str  # input key, alias if any
+    required: bool
+    default: Any
+    type_: type  # exact type of the accepted value
+    nullable: bool
+    conditions: Tuple[str, ...] = ()  # extra checks of `value`
+    # Called for the missing value instead of copying `default`
+    default_factory: Optional[Callable[[], Any]] = None
+
+
+def build_check(rule: FieldRule, type_name: str) -> str:
+    """
+    Source of the `value` check for the field rule,
+    the exact type has to be available in the namespace as `type_name`.
+    """
+    check = f"type(value) is {type_name}"
+    if rule.conditions:
+        check = " and ".join([check, *(f"({c})" for c in rule.conditions)])
+    if rule.nullable:
+        check = f"value is None or ({check})"
+    return check
+
+
+def get_namespace() -> Dict[str, Any]:
+    return {
+        "_CompiledFallback": CompiledFallback,
+        "_deepcopy": copy.deepcopy,
+        "_isfinite": math.isfinite,
+    }
+
+
+def generate_column_check(rule: FieldRule) -> Callable[[Sequence[Any]], List[int]]:
+    """
+    Generates the function returning indices of invalid values in a column.
+    """
+    namespace = get_namespace()
+    namespace["_type"] = rule.type_
+    source = "\n".join(
+        [
+            "def check_column(column):",
+            "    return [",
+            "        index",
+            "        for index, value in enumerate(column)",
+            f"        if not ({build_check(rule, '_type')})",
+            "    ]",
+        ]
+    )
+    exec(compile(source, f"<check_column_{rule.name}>", "exec"), namespace)
+    return namespace["check_column"]
+
+
+def generate_assembler(
+    rules: Sequence[FieldRule],
+) -> Callable[[Sequence[Sequence[Any]]], List[Dict[str, Any]]]:
+    """
+    Generates the function building items out of the value columns,
+    a dict display is considerably faster than `dict(zip(names, values))`.
+    """
+    values = ", ".join(f"v{index}" for index in range(len(rules)))
+    item = ", ".join(f"{rule.name!r}: v{index}" for index, rule in enumerate(rules))
+    source = "\n".join(
+        [
+            "def assemble(columns):",
+            f"    return [{{{item}}} for {values}, in zip(*columns)]",
+        ]
+    )
+    namespace = get_namespace()
+    exec(compile(source, "<assemble>", "exec"), namespace)
+    return namespace["assemble"]
+
+
+def generate_validator(
+    rules: Sequence[FieldRule], name: str = "compiled_validator"
+) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Generates the validator function out of the field rules.
+    """
+    namespace = get_namespace()
+    lines = ["def validate(data):", "    result = {}"]
+
+    for index, rule in enumerate(rules):
+        type_name = f"_type_{index}"
+        namespace[type_name] = rule.type_
+        check = build_check(rule, type_name)
+
+        if rule.required:
+            missing = "raise _CompiledFallback()"
+        elif rule.default_factory is not None:
+            namespace[f"_default_{index}"] = rule.default_factory
+            missing = f"result[{rule.name!r}] = _default_{index}()"
+        elif isinstance(rule.default, IMMUTABLE_TYPES):
+            missing = f"result[{rule.name!r}] = {rule.default!r}"
+        else:
+            namespace[f"_default_{index}"] = rule.default
+            missing = f"result[{rule.name!r}] = _deepcopy(_default_{index})"
+
+        lines.extend(
+            [
+                "    try:",
+                f"        value = data[{rule.key!r}]",
+                # `sqlite3.Row` raises IndexError for missing keys
+                "    except (KeyError, IndexError):",
+                f"        {missing}",
+                "    else:",
+                f"        if not ({check}):",
+                "            raise _CompiledFallback()",
+                f"        result[{rule.name!r}] = value",
+            ]
+        )
+
+    lines.append("    return result")
+
+    exec(compile("\n".join(lines), f"<{name}>", "exec"), namespace)
+    validator = namespace["validate"]
+    validator.__name__ = validator.__qualname__ = name
+    return validator
+
+
+def get_cached_field_rules(
+    cls: Any, get_rules: Callable[[Any], Optional[Sequence[FieldRule]]]
+) -> Optional[Sequence[FieldRule]]:
+    """
+    Field rules cached on the schema class on the first use,
+    `None` if the schema has fields the compiler doesn't support.
+    """
+    try:
+        return cls.__dict__["_field_rules"]
+    except KeyError:
+        pass
+
+    rules = get_rules(cls)
+    setattr(cls, "_field_rules", rules)
+    return rules
+
+
+def get_compiled_validator(
+    cls: Any, get_rules: Callable[[Any], Optional[Sequence[FieldRule]]]
+) -> Optional[Callable[[Any], Dict[str, Any]]]:
+    """
+    Compiled validator cached on the schema class on the first use,
+    `None` if the schema has fields the compiler doesn't support.
+    """
+    try:
+        return cls.__dict__["_compiled_validator"]
+    except KeyError:
+        pass
+
+    rules = get_cached_field_rules(cls, get_rules)
+    validator = None
+    if rules is not None:
+        validator = generate_validator(rules, name=f"validate_{cls.__name__}")
+
+    setattr(cls, "_compiled_validator", validator)
+    return validator
+
+
+def run_compiled(
+    validator: Optional[Callable[[Any], Dict[str, Any]]],
+    generic: Callable[[Any], Dict[str, Any]],
+    data: Any,
+) -> Dict[str, Any]:
+    """
+    Runs the compiled validator, falls back to the generic one if it gives up.
+    """
+    if validator is not None:
+        try:
+            return validator(data)
+        except CompiledFallback:
+            pass
+    return generic(data)
@@ -0,0 +1,88 @@
+"""
+Trusted dump - the response data is only projected to the declared fields,
+skipping the validation and coercion, eg. for rows coming from typed DB columns.
+
+Enabled per schema with the `trusted_dump` class attribute
+(`trusted_dump: ClassVar[bool] = True` on the pydantic ones, so it's not a field),
+`set_strict_dump(True)` brings the full validation back (eg. for debug or tests).
+"""
+import copy
+import typing
+
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+
+_strict_dump = False
+
+
+def set_strict_dump(strict: bool) -> None:
+    """
+    Turns the validation of trusted dumps on or off app-wide.
+    """
+    global _strict_dump
+    _strict_dump = strict
+
+
+def is_strict_dump() -> bool:
+    return _strict_dump
+
+
+class FieldSpec(typing.NamedTuple):
+    name: str  # output key
+    key: str  # input key, alias if any
+    required: bool
+    default: Any
+    # Called for the missing value instead of copying `default`
+    default_factory: Optional[Callable[[], Any]] = None
+
+
+def make_projector(field_specs: Sequence[FieldSpec]) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Builds a function projecting and renaming the declared fields of a mapping.
+    """
+    names_keys = [(field_spec.name, field_spec.key) for field_spec in field_specs]
+
+    def project_with_defaults(data: Any) -> Dict[str, Any]:
+        result = {}
+        for field_spec in field_specs:
+            try:
+                result[field_spec.name] = data[field_spec.key]
+            except (KeyError, IndexError):  # `sqlite3.Row` raises IndexError
+                if field_spec.required:
+                    raise KeyError(field_spec.key)
+                if field_spec.default_factory is not None:
+                    result[field_spec.name] = field_spec.default_factory()
+                else:
+                    result[field_spec.name] = copy.deepcopy(field_spec.default)
+        return result
+
+    def project(data: Any) -> Dict[str, Any]:
+        try:
+            return {name: data[key] for name, key in names_keys}
+        except (KeyError, IndexError):
+            return project_with_defaults(data)
+
+    return project
+
+
+def get_projection(
+    cls: Any, keys: Sequence[str], restrict: Callable[[Any, Tuple[str, ...]], None]
+) -> Any:
+    """
+    Subclass of the schema restricted to the fields of the given keys,
+    eg. for the sparse fieldsets. Cached on the schema class per set of keys.
+    """
+    projections = cls.__dict__.get("_projections")
+    if projections is None:
+        projections = {}
+        setattr(cls, "_projections", projections)
+
+    keys = tuple(keys)
+    projection = projections.get(keys)
+    if projection is None:
+        projection = type(
+            f"{cls.__name__}Projection", (cls,), {"__module__": cls.__module__}
+        )
+        restrict(projection, keys)
+        projections[keys] = projection
+    return projection
@@ -1,24 +1,157 @@
 """
 Pydantic schema backend
 """
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any, Optional, Sequence, Tuple
 
 try:
     import pydantic
+    from pydantic.error_wrappers import ErrorWrapper
+    from pydantic.fields import Shape
 except ImportError:
     pydantic = None  # type: ignore
+    ErrorWrapper = None  # type: ignore
+    Shape = None  # type: ignore
 
+from starlette_cbge.exceptions import ImproperlyConfigured
 from starlette_cbge.interfaces import SchemaInterface, ListSchemaInterface
+from starlette_cbge.schema_backends.batch import batch_validate
+from starlette_cbge.schema_backends.compiler import (
+    FieldRule,
+    get_cached_field_rules,
+    get_compiled_validator,
+    run_compiled,
+)
+from starlette_cbge.schema_backends.projection import (
+    FieldSpec,
+    get_projection,
+    is_strict_dump,
+    make_projector,
+)
+
+
+def get_projector(cls: Any) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Cached projector of the model fields.
+    """
+    projector = cls.__dict__.get("_projector")
+    if projector is None:
+        projector = make_projector(
+            [
+                FieldSpec(name, field.alias, field.required, field.default)
+                for name, field in cls.__fields__.items()
+            ]
+        )
+        setattr(cls, "_projector", projector)
+    return projector
+
+
+def check_trusted_dump(cls: Any) -> None:
+    """
+    The flag without `ClassVar` becomes a model field, the dump stays validated
+    and the flag is dumped along with the data.
+    """
+    if "trusted_dump" in cls.__fields__:
+        raise ImproperlyConfigured(
+            f"{cls.__name__}.trusted_dump is a model field, "
+            "declare it as `trusted_dump: ClassVar[bool] = True`."
+        )
+
+
+def restrict_fields(cls: Any, keys: Tuple[str, ...]) -> None:
+    cls.__fields__ = {
+        name: field for name, field in cls.__fields__.items() if field.alias in keys
+    }
+
+
+SIMPLE_TYPES = (int, float, str, bool)
+
+
+def get_field_rules(cls: Any) -> Optional[List[FieldRule]]:
+    """
+    Rules for the compiled validator,
+    `None` if any field or the config needs the generic validation.
+    """
+    config = cls.__config__
+    if (
+        config.extra != pydantic.Extra.ignore
+        or config.validate_all
+        or getattr(cls, "__validators__", None)
+    ):
+        return None
+
+    str_conditions = []
+    if config.anystr_strip_whitespace:
+        str_conditions.append("value == value.strip()")
+    if config.min_anystr_length is not None:
+        str_conditions.append(f"len(value) >= {config.min_anystr_length}")
+    if config.max_anystr_length is not None:
+        str_conditions.append(f"len(value) <= {config.max_anystr_length}")
+
+    rules = []
+    for name, field in cls.__fields__.items():
+        if field.class_validators or field.shape != Shape.SINGLETON:
+            return None
+        if config.allow_population_by_alias and field.alias != name:
+            return None
+
+        type_ = field.type_
+        if field.allow_none and field.sub_fields:
+            # Optional[...]
+            sub_types = [
+                sub_field.type_
+                for sub_field in field.sub_fields
+                if sub_field.type_ is not type(None)
+            ]
+            type_ = sub_types[0] if len(sub_types) == 1 else None
+
+        if type_ not in SIMPLE_TYPES:
+            return None
+
+        rules.append(
+            FieldRule(
+                name=name,
+                key=field.alias,
+                required=field.required,
+                default=field.default,
+                type_=type_,
+                nullable=field.allow_none,
+                conditions=tuple(str_conditions) if type_ is str else (),
+            )
+        )
+
+    return rules
 
 
 class PydanticSchema(SchemaInterface, pydantic.BaseModel):
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)  # type: ignore
+        check_trusted_dump(cls)
+
     @classmethod
-    def perform_load(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+    def compile(cls) -> Optional[Callable[[Any], Dict[str, Any]]]:
+        return get_compiled_validator(cls, get_field_rules)
+
+    @classmethod
+    def field_keys(cls) -> List[str]:
+        return [field.alias for field in cls.__fields__.values()]
+
+    @classmethod
+    def project(cls, keys: Sequence[str]) -> Any:
+        return get_projection(cls, keys, restrict_fields)
+
+    @classmethod
+    def generic_validate(cls, data: Any) -> Dict[str, Any]:
         return cls(**data).dict()
 
+    @classmethod
+    def perform_load(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+        return run_compiled(cls.compile(), cls.generic_validate, data)
+
     @classmethod
     def perform_dump(cls, data: Any) -> Dict[str, Any]:
-        return cls(**data).dict()
+        if cls.trusted_dump and not is_strict_dump():
+            return get_projector(cls)(data)
+        return run_compiled(cls.compile(), cls.generic_validate, data)
 
     @classmethod
     def openapi_schema(cls) -> Dict[str, Any]:
@@ -26,13 +159,70 @@ class PydanticSchema(SchemaInterface, pydantic.BaseModel):
 
 
 class PydanticListSchema(ListSchemaInterface, pydantic.BaseModel):
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)  # type: ignore
+        check_trusted_dump(cls)
+
+    @classmethod
+    def compile(cls) -> Optional[Callable[[Any], Dict[str, Any]]]:
+        return get_compiled_validator(cls, get_field_rules)
+
+    @classmethod
+    def field_keys(cls) -> List[str]:
+        return [field.alias for field in cls.__fields__.values()]
+
+    @classmethod
+    def project(cls, keys: Sequence[str]) -> Any:
+        return get_projection(cls, keys, restrict_fields)
+
+    @classmethod
+    def generic_validate(cls, data: Any) -> Dict[str, Any]:
+        return cls(**data).dict()
+
+    @classmethod
+    def perform_batch_validation(
+        cls, data: Sequence[Any], columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        result = batch_validate(
+            cls,
+            get_cached_field_rules(cls, get_field_rules),
+            cls.generic_validate,
+            (pydantic.ValidationError,),
+            data,
+            columns,
+        )
+        if result.errors:
+            raise pydantic.ValidationError(
+                [
+                    ErrorWrapper(exc, loc=(index,))  # type: ignore
+                    for index, exc in result.errors
+                ],
+                cls,
+            )
+        return result.items
+
+    @classmethod
+    def perform_load(
+        cls, data: List[Any], columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        return cls.perform_batch_validation(data, columns)
+
     @classmethod
-    def perform_load(cls, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        return [cls(**item_data).dict() for item_data in data]
+    def perform_dump(
+        cls, data: List[Any], columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        if cls.trusted_dump and not is_strict_dump():
+            projector = get_projector(cls)
+            if columns is not None:
+                data = [dict(zip(columns, item_data)) for item_data in data]
+            return [projector(item_data) for item_data in data]
+        return cls.perform_batch_validation(data, columns)
 
     @classmethod
-    def perform_dump(cls, data: List[Any]) -> List[Dict[str, Any]]:
-        return [cls(**item_data).dict() for item_data in data]
+    def perform_dump_item(cls, data: Any) -> Dict[str, Any]:
+        if cls.trusted_dump and not is_strict_dump():
+            return get_projector(cls)(data)
+        return run_compiled(cls.compile(), cls.generic_validate, data)
 
     @classmethod
     def openapi_schema(cls) -> Dict[str, Any]:
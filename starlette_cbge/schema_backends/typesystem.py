@@ -2,27 +2,155 @@
 Typesystem schema backend
 """
 
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any, Optional, Sequence, Tuple
 
 try:
     import typesystem
+    from typesystem.base import Message
 except ImportError:
     typesystem = None  # type: ignore
+    Message = None  # type: ignore
 
 from starlette_cbge.interfaces import SchemaInterface, ListSchemaInterface
+from starlette_cbge.schema_backends.batch import batch_validate
+from starlette_cbge.schema_backends.compiler import (
+    FieldRule,
+    get_cached_field_rules,
+    get_compiled_validator,
+    run_compiled,
+)
+from starlette_cbge.schema_backends.projection import (
+    FieldSpec,
+    get_projection,
+    is_strict_dump,
+    make_projector,
+)
 
 
 typesystem_fields = typesystem.fields
 
 
+def get_default_factory(field: Any) -> Optional[Callable[[], Any]]:
+    """
+    Typesystem calls the callable defaults for every missing value.
+    """
+    default = getattr(field, "default", None)
+    return default if callable(default) else None
+
+
+def get_projector(cls: Any) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Cached projector of the schema fields.
+    """
+    projector = cls.__dict__.get("_projector")
+    if projector is None:
+        projector = make_projector(
+            [
+                FieldSpec(
+                    name,
+                    name,
+                    not field.has_default(),
+                    field.default if field.has_default() else None,
+                    get_default_factory(field),
+                )
+                for name, field in cls.fields.items()
+            ]
+        )
+        setattr(cls, "_projector", projector)
+    return projector
+
+
+def restrict_fields(cls: Any, keys: Tuple[str, ...]) -> None:
+    cls.fields = {name: field for name, field in cls.fields.items() if name in keys}
+
+
+NUMBER_CONSTRAINTS = (
+    "minimum",
+    "maximum",
+    "exclusive_minimum",
+    "exclusive_maximum",
+    "precision",
+    "multiple_of",
+)
+STRING_CONSTRAINTS = ("max_length", "min_length", "pattern", "format")
+
+
+def get_field_rule(name: str, field: Any) -> Optional[FieldRule]:
+    """
+    Rule for the compiled validator, `None` if the field needs the generic validation.
+    """
+    conditions: List[str] = []
+    field_class = type(field)
+    type_: type
+
+    if field_class in (typesystem.Integer, typesystem.Float):
+        if any(getattr(field, attr, None) is not None for attr in NUMBER_CONSTRAINTS):
+            return None
+        type_ = int if field_class is typesystem.Integer else float
+        if type_ is float:
+            conditions.append("_isfinite(value)")
+    elif field_class is typesystem.String:
+        if any(getattr(field, attr, None) is not None for attr in STRING_CONSTRAINTS):
+            return None
+        type_ = str
+        conditions.append("'\\0' not in value")
+        if field.trim_whitespace:
+            conditions.append("value == value.strip()")
+        if not field.allow_blank:
+            conditions.append("value")
+    elif field_class is typesystem.Boolean:
+        type_ = bool
+    else:
+        return None
+
+    return FieldRule(
+        name=name,
+        key=name,
+        required=not field.has_default(),
+        default=field.default if field.has_default() else None,
+        type_=type_,
+        nullable=field.allow_null,
+        conditions=tuple(conditions),
+        default_factory=get_default_factory(field),
+    )
+
+
+def get_field_rules(cls: Any) -> Optional[List[FieldRule]]:
+    rules = []
+    for name, field in cls.fields.items():
+        rule = get_field_rule(name, field)
+        if rule is None:
+            return None
+        rules.append(rule)
+    return rules
+
+
 class TypesystemSchema(SchemaInterface, typesystem.Schema):
+    @classmethod
+    def compile(cls) -> Optional[Callable[[Any], Dict[str, Any]]]:
+        return get_compiled_validator(cls, get_field_rules)
+
+    @classmethod
+    def field_keys(cls) -> List[str]:
+        return list(cls.fields)
+
+    @classmethod
+    def project(cls, keys: Sequence[str]) -> Any:
+        return get_projection(cls, keys, restrict_fields)
+
+    @classmethod
+    def generic_validate(cls, data: Any) -> Dict[str, Any]:
+        return dict(cls.validate(dict(data)))
+
     @classmethod
     def perform_load(cls, data: Dict[str, Any]) -> Dict[str, Any]:
-        return dict(cls.validate(data))
+        return run_compiled(cls.compile(), cls.generic_validate, data)
 
     @classmethod
     def perform_dump(cls, data: Any) -> Dict[str, Any]:
-        return dict(cls.validate(dict(data)))
+        if cls.trusted_dump and not is_strict_dump():
+            return get_projector(cls)(data)
+        return run_compiled(cls.compile(), cls.generic_validate, data)
 
     @classmethod
     def openapi_schema(cls) -> Dict[str, Any]:
@@ -36,12 +164,69 @@ class TypesystemSchema(SchemaInterface, typesystem.Schema):
 
 class TypesystemListSchema(ListSchemaInterface, typesystem.Schema):
     @classmethod
-    def perform_load(cls, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        return [dict(cls.validate(dict(item_data))) for item_data in data]
+    def compile(cls) -> Optional[Callable[[Any], Dict[str, Any]]]:
+        return get_compiled_validator(cls, get_field_rules)
+
+    @classmethod
+    def field_keys(cls) -> List[str]:
+        return list(cls.fields)
+
+    @classmethod
+    def project(cls, keys: Sequence[str]) -> Any:
+        return get_projection(cls, keys, restrict_fields)
+
+    @classmethod
+    def generic_validate(cls, data: Any) -> Dict[str, Any]:
+        return dict(cls.validate(dict(data)))
+
+    @classmethod
+    def perform_batch_validation(
+        cls, data: Sequence[Any], columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        result = batch_validate(
+            cls,
+            get_cached_field_rules(cls, get_field_rules),
+            cls.generic_validate,
+            (typesystem.ValidationError,),
+            data,
+            columns,
+        )
+        if result.errors:
+            raise typesystem.ValidationError(
+                messages=[
+                    Message(
+                        text=message.text,
+                        code=message.code,
+                        index=[index, *message.index],
+                    )
+                    for index, exc in result.errors
+                    for message in exc.messages()  # type: ignore
+                ]
+            )
+        return result.items
+
+    @classmethod
+    def perform_load(
+        cls, data: List[Any], columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        return cls.perform_batch_validation(data, columns)
+
+    @classmethod
+    def perform_dump(
+        cls, data: List[Any], columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        if cls.trusted_dump and not is_strict_dump():
+            projector = get_projector(cls)
+            if columns is not None:
+                data = [dict(zip(columns, item_data)) for item_data in data]
+            return [projector(item_data) for item_data in data]
+        return cls.perform_batch_validation(data, columns)
 
     @classmethod
-    def perform_dump(cls, data: List[Any]) -> List[Dict[str, Any]]:
-        return [dict(cls.validate(dict(item_data))) for item_data in data]
+    def perform_dump_item(cls, data: Any) -> Dict[str, Any]:
+        if cls.trusted_dump and not is_strict_dump():
+            return get_projector(cls)(data)
+        return run_compiled(cls.compile(), cls.generic_validate, data)
 
     @classmethod
     def openapi_schema(cls) -> Dict[str, Any]:
@@ -1,32 +1,134 @@
 """
 Implementation of the Open API v3 schema generator.
+
+The document is built once, either on the first request to the schema endpoint
+or by `warm_up` on the app start up, and cached along with the encoded
+JSON and YAML bytes. It's rebuilt only if the routes change,
+and then only the changed `Mount` subtrees are regenerated.
 """
 
+import collections
+import copy
+import hashlib
 import inspect
 import typing
 import yaml
 
+from concurrent.futures import Executor
+
 from typing import Union
 
+from starlette.requests import Request
+from starlette.responses import Response
 from starlette.schemas import SchemaGenerator
 from starlette.routing import BaseRoute, Mount, Route
-from starlette_cbge.endpoints import BaseEndpoint
+from starlette_cbge.conditional import etag_matches
+from starlette_cbge.endpoints.core import BODY_METHODS as BODY_HTTP_METHODS
+from starlette_cbge.interfaces import ListSchemaInterface
+from starlette_cbge.json_codecs import get_json_codec
+
+
+JSON_MEDIA_TYPE = "application/json"
+YAML_MEDIA_TYPE = "application/vnd.oai.openapi"
+
+BODY_METHODS = tuple(method.lower() for method in BODY_HTTP_METHODS)
+
+
+class NoAliasDumper(yaml.SafeDumper):
+    """
+    Fragments shared by the paths (eg. docstrings of the inherited handlers)
+    are written in full instead of YAML anchors.
+    """
+
+    def ignore_aliases(self, data: typing.Any) -> bool:
+        return True
+
+
+class EncodedSchema(typing.NamedTuple):
+    content: bytes
+    etag: str  # strong ETag of the content
+
 
+class SubtreeSchema(typing.NamedTuple):
+    paths: typing.Dict[str, dict]  # relative to the mount point
+    classes: typing.Dict[typing.Any, typing.Callable[[], dict]]  # referenced ones
+    # Reference objects of the classes, the nested subtrees' ones too, see `get_ref`
+    refs: typing.Dict[typing.Any, typing.List[dict]]
 
-class ExtendedEndpointInfo(typing.NamedTuple):
-    path: str
-    http_method: str
-    func: typing.Callable
-    endpoint: BaseEndpoint
-    # endpoint: typing.Callable[BaseEndpoint]
+
+class SchemaCaches(typing.NamedTuple):
+    """
+    Caches filled by a worker thread, see `extract_subtree`.
+    """
+
+    fragments: typing.Dict[typing.Any, dict]
+    docstrings: typing.Dict[typing.Callable, dict]
+    subtrees: typing.Dict[typing.Tuple, SubtreeSchema]
+
+
+class CachedSchema(typing.NamedTuple):
+    routes_signature: typing.Tuple
+    schema: dict
+    encoded: typing.Dict[str, EncodedSchema]  # per media type
+
+
+def get_routes_signature(routes: typing.Sequence[BaseRoute]) -> typing.Tuple:
+    """
+    Cheap fingerprint of the routes affecting the document.
+    """
+    signature: typing.List[typing.Any] = []
+    for route in routes:
+        if isinstance(route, Mount):
+            signature.append((route.path, get_routes_signature(route.routes or [])))
+        elif isinstance(route, Route):
+            methods = getattr(route, "methods", None) or set()
+            signature.append(
+                (
+                    route.path,
+                    route.endpoint,
+                    tuple(sorted(methods)),
+                    route.include_in_schema,
+                )
+            )
+    return tuple(signature)
+
+
+def encode_schema(content: bytes) -> EncodedSchema:
+    return EncodedSchema(content, f'"{hashlib.sha256(content).hexdigest()[:32]}"')
 
 
 class OpenAPIv3SchemaGenerator(SchemaGenerator):
+    def __init__(
+        self, base_schema: dict, executor: typing.Optional[Executor] = None
+    ) -> None:
+        """
+        `executor` (eg. a `ThreadPoolExecutor`) extracts the schemas
+        of the independent mounted subtrees in parallel.
+        """
+        super().__init__(base_schema)
+        self.executor = executor
+        self.cached_schema: typing.Optional[CachedSchema] = None
+        # Per class schema fragments and per function parsed docstrings
+        self.fragments: typing.MutableMapping[typing.Any, dict] = {}
+        self.docstrings: typing.MutableMapping[typing.Callable, dict] = {}
+        self.subtrees: typing.MutableMapping[typing.Tuple, SubtreeSchema] = {}
+
     def parse_docstring(self, func_or_method: typing.Callable) -> dict:
         """
         Given a function, parse the docstring as YAML and return a dictionary of info.
+        Memoized per function.
         """
-        docstring = func_or_method.__doc__
+        try:
+            return self.docstrings[func_or_method]
+        except KeyError:
+            pass
+
+        parsed = self.docstrings[func_or_method] = self.parse_docstring_text(
+            func_or_method.__doc__
+        )
+        return parsed
+
+    def parse_docstring_text(self, docstring: typing.Optional[str]) -> dict:
         if not docstring:
             return {}
 
@@ -39,123 +141,367 @@ class OpenAPIv3SchemaGenerator(SchemaGenerator):
 
         return parsed
 
-    def get_extended_endpoints(
-        self, routes: typing.List[BaseRoute]
-    ) -> typing.List[ExtendedEndpointInfo]:
+    def get_component_name(self, cls: typing.Any, components: dict) -> str:
+        """
+        Name of the class in `components/schemas`, qualified if the short one is taken.
         """
-        Given the routes, yields the following information:
+        name = cls.__name__
+        if name in components:
+            name = f"{cls.__module__}.{cls.__qualname__}"
+        return name
 
-        - path
-            eg: /users/
-        - http_method
-            one of 'get', 'post', 'put', 'patch', 'delete', 'options'
-        - func
-            method ready to extract the docstring
+    def get_fragment(self, cls: typing.Any, build: typing.Callable[[], dict]) -> dict:
         """
-        endpoints_info: list = []
+        Schema fragment of the class, computed once per class.
+        """
+        try:
+            return self.fragments[cls]
+        except KeyError:
+            fragment = self.fragments[cls] = build()
+            return fragment
 
-        for route in routes:
-            if isinstance(route, Mount):
-                routes = route.routes or []
-                sub_endpoints = [
-                    ExtendedEndpointInfo(
-                        path="".join((route.path, sub_endpoint.path)),
-                        http_method=sub_endpoint.http_method,
-                        func=sub_endpoint.func,
-                        endpoint=sub_endpoint.endpoint,  # TODO check
-                    )
-                    for sub_endpoint in self.get_extended_endpoints(routes)
-                ]
-                endpoints_info.extend(sub_endpoints)
+    def get_ref(
+        self, cls: typing.Any, build: typing.Callable[[], dict], subtree: SubtreeSchema
+    ) -> dict:
+        """
+        Reference to the class fragment, the class is collected to the subtree.
 
-            elif not isinstance(route, Route) or not route.include_in_schema:
+        The reference object is shared by the usages of the class in the subtree,
+        the component name is set when the document is assembled,
+        so the cached subtrees don't depend on the rest of the document.
+        """
+        subtree.classes.setdefault(cls, build)
+        refs = subtree.refs.setdefault(cls, [])
+        if not refs:
+            refs.append({"$ref": ""})
+        return refs[0]
+
+    def get_parameters(
+        self,
+        path: str,
+        http_method: str,
+        request_schema: typing.Optional[dict],
+        pagination: typing.Any,
+        filtering: typing.Any = None,
+    ) -> typing.List[dict]:
+        """
+        Path and query parameters out of the request schema properties,
+        the body methods get the path ones only.
+        """
+        parameters = []
+        if pagination is not None and http_method == "get":
+            parameters.extend(pagination.openapi_parameters())
+        if filtering is not None and http_method == "get":
+            parameters.extend(filtering.openapi_parameters())
+
+        names = {parameter["name"] for parameter in parameters}
+        properties = (request_schema or {}).get("properties", {})
+        required = set((request_schema or {}).get("required", []))
+        for name, property_schema in properties.items():
+            in_path = f"{{{name}}}" in path
+            if name in names or (http_method in BODY_METHODS and not in_path):
                 continue
+            parameters.append(
+                {
+                    "name": name,
+                    "in": "path" if in_path else "query",
+                    "required": in_path or name in required,
+                    "schema": property_schema,
+                }
+            )
+        return parameters
 
-            elif inspect.isfunction(route.endpoint) or inspect.ismethod(route.endpoint):
-                # TODO add support later
-                # for method in route.methods or ["GET"]:
-                #     if method == "HEAD":
-                #         continue
-                #     endpoints_info.append(
-                #         ExtendedEndpointInfo(
-                #             route.path, method.lower(), route.endpoint, None
-                #         )  # TODO check
-                #     )
+    def get_operation(
+        self,
+        path: str,
+        http_method: str,
+        func: typing.Callable,
+        endpoint: typing.Any,
+        subtree: SubtreeSchema,
+    ) -> dict:
+        """
+        Operation object of the endpoint method, the referenced classes
+        are collected to the subtree.
+        """
+        target: dict = {}
+        media_type = endpoint.response_class.media_type
+
+        target["description"] = self.parse_docstring(func)
+
+        request_schema_class = dict(endpoint.request_schemas).get(http_method.upper())
+        pagination = getattr(endpoint, "pagination", None)
+        request_schema = None
+        if request_schema_class:
+            request_schema = self.get_fragment(
+                request_schema_class, request_schema_class.openapi_schema
+            )
+        parameters = self.get_parameters(
+            path,
+            http_method,
+            request_schema,
+            pagination,
+            getattr(endpoint, "filtering", None),
+        )
+        fields_param = dict(getattr(endpoint, "sparse_fieldsets", None) or ()).get(
+            http_method.upper()
+        )
+        response_schema_class = dict(endpoint.response_schemas).get(http_method.upper())
+        if fields_param is not None and response_schema_class is not None:
+            parameters.append(
+                {
+                    "name": fields_param,
+                    "in": "query",
+                    "required": False,
+                    "description": "Comma separated fields of the response.",
+                    "schema": {
+                        "type": "string",
+                        "example": ",".join(response_schema_class.field_keys()),
+                    },
+                }
+            )
+        if parameters:
+            target["parameters"] = parameters
+        if request_schema_class and http_method in BODY_METHODS:
+            target["requestBody"] = {
+                "content": {
+                    media_type: {
+                        "schema": self.get_ref(
+                            request_schema_class,
+                            request_schema_class.openapi_schema,
+                            subtree,
+                        )
+                    }
+                }
+            }
+
+        target["responses"] = {}
+
+        response_schema: dict = {}
+        if response_schema_class:
+            response_schema = self.get_ref(
+                response_schema_class, response_schema_class.openapi_schema, subtree
+            )
+            if issubclass(response_schema_class, ListSchemaInterface):
+                response_schema = {"type": "array", "items": response_schema}
+        if (
+            pagination is not None
+            and http_method == "get"
+            and getattr(endpoint, "pagination_envelope", False)
+        ):
+            link_schema = {"type": "string", "nullable": True}
+            response_schema = {
+                "type": "object",
+                "properties": {
+                    "items": response_schema,
+                    "next": link_schema,
+                    "prev": link_schema,
+                },
+            }
+
+        # TODO account non-std success status codes
+        target["responses"]["200"] = {
+            "description": "Successful response",
+            "content": {media_type: {"schema": response_schema}},
+        }
+
+        # Add exception responses
+        for status, exception in endpoint.get_exception_classes().items():
+            # Keyed by the class defining the schema, subclasses share it
+            schema_owner = next(
+                klass for klass in exception.__mro__ if "schema" in vars(klass)
+            )
+            target["responses"][status] = {
+                "description": exception.description(),
+                "content": {
+                    media_type: {
+                        "schema": self.get_ref(schema_owner, exception.schema, subtree)
+                    }
+                },
+            }
+
+        return target
+
+    def get_subtree(
+        self,
+        routes: typing.Sequence[BaseRoute],
+        routes_signature: typing.Tuple,
+        executor: typing.Optional[Executor] = None,
+    ) -> SubtreeSchema:
+        """
+        Paths of the routes relative to the mount point, cached per routes signature,
+        so only the changed `Mount` subtrees are regenerated.
+
+        The uncached subtrees of the mounts can be extracted with the `executor`,
+        the nested ones are processed in the same thread. The caches filled
+        by the workers are merged here, in the calling thread.
+        """
+        try:
+            return self.subtrees[routes_signature]
+        except KeyError:
+            pass
+
+        schema_routes: typing.List[Union[Mount, Route]] = [
+            route for route in routes if isinstance(route, (Mount, Route))
+        ]
+        mounts = [
+            (route.routes or [], route_signature[1])
+            for route, route_signature in zip(schema_routes, routes_signature)
+            if isinstance(route, Mount)
+        ]
+        pending = [mount for mount in mounts if mount[1] not in self.subtrees]
+        if executor is not None and len(pending) > 1:
+            for caches in executor.map(self.extract_subtree, pending):
+                self.fragments.update(caches.fragments)
+                self.docstrings.update(caches.docstrings)
+                self.subtrees.update(caches.subtrees)
+
+        subtree = SubtreeSchema({}, {}, {})
+        paths = subtree.paths
+
+        for route, route_signature in zip(schema_routes, routes_signature):
+            if isinstance(route, Mount):
+                mounted = self.get_subtree(route.routes or [], route_signature[1])
+                for path, operations in mounted.paths.items():
+                    paths.setdefault(route.path + path, {}).update(operations)
+                for cls, build in mounted.classes.items():
+                    subtree.classes.setdefault(cls, build)
+                for cls, refs in mounted.refs.items():
+                    subtree.refs.setdefault(cls, []).extend(refs)
+
+            elif not route.include_in_schema or not inspect.isclass(route.endpoint):
                 continue
+
             else:
                 for method in ["get", "post", "put", "patch", "delete", "options"]:
-                    if not hasattr(route.endpoint, method):
+                    func = getattr(route.endpoint, method, None)
+                    if func is None:
                         continue
-                    func = getattr(route.endpoint, method)
-                    endpoint = route.endpoint
-                    endpoints_info.append(
-                        ExtendedEndpointInfo(  # type: ignore  # TODO resolve!
-                            route.path, method.lower(), func, endpoint
-                        )
+                    paths.setdefault(route.path, {})[method] = self.get_operation(
+                        route.path, method, func, route.endpoint, subtree
                     )
 
-        return endpoints_info
+        self.subtrees[routes_signature] = subtree
+        return subtree
 
-    def get_schema(self, routes: typing.List[BaseRoute]) -> dict:
+    def extract_subtree(
+        self, mount: typing.Tuple[typing.Sequence[BaseRoute], typing.Tuple]
+    ) -> SchemaCaches:
+        """
+        Extracts the subtree of the mount in a worker thread. The worker gets
+        a copy of the generator with its own caches on top of the shared ones,
+        so the shared ones are only read there, and returns them to be merged.
+        """
+        caches = SchemaCaches({}, {}, {})
+        worker = copy.copy(self)
+        worker.fragments = collections.ChainMap(caches.fragments, self.fragments)
+        worker.docstrings = collections.ChainMap(caches.docstrings, self.docstrings)
+        worker.subtrees = collections.ChainMap(caches.subtrees, self.subtrees)
+        worker.get_subtree(*mount)
+        return caches
+
+    def collect_subtree_signatures(
+        self, routes_signature: typing.Tuple, signatures: typing.Set[typing.Tuple]
+    ) -> None:
+        signatures.add(routes_signature)
+        for route_signature in routes_signature:
+            if isinstance(route_signature[1], tuple):
+                # Mount
+                self.collect_subtree_signatures(route_signature[1], signatures)
+
+    def get_schema(
+        self,
+        routes: typing.Sequence[BaseRoute],
+        routes_signature: typing.Optional[typing.Tuple] = None,
+    ) -> dict:
         """
         NOTE: a pretty rough and approx implementation, POC only
 
-        TODO use schemas for OpenAPI specs?
+        Schemas and exceptions are added to `components/schemas` once
+        and referenced with `$ref`.
+
         TODO check if it's a subclass of the BaseEndpoint
         """
+        if routes_signature is None:
+            routes_signature = get_routes_signature(routes)
+        subtree = self.get_subtree(routes, routes_signature, self.executor)
+
+        # Subtrees of the unmounted apps are dropped
+        signatures: typing.Set[typing.Tuple] = set()
+        self.collect_subtree_signatures(routes_signature, signatures)
+        self.subtrees = {
+            signature: cached_subtree
+            for signature, cached_subtree in self.subtrees.items()
+            if signature in signatures
+        }
+
         schema = dict(self.base_schema)
-        schema.setdefault("paths", {})
-        endpoints_info = self.get_extended_endpoints(routes)
+        schema["paths"] = {**schema.get("paths", {}), **subtree.paths}
 
-        for endpoint in endpoints_info:
-            if endpoint.path not in schema["paths"]:
-                schema["paths"][endpoint.path] = {}
+        components: typing.Dict[str, dict] = {}
+        for cls, build in subtree.classes.items():
+            name = self.get_component_name(cls, components)
+            components[name] = self.get_fragment(cls, build)
+            for ref in subtree.refs[cls]:
+                ref["$ref"] = f"#/components/schemas/{name}"
 
-            schema["paths"][endpoint.path][endpoint.http_method] = {}
-            target = schema["paths"][endpoint.path][endpoint.http_method]
+        if components:
+            schema["components"] = dict(schema.get("components", {}))
+            schema["components"]["schemas"] = {
+                **schema["components"].get("schemas", {}),
+                **components,
+            }
+        return schema
 
-            target["description"] = self.parse_docstring(endpoint.func)
-            # TODO distinguish body and parameters below
-            request_schema_class = dict(endpoint.endpoint.request_schemas).get(
-                endpoint.http_method.upper()
-            )
-            if request_schema_class:
-                # TODO there probably should be always a schema, or default as a black schema
-                target["parameters"] = request_schema_class.openapi_schema()
+    def get_cached_schema(self, routes: typing.Sequence[BaseRoute]) -> CachedSchema:
+        """
+        The document along with the encoded bytes, rebuilt if the routes change.
+        """
+        routes_signature = get_routes_signature(routes)
+        cached_schema = self.cached_schema
+        if (
+            cached_schema is not None
+            and cached_schema.routes_signature == routes_signature
+        ):
+            return cached_schema
 
-            # TODO account responses for exceptions
-            target["responses"] = {}
+        schema = self.get_schema(routes, routes_signature)
+        yaml_content = yaml.dump(
+            schema, Dumper=NoAliasDumper, default_flow_style=False
+        ).encode("utf-8")
+        cached_schema = CachedSchema(
+            routes_signature=routes_signature,
+            schema=schema,
+            encoded={
+                JSON_MEDIA_TYPE: encode_schema(get_json_codec().dumps(schema)),
+                YAML_MEDIA_TYPE: encode_schema(yaml_content),
+            },
+        )
+        self.cached_schema = cached_schema
+        return cached_schema
 
-            response_schema_class = dict(endpoint.endpoint.response_schemas).get(
-                endpoint.http_method.upper()
-            )
-            response_schema = (
-                response_schema_class.openapi_schema() if response_schema_class else {}
-            )
+    def warm_up(self, routes: typing.Sequence[BaseRoute]) -> None:
+        """
+        Builds the document ahead of the first request, eg. on the app start up.
+        """
+        self.get_cached_schema(routes)
 
-            # TODO account non-std success status codes
-            # TODO refactor
-            target["responses"]["200"] = {}
-            target["responses"]["200"]["description"] = "Successful response"
-            target["responses"]["200"]["content"] = {}
-            target["responses"]["200"]["content"][
-                endpoint.endpoint.response_class.media_type
-            ] = {}
-            target["responses"]["200"]["content"][
-                endpoint.endpoint.response_class.media_type
-            ]["schema"] = response_schema
-
-            # Add exception responses
-            for status, exception in dict(endpoint.endpoint.exception_classes).items():
-                target["responses"][status] = {}
-                target["responses"][status]["description"] = exception.description()
-                target["responses"][status]["content"] = {}
-                target["responses"][status]["content"][
-                    endpoint.endpoint.response_class.media_type
-                ] = {}
-                target["responses"][status]["content"][
-                    endpoint.endpoint.response_class.media_type
-                ]["schema"] = exception.schema()
-
-            # TODO hook exceptions
-        return schema
+    def OpenAPIResponse(self, request: Request) -> Response:
+        """
+        Serves the cached document, JSON if it's accepted or `?format=json`
+        is passed, YAML otherwise. `If-None-Match` is answered with 304.
+        """
+        cached_schema = self.get_cached_schema(request.app.routes)
+
+        if request.query_params.get("format") == "json" or (
+            JSON_MEDIA_TYPE in request.headers.get("accept", "")
+        ):
+            media_type = JSON_MEDIA_TYPE
+        else:
+            media_type = YAML_MEDIA_TYPE
+        encoded = cached_schema.encoded[media_type]
+
+        headers = {"etag": encoded.etag, "vary": "Accept"}
+        if etag_matches(request.headers.get("if-none-match"), encoded.etag):
+            return Response(status_code=304, headers=headers)
+
+        return Response(encoded.content, media_type=media_type, headers=headers)
@@ -0,0 +1,90 @@
+"""
+Streaming of the collection responses.
+
+Items are dumped through the list schema and encoded batch by batch,
+so the memory consumption is bounded by the batch size instead of the result size.
+The next batch is not pulled from the source until the previous one is sent,
+so a slow client slows down the source (eg. DB cursor) as well.
+
+NOTE: the response status is sent before the first item is dumped,
+so an invalid item aborts the response instead of producing a 500 response.
+"""
+
+import typing
+
+from typing import Any, AsyncIterator, Callable, Dict, List
+
+from starlette_cbge.interfaces import JSONCodecInterface
+
+JSON_ARRAY = "json_array"
+NDJSON = "ndjson"
+
+STREAM_MEDIA_TYPES = {JSON_ARRAY: "application/json", NDJSON: "application/x-ndjson"}
+
+
+async def iterate_batches(data: Any, batch_size: int) -> AsyncIterator[List[Any]]:
+    """
+    Groups items of a sync iterable or an async iterator into batches.
+    """
+    batch: List[Any] = []
+
+    if hasattr(data, "__aiter__"):
+        async for item in data:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    else:
+        for item in data:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+    if batch:
+        yield batch
+
+
+async def collect_items(data: Any) -> List[Any]:
+    """
+    Materialises an async iterator for the non streaming responses.
+    """
+    return [item async for item in data]
+
+
+async def stream_json_array(
+    data: Any,
+    dump_item: Callable[[Any], Dict[str, Any]],
+    codec: JSONCodecInterface,
+    batch_size: int,
+) -> AsyncIterator[bytes]:
+    """
+    Encodes items as a JSON array, every chunk holds a batch of items.
+    """
+    separator = b"["
+    async for batch in iterate_batches(data, batch_size):
+        # One codec call per batch, the brackets of the encoded list are dropped
+        chunk = codec.dumps([dump_item(item) for item in batch])[1:-1]
+        yield separator + chunk
+        separator = b","
+
+    yield b"[]" if separator == b"[" else b"]"
+
+
+async def stream_ndjson(
+    data: Any,
+    dump_item: Callable[[Any], Dict[str, Any]],
+    codec: JSONCodecInterface,
+    batch_size: int,
+) -> AsyncIterator[bytes]:
+    """
+    Encodes items as new line delimited JSON, every chunk holds a batch of items.
+    """
+    async for batch in iterate_batches(data, batch_size):
+        yield b"".join(codec.dumps(dump_item(item)) + b"\n" for item in batch)
+
+
+STREAM_ENCODERS: Dict[str, typing.Callable[..., AsyncIterator[bytes]]] = {
+    JSON_ARRAY: stream_json_array,
+    NDJSON: stream_ndjson,
+}
@@ -0,0 +1,57 @@
+"""
+Direct calls of an ASGI app, without the client machinery,
+eg. to make the requests really concurrent in the tests and the benchmarks.
+"""
+from typing import Any, Dict, List, Sequence, Tuple
+
+
+def make_scope(
+    method: str,
+    path: str,
+    query_string: bytes = b"",
+    headers: Sequence[Tuple[bytes, bytes]] = (),
+) -> Dict[str, Any]:
+    """
+    HTTP scope of a request to the test server.
+    """
+    return {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "root_path": "",
+        "query_string": query_string,
+        "headers": [(b"host", b"testserver"), *headers],
+        "server": ("testserver", 80),
+        "client": ("testclient", 50000),
+    }
+
+
+async def call_asgi(
+    app: Any,
+    method: str,
+    path: str,
+    query_string: bytes = b"",
+    body: bytes = b"",
+    headers: Sequence[Tuple[bytes, bytes]] = (),
+) -> Tuple[int, bytes]:
+    """
+    Calls the app directly, without the client machinery,
+    returns the status code and the body of the response.
+    """
+    if body:
+        headers = [*headers, (b"content-length", str(len(body)).encode())]
+    messages: List[Dict[str, Any]] = []
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        messages.append(message)
+
+    await app(make_scope(method, path, query_string, headers), receive, send)
+    return (
+        messages[0]["status"],
+        b"".join(message.get("body", b"") for message in messages[1:]),
+    )
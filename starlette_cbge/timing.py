@@ -0,0 +1,270 @@
+"""
+Timing of the request processing phases, see `BaseEndpoint.timing_sinks`.
+
+The endpoint pipeline marks its phases on the request `PhaseTimer`:
+
+- `payload` - reading and decoding of the request body, `acquire_request_payload`
+- `shape` - `shape_request_data`
+- `deserialize` - the request schema load, `deserialize_payload`
+- `validate` - the context resolver and the validator
+- `coalesce` - waiting for the identical in-flight request
+- `cache` - the response cache look up and store
+- `handler` - the method handler, eg. the DB queries
+- `context` - `acquire_response_context`
+- `serialise` - the response schema dump, `serialise_response`
+- `encode` - the response encoding, eg. JSON
+
+The phases are nested (eg. `payload` runs within `deserialize`), every one
+is timed exclusive of the nested ones, so the phases add up to the total.
+Streamed responses are encoded while they are sent, after the timing is recorded.
+
+The finished timer is passed to the sinks: `HistogramSink` keeps
+the histograms in memory and renders the Prometheus text exposition,
+`OpenTelemetrySink` replays the phases as the spans.
+"""
+import bisect
+import time
+import typing
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from starlette_cbge.exceptions import ImproperlyConfigured
+from starlette_cbge.interfaces import TimingSinkInterface
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None  # type: ignore
+
+
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Span(typing.NamedTuple):
+    phase: str
+    start: float  # `perf_counter` seconds
+    end: float
+    parent: Optional[int]  # index of the enclosing span
+
+
+class PhaseTimer:
+    """
+    Monotonic timer of a single request, phases are started and stopped
+    in the LIFO order, eg.:
+
+        with self.timer.phase("handler"):
+            raw_response = await handler(self, request_data)
+    """
+
+    __slots__ = ("durations", "spans", "stack", "started", "wall_started", "mark")
+
+    def __init__(self) -> None:
+        self.durations: Dict[str, float] = {}
+        self.spans: List[Span] = []
+        self.stack: List[int] = []  # indexes of the open spans
+        self.wall_started = time.time()
+        self.started = self.mark = time.perf_counter()
+
+    def phase(self, name: str) -> "PhaseTimer":
+        """
+        Starts the phase, the timer is its context manager.
+        """
+        now = time.perf_counter()
+        if self.stack:
+            self.add(self.spans[self.stack[-1]].phase, now - self.mark)
+        self.spans.append(Span(name, now, now, self.stack[-1] if self.stack else None))
+        self.stack.append(len(self.spans) - 1)
+        self.mark = now
+        return self
+
+    def stop(self) -> None:
+        now = time.perf_counter()
+        index = self.stack.pop()
+        span = self.spans[index]
+        self.spans[index] = span._replace(end=now)
+        self.add(span.phase, now - self.mark)
+        self.mark = now
+
+    def add(self, phase: str, duration: float) -> None:
+        self.durations[phase] = self.durations.get(phase, 0.0) + duration
+
+    def finish(self) -> float:
+        """
+        Stops the phases left open (eg. by an exception), returns the total seconds.
+        """
+        while self.stack:
+            self.stop()
+        return time.perf_counter() - self.started
+
+    def __enter__(self) -> "PhaseTimer":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def server_timing(self, total: float) -> str:
+        """
+        `Server-Timing` header value, durations in milliseconds.
+        """
+        metrics = [
+            f"{phase};dur={duration * 1000:.3f}"
+            for phase, duration in self.durations.items()
+        ]
+        metrics.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(metrics)
+
+
+class NullTimer:
+    """
+    Timer of the endpoints without timing, does nothing.
+    """
+
+    def phase(self, name: str) -> "NullTimer":
+        return self
+
+    def stop(self) -> None:
+        pass
+
+    def __enter__(self) -> "NullTimer":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+NULL_TIMER = NullTimer()
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self) -> List[int]:
+        counts = []
+        total = 0
+        for count in self.counts:
+            total += count
+            counts.append(total)
+        return counts
+
+
+class HistogramSink(TimingSinkInterface):
+    """
+    In-memory histograms of the phase durations (and the `total` one)
+    per endpoint class, method and phase. Per process, like `LRUCache`.
+    """
+
+    def __init__(
+        self,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        metric_name: str = "http_request_phase_seconds",
+    ) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.metric_name = metric_name
+        self.histograms: Dict[Tuple[str, str, str], Histogram] = {}
+
+    def observe(self, endpoint: str, method: str, phase: str, value: float) -> None:
+        key = (endpoint, method, phase)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    def record(
+        self,
+        endpoint: str,
+        method: str,
+        status_code: int,
+        timer: PhaseTimer,
+        total: float,
+    ) -> None:
+        for phase, duration in timer.durations.items():
+            self.observe(endpoint, method, phase, duration)
+        self.observe(endpoint, method, "total", total)
+
+    def exposition(self) -> str:
+        """
+        Histograms in the Prometheus text exposition format.
+        """
+        name = self.metric_name
+        lines = [
+            f"# HELP {name} Duration of the request processing phases.",
+            f"# TYPE {name} histogram",
+        ]
+        for (endpoint, method, phase), histogram in sorted(self.histograms.items()):
+            labels = f'endpoint="{endpoint}",method="{method}",phase="{phase}"'
+            for bound, count in zip(self.buckets, histogram.cumulative_counts()):
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+class OpenTelemetrySink(TimingSinkInterface):
+    """
+    The request span with a child span per phase, requires `opentelemetry-api`.
+    The spans are created when the request is done, with the recorded times.
+    """
+
+    def __init__(self, tracer: Any = None) -> None:
+        if trace is None:
+            raise ImproperlyConfigured("OpenTelemetrySink requires opentelemetry-api.")
+        self.tracer = tracer or trace.get_tracer("starlette_cbge")
+
+    def record(
+        self,
+        endpoint: str,
+        method: str,
+        status_code: int,
+        timer: PhaseTimer,
+        total: float,
+    ) -> None:
+        def to_ns(moment: float) -> int:
+            return int((timer.wall_started + moment - timer.started) * 1e9)
+
+        request_span = self.tracer.start_span(
+            f"{method} {endpoint}",
+            start_time=to_ns(timer.started),
+            attributes={"http.method": method, "http.status_code": status_code},
+        )
+        spans: List[Any] = []
+        for span in timer.spans:
+            parent = request_span if span.parent is None else spans[span.parent]
+            spans.append(
+                self.tracer.start_span(
+                    span.phase,
+                    context=trace.set_span_in_context(parent),
+                    start_time=to_ns(span.start),
+                )
+            )
+        for span, phase_span in zip(timer.spans, spans):
+            phase_span.end(end_time=to_ns(span.end))
+        request_span.end(end_time=to_ns(timer.started + total))
@@ -1,3 +1,6 @@
+import base64
+import json
+
 import pytest
 
 from starlette_cbge.schema_generator_backends import OpenAPIv3SchemaGenerator
@@ -31,6 +34,74 @@ async def test_authors_endpoint_get_collection(
     ]
 
 
+@pytest.mark.parametrize("base_url", BASE_URLS)
+@pytest.mark.asyncio
+async def test_authors_endpoint_sparse_fieldset(
+    async_client: AsyncTestClient, base_url: str
+) -> None:
+    """
+    Test only the requested fields are responded, the unknown ones are rejected.
+    """
+    await insert_data()
+
+    response = await async_client.get(f"{base_url}/authors?fields=name")
+    assert response.status_code == 200
+    assert response.json() == [
+        {"name": "Author 1"},
+        {"name": "Author 2"},
+        {"name": "Author 3"},
+    ]
+
+    # Ordered by the schema, the whitespaces are ignored
+    response = await async_client.get(f"{base_url}/authors?fields=name, id&limit=1")
+    assert response.status_code == 200
+    assert response.json() == [{"id": 1, "name": "Author 1"}]
+
+    response = await async_client.get(f"{base_url}/authors?fields=name,password")
+    assert response.status_code == 400
+
+    response = await async_client.get(f"{base_url}/authors?fields=,")
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("base_url", BASE_URLS)
+@pytest.mark.asyncio
+async def test_authors_endpoint_filtering(
+    async_client: AsyncTestClient, base_url: str
+) -> None:
+    """
+    Test the collection is filtered and sorted, the invalid filters are rejected.
+    """
+    await insert_data()
+
+    response = await async_client.get(f"{base_url}/authors?id__in=1,3&sort=-id")
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": 3, "name": "Author 3"},
+        {"id": 1, "name": "Author 1"},
+    ]
+
+    response = await async_client.get(
+        f"{base_url}/authors?id__gt=1&name__prefix=Author&limit=1&fields=id"
+    )
+    assert response.status_code == 200
+    assert response.json() == [{"id": 2}]
+    # The next page keeps the filters
+    assert response.headers["link"] == (
+        f"<http://testserver{base_url}/authors?id__gt=1&name__prefix=Author"
+        '&fields=id&limit=1&offset=1>; rel="next"'
+    )
+
+    response = await async_client.get(f"{base_url}/authors?name=Author 2")
+    assert response.json() == [{"id": 2, "name": "Author 2"}]
+
+    response = await async_client.get(f"{base_url}/authors?id=one")
+    assert response.status_code == 400
+
+    response = await async_client.get(f"{base_url}/authors?sort=id,-name")
+    assert response.status_code == 400
+
+
 @pytest.mark.parametrize("base_url", BASE_URLS)
 @pytest.mark.asyncio
 async def test_authors_endpoint_post(
@@ -101,6 +172,24 @@ async def test_author_endpoint_get_item(
     assert response.json() == {"id": 3, "name": "Author 3"}
 
 
+@pytest.mark.asyncio
+async def test_author_endpoint_phase_timings(async_client: AsyncTestClient) -> None:
+    """
+    Test the phase timings of the item endpoint are exposed as the metrics.
+    """
+    await insert_data()
+
+    response = await async_client.get(f"{API_PYDANTIC_BASE_URL}/authors/3")
+    assert response.status_code == 200
+
+    response = await async_client.get("/metrics")
+    assert response.status_code == 200
+    assert (
+        'http_request_phase_seconds_count{endpoint="Author",method="GET",'
+        'phase="handler"}'
+    ) in response.text
+
+
 @pytest.mark.parametrize("base_url", BASE_URLS)
 @pytest.mark.asyncio
 async def test_author_endpoint_get_missing_item(
@@ -155,6 +244,70 @@ async def test_author_endpoint_delete_item(
     ]
 
 
+@pytest.mark.parametrize("base_url", BASE_URLS)
+@pytest.mark.asyncio
+async def test_author_endpoint_conditional_get(
+    async_client: AsyncTestClient, base_url: str
+) -> None:
+    """
+    Test the unchanged item is not sent again to the client with its ETag.
+    """
+    await insert_data()
+
+    response = await async_client.get(f"{base_url}/authors/3")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+
+    response = await async_client.get(
+        f"{base_url}/authors/3", headers={"if-none-match": etag}
+    )
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+    await async_client.put(f"{base_url}/authors/3", json={"name": "Author 3 changed"})
+
+    response = await async_client.get(
+        f"{base_url}/authors/3", headers={"if-none-match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.parametrize("base_url", BASE_URLS)
+@pytest.mark.asyncio
+async def test_author_endpoint_conditional_put(
+    async_client: AsyncTestClient, base_url: str
+) -> None:
+    """
+    Test the item is not overwritten if it has changed since it was fetched.
+    """
+    await insert_data()
+
+    etag = (await async_client.get(f"{base_url}/authors/3")).headers["etag"]
+
+    response = await async_client.put(
+        f"{base_url}/authors/3",
+        json={"name": "Author 3 changed"},
+        headers={"if-match": etag},
+    )
+    assert response.status_code == 200
+
+    response = await async_client.put(
+        f"{base_url}/authors/3",
+        json={"name": "Author 3 changed again"},
+        headers={"if-match": etag},
+    )
+    assert response.status_code == 412
+    assert response.json()["description"] == "Precondition failed"
+
+    response = await async_client.delete(
+        f"{base_url}/authors/4", headers={"if-match": "*"}
+    )
+    assert response.status_code == 412
+
+
 @pytest.mark.asyncio
 async def test_the_schema_generation(async_client: AsyncTestClient) -> None:
 
@@ -165,3 +318,288 @@ async def test_the_schema_generation(async_client: AsyncTestClient) -> None:
     schema = schemas.get_schema(routes=async_client.app.routes)
     # Just check if it works for now
     assert schema
+
+
+@pytest.mark.parametrize("base_url", BASE_URLS)
+@pytest.mark.asyncio
+async def test_authors_endpoint_post_form(
+    async_client: AsyncTestClient, base_url: str
+) -> None:
+    """
+    Test the post method with the url encoded form payload.
+    """
+    response = await async_client.post(f"{base_url}/authors", data={"name": "Author X"})
+    assert response.status_code == 200
+    assert response.json() == {"id": 1, "name": "Author X"}
+
+
+@pytest.mark.parametrize("base_url", BASE_URLS)
+@pytest.mark.asyncio
+async def test_authors_endpoint_post_malformed_json(
+    async_client: AsyncTestClient, base_url: str
+) -> None:
+    """
+    Test the post method with the malformed JSON payload.
+    """
+    response = await async_client.post(
+        f"{base_url}/authors",
+        data="{'name'",
+        headers={"content-type": "application/json"},
+    )
+    assert response.status_code == 400
+    assert response.json() == {"description": "Malformed JSON body", "errors": None}
+
+
+@pytest.mark.parametrize("base_url", BASE_URLS)
+@pytest.mark.asyncio
+async def test_authors_endpoint_post_unsupported_media_type(
+    async_client: AsyncTestClient, base_url: str
+) -> None:
+    """
+    Test the post method with the payload of unsupported content type.
+    """
+    response = await async_client.post(
+        f"{base_url}/authors", data="name", headers={"content-type": "text/plain"}
+    )
+    assert response.status_code == 415
+    assert response.json() == {"description": "Unsupported media type", "errors": None}
+
+
+@pytest.mark.parametrize("base_url", BASE_URLS)
+@pytest.mark.asyncio
+async def test_authors_stream_endpoint_get_collection(
+    async_client: AsyncTestClient, base_url: str
+) -> None:
+    """
+    Test the streamed get collection method.
+    """
+    await insert_data()
+
+    response = await async_client.get(f"{base_url}/authors/stream?offset=1")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"id": 2, "name": "Author 2"},
+        {"id": 3, "name": "Author 3"},
+    ]
+
+
+@pytest.mark.parametrize("base_url", BASE_URLS)
+@pytest.mark.asyncio
+async def test_authors_endpoint_post_many(
+    async_client: AsyncTestClient, base_url: str
+) -> None:
+    """
+    Test the bulk post method.
+    """
+    response = await async_client.post(
+        f"{base_url}/authors", json=[{"name": "Author X"}, {"name": "Author Y"}]
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": 1, "name": "Author X"},
+        {"id": 2, "name": "Author Y"},
+    ]
+
+
+@pytest.mark.parametrize("base_url", BASE_URLS)
+@pytest.mark.asyncio
+async def test_authors_endpoint_post_many_invalid_payload(
+    async_client: AsyncTestClient, base_url: str
+) -> None:
+    """
+    Test the bulk post method with an invalid item, nothing is created.
+    """
+    response = await async_client.post(
+        f"{base_url}/authors", json=[{"name": "Author X"}, {"foo": "bar"}]
+    )
+    assert response.status_code == 422
+    assert "1" in json.dumps(response.json()["errors"])
+
+    response = await async_client.get(f"{base_url}/authors")
+    assert response.json() == []
+
+
+@pytest.mark.parametrize("base_url", BASE_URLS)
+@pytest.mark.asyncio
+async def test_authors_endpoint_patch_many(
+    async_client: AsyncTestClient, base_url: str
+) -> None:
+    """
+    Test the bulk patch method.
+    """
+    await insert_data()
+
+    response = await async_client.patch(
+        f"{base_url}/authors",
+        json=[{"id": 3, "name": "Author 3 changed"}, {"id": 1, "name": "Author 1!"}],
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": 3, "name": "Author 3 changed"},
+        {"id": 1, "name": "Author 1!"},
+    ]
+
+
+@pytest.mark.parametrize("base_url", BASE_URLS)
+@pytest.mark.asyncio
+async def test_authors_endpoint_patch_many_missing_item(
+    async_client: AsyncTestClient, base_url: str
+) -> None:
+    """
+    Test the bulk patch method with a missing item, nothing is updated.
+    """
+    await insert_data()
+
+    response = await async_client.patch(
+        f"{base_url}/authors",
+        json=[{"id": 1, "name": "Author 1!"}, {"id": 333, "name": "Author 333"}],
+    )
+    assert response.status_code == 409
+    assert response.json()["errors"] == [{"index": 1, "description": "Not found"}]
+
+    response = await async_client.get(f"{base_url}/authors/1")
+    assert response.json() == {"id": 1, "name": "Author 1"}
+
+
+@pytest.mark.parametrize("base_url", BASE_URLS)
+@pytest.mark.asyncio
+async def test_author_endpoint_rejects_array_payload(
+    async_client: AsyncTestClient, base_url: str
+) -> None:
+    """
+    Test the item endpoint without bulk schemas with an array payload.
+    """
+    await insert_data()
+
+    response = await async_client.put(
+        f"{base_url}/authors/3", json=[{"name": "Author 3 changed"}]
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("base_url", BASE_URLS)
+@pytest.mark.asyncio
+async def test_author_endpoint_missing_item_modifications(
+    async_client: AsyncTestClient, base_url: str
+) -> None:
+    """
+    Test the put and delete methods with a missing item.
+    """
+    response = await async_client.put(
+        f"{base_url}/authors/333", json={"name": "Author 333"}
+    )
+    assert response.status_code == 404
+
+    response = await async_client.delete(f"{base_url}/authors/333")
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("base_url", BASE_URLS)
+@pytest.mark.asyncio
+async def test_authors_endpoint_get_collection_paginated(
+    async_client: AsyncTestClient, base_url: str
+) -> None:
+    """
+    Test the offset pagination of the collection.
+    """
+    await insert_data()
+
+    response = await async_client.get(f"{base_url}/authors?limit=2")
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": 1, "name": "Author 1"},
+        {"id": 2, "name": "Author 2"},
+    ]
+    assert response.headers["link"] == (
+        f'<http://testserver{base_url}/authors?limit=2&offset=2>; rel="next"'
+    )
+
+    response = await async_client.get(f"{base_url}/authors?limit=x")
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("base_url", BASE_URLS)
+@pytest.mark.asyncio
+async def test_authors_pages_endpoint_cursors(
+    async_client: AsyncTestClient, base_url: str
+) -> None:
+    """
+    Test walking the cursor paginated collection forth and back.
+    """
+    await insert_data()
+
+    response = await async_client.get(f"{base_url}/authors/pages?limit=2")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["items"] == [
+        {"id": 1, "name": "Author 1"},
+        {"id": 2, "name": "Author 2"},
+    ]
+    assert data["prev"] is None
+
+    response = await async_client.get(data["next"])
+    data = response.json()
+    assert data["items"] == [{"id": 3, "name": "Author 3"}]
+    assert data["next"] is None
+
+    response = await async_client.get(data["prev"])
+    data = response.json()
+    assert data["items"] == [
+        {"id": 1, "name": "Author 1"},
+        {"id": 2, "name": "Author 2"},
+    ]
+    assert data["prev"] is None
+
+
+@pytest.mark.parametrize("base_url", BASE_URLS)
+@pytest.mark.asyncio
+async def test_authors_pages_endpoint_forged_cursor(
+    async_client: AsyncTestClient, base_url: str
+) -> None:
+    """
+    Test the cursor with a non scalar key is rejected before it reaches the query.
+    """
+    data = json.dumps(["after", {"name": "Author 1", "id": [1]}]).encode("utf-8")
+    cursor = base64.urlsafe_b64encode(data).decode("ascii")
+
+    response = await async_client.get(f"{base_url}/authors/pages?cursor={cursor}")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_the_schema_generation_pagination(async_client: AsyncTestClient) -> None:
+    """
+    Test the pagination params are documented.
+    """
+    schemas = OpenAPIv3SchemaGenerator(
+        {"openapi": "3.0.0", "info": {"title": "Example API", "version": "1.0"}}
+    )
+
+    schema = schemas.get_schema(routes=async_client.app.routes)
+
+    operation = schema["paths"][f"{API_PYDANTIC_BASE_URL}/authors"]["get"]
+    assert [parameter["name"] for parameter in operation["parameters"]] == [
+        "limit",
+        "offset",
+        "id",
+        "id__in",
+        "id__gt",
+        "id__gte",
+        "id__lt",
+        "id__lte",
+        "name",
+        "name__prefix",
+        "sort",
+        "fields",
+    ]
+
+    operation = schema["paths"][f"{API_PYDANTIC_BASE_URL}/authors/pages"]["get"]
+    assert [parameter["name"] for parameter in operation["parameters"]] == [
+        "limit",
+        "cursor",
+    ]
+    response_schema = operation["responses"]["200"]["content"]["application/json"][
+        "schema"
+    ]
+    assert set(response_schema["properties"]) == {"items", "next", "prev"}
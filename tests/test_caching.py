@@ -0,0 +1,260 @@
+import typing
+
+import pytest
+
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+from starlette_cbge.caching import CachedResponse, LRUCache, make_cache_key
+from starlette_cbge.endpoints import ListEndpoint, PydanticBaseEndpoint
+from starlette_cbge.exceptions import ImproperlyConfigured
+from starlette_cbge.pagination import OffsetPagination
+from starlette_cbge.schema_backends import PydanticSchema, PydanticListSchema
+
+
+cache = LRUCache()
+records: typing.Dict[int, str] = {}
+calls: typing.List[str] = []
+
+
+class BooksGetRequestSchema(PydanticSchema):
+    limit: int = 100
+
+
+class BookPostRequestSchema(PydanticSchema):
+    title: str
+
+
+class BookIDRequestSchema(PydanticSchema):
+    id: int
+
+
+class BookResponseSchema(PydanticSchema):
+    id: int
+    title: str
+
+
+class BookResponseListSchema(PydanticListSchema):
+    id: int
+    title: str
+
+
+class Books(PydanticBaseEndpoint):
+    cache_backend = cache
+    cache_namespace = "books"
+    cached_methods = (("GET", 60),)
+
+    request_schemas = (("GET", BooksGetRequestSchema), ("POST", BookPostRequestSchema))
+    response_schemas = (("GET", BookResponseListSchema), ("POST", BookResponseSchema))
+
+    async def get(self, data: typing.Dict[str, typing.Any]) -> typing.Any:
+        calls.append("books")
+        return [{"id": id, "title": title} for id, title in records.items()][
+            : data["limit"]
+        ]
+
+    async def post(self, data: typing.Dict[str, typing.Any]) -> typing.Any:
+        id = len(records) + 1
+        records[id] = data["title"]
+        return {"id": id, "title": data["title"]}
+
+
+class BooksPages(PydanticBaseEndpoint, ListEndpoint):
+    cache_backend = cache
+    cache_namespace = "books"
+    cached_methods = (("GET", 60),)
+    pagination = OffsetPagination()
+
+    request_schemas = (("GET", BookPostRequestSchema),)
+    response_schemas = (("GET", BookResponseListSchema),)
+
+    async def get(self, data: typing.Dict[str, typing.Any]) -> typing.Any:
+        calls.append("pages")
+        page_request = self.page_request
+        assert page_request is not None
+        return [
+            {"id": id, "title": title}
+            for id, title in records.items()
+            if title.startswith(data["title"])
+        ][page_request.offset : page_request.offset + page_request.limit + 1]
+
+
+class Book(PydanticBaseEndpoint):
+    cache_backend = cache
+    cache_namespace = "books"
+    cached_methods = (("GET", 60),)
+
+    request_schemas = (("GET", BookIDRequestSchema),)
+    response_schemas = (("GET", BookResponseSchema),)
+
+    async def get(self, data: typing.Dict[str, typing.Any]) -> typing.Any:
+        calls.append("book")
+        return {"id": data["id"], "title": records[data["id"]]}
+
+
+app = Starlette()
+app.add_route("/books", Books, methods=["GET", "HEAD", "POST"])
+app.add_route("/books/pages", BooksPages, methods=["GET", "HEAD"])
+app.add_route("/books/{id}", Book, methods=["GET", "HEAD"])
+
+
+@pytest.fixture
+def client() -> typing.Iterator[TestClient]:
+    cache.clear()
+    records.clear()
+    records.update({1: "Book 1", 2: "Book 2"})
+    calls.clear()
+    yield TestClient(app)
+
+
+def test_get_responses_are_cached(client: TestClient) -> None:
+    """
+    Test the repeated requests are served from the cache,
+    with the same body and headers.
+    """
+    response = client.get("/books")
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": 1, "title": "Book 1"},
+        {"id": 2, "title": "Book 2"},
+    ]
+
+    cached_response = client.get("/books")
+    assert cached_response.status_code == 200
+    assert cached_response.content == response.content
+    assert cached_response.headers == response.headers
+    assert calls == ["books"]
+
+
+def test_cache_keys_use_deserialized_payload(client: TestClient) -> None:
+    """
+    Test the keys are derived from the validated payload, not from the raw query.
+    """
+    client.get("/books")
+    client.get("/books?limit=100")
+    client.get("/books?limit=100&unknown=1")
+    assert calls == ["books"]
+
+    response = client.get("/books?limit=1")
+    assert response.json() == [{"id": 1, "title": "Book 1"}]
+    assert calls == ["books", "books"]
+
+    # Validation errors are not cached
+    assert client.get("/books?limit=x").status_code == 422
+    assert client.get("/books?limit=x").status_code == 422
+
+
+def test_paginated_responses_are_cached_per_page(client: TestClient) -> None:
+    """
+    Test the pages are cached separately, with their links.
+    """
+    first_page = client.get("/books/pages?title=Book&limit=1")
+    assert first_page.json() == [{"id": 1, "title": "Book 1"}]
+    assert "offset=1" in first_page.headers["link"]
+
+    second_page = client.get("/books/pages?limit=1&offset=1&title=Book")
+    assert second_page.json() == [{"id": 2, "title": "Book 2"}]
+
+    assert client.get("/books/pages?limit=1&title=Book").content == first_page.content
+    assert (
+        client.get("/books/pages?title=Book&limit=1").headers["link"]
+        == first_page.headers["link"]
+    )
+    assert calls == ["pages", "pages"]
+
+
+def test_writes_invalidate_cache_namespace(client: TestClient) -> None:
+    """
+    Test a successful write invalidates all the endpoints of the namespace.
+    """
+    client.get("/books")
+    client.get("/books/1")
+
+    response = client.post("/books", json={"title": "Book 3"})
+    assert response.status_code == 200
+
+    assert len(client.get("/books").json()) == 3
+    client.get("/books/1")
+    assert calls == ["books", "book", "books", "book"]
+
+    # Failed writes keep the cache
+    assert client.post("/books", json={}).status_code == 422
+    client.get("/books")
+    assert calls == ["books", "book", "books", "book"]
+
+
+def test_cache_configuration_is_validated() -> None:
+    """
+    Test only GET responses can be cached and a backend is required.
+    """
+    with pytest.raises(ImproperlyConfigured):
+
+        class PostCached(PydanticBaseEndpoint):
+            cache_backend = cache
+            cached_methods = (("POST", 60),)
+
+            async def post(self, data: typing.Dict[str, typing.Any]) -> typing.Any:
+                pass
+
+    with pytest.raises(ImproperlyConfigured):
+
+        class NoBackend(PydanticBaseEndpoint):
+            cached_methods = (("GET", 60),)
+
+            async def get(self, data: typing.Dict[str, typing.Any]) -> typing.Any:
+                pass
+
+
+@pytest.mark.asyncio
+async def test_lru_cache_eviction() -> None:
+    """
+    Test the least recently used entries are evicted by the count and by the size.
+    """
+    lru_cache = LRUCache(max_entries=2, max_size=100)
+    first, second, third = (
+        CachedResponse(b"x" * 10, 200, ()),
+        CachedResponse(b"y" * 10, 200, ()),
+        CachedResponse(b"z" * 10, 200, ()),
+    )
+
+    await lru_cache.set("first", first, 60)
+    await lru_cache.set("second", second, 60)
+    assert await lru_cache.get("first") == first
+    await lru_cache.set("third", third, 60)
+
+    assert await lru_cache.get("second") is None
+    assert await lru_cache.get("first") == first
+    assert await lru_cache.get("third") == third
+
+    large = CachedResponse(b"l" * 95, 200, ())
+    await lru_cache.set("large", large, 60)
+    assert len(lru_cache) == 1
+    assert lru_cache.size == 95
+
+    # Larger than the whole cache
+    await lru_cache.set("huge", CachedResponse(b"h" * 101, 200, ()), 60)
+    assert await lru_cache.get("huge") is None
+    assert await lru_cache.get("large") == large
+
+
+@pytest.mark.asyncio
+async def test_lru_cache_expiration_and_versions() -> None:
+    """
+    Test the expired entries are not returned
+    and the invalidation changes the keys of the namespace.
+    """
+    lru_cache = LRUCache()
+    response = CachedResponse(b"{}", 200, ())
+
+    await lru_cache.set("expired", response, 0)
+    assert await lru_cache.get("expired") is None
+    assert lru_cache.size == 0
+
+    version = await lru_cache.get_version("books")
+    key = make_cache_key("books", version, {"limit": 100})
+    assert key == make_cache_key("books", version, {"limit": 100})
+
+    await lru_cache.invalidate("books")
+    assert await lru_cache.get_version("books") == version + 1
+    assert make_cache_key("books", version + 1, {"limit": 100}) != key
+    assert await lru_cache.get_version("authors") == 0
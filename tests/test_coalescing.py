@@ -0,0 +1,182 @@
+import asyncio
+import typing
+
+import pytest
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+
+from starlette_cbge.endpoints import PydanticBaseEndpoint
+from starlette_cbge.exceptions import (
+    ExtendedHTTPException,
+    ImproperlyConfigured,
+    NotFoundException,
+)
+from starlette_cbge.schema_backends import PydanticSchema
+from starlette_cbge.testing import call_asgi
+
+
+calls: typing.List[typing.Dict[str, typing.Any]] = []
+
+
+class ReportRequestSchema(PydanticSchema):
+    id: int
+    delay: float = 0
+
+
+class ReportResponseSchema(PydanticSchema):
+    id: int
+
+
+class Report(PydanticBaseEndpoint):
+    coalesced_methods = (("GET", 1.0),)
+
+    request_schemas = (("GET", ReportRequestSchema),)
+    response_schemas = (("GET", ReportResponseSchema),)
+
+    async def validate_get_action(self, data: typing.Dict[str, typing.Any]) -> None:
+        if data["id"] == 0:
+            raise NotFoundException()
+
+    async def get(self, data: typing.Dict[str, typing.Any]) -> typing.Any:
+        calls.append(data)
+        await asyncio.sleep(data["delay"])
+        return {"id": data["id"]}
+
+
+class ImpatientReport(Report):
+    coalesced_methods = (("GET", 0.01),)
+
+
+class PrivateReport(Report):
+    async def validate_action(self, request: Request) -> typing.Dict[str, typing.Any]:
+        if request.headers.get("authorization") not in ("alice", "bob"):
+            raise ExtendedHTTPException(403, "Forbidden")
+        return await super().validate_action(request)
+
+    def get_coalesce_identity(self, request: Request) -> typing.Any:
+        return request.headers.get("authorization")
+
+
+app = Starlette()
+app.add_route("/reports/{id}", Report, methods=["GET"])
+app.add_route("/impatient_reports/{id}", ImpatientReport, methods=["GET"])
+app.add_route("/private_reports/{id}", PrivateReport, methods=["GET"])
+
+
+async def get(
+    path: str, query_string: bytes = b"", user: typing.Optional[str] = None
+) -> typing.Tuple[int, bytes]:
+    """
+    Calls the app directly, so the requests are really concurrent.
+    """
+    headers = () if user is None else ((b"authorization", user.encode()),)
+    return await call_asgi(app, "GET", path, query_string, headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_are_coalesced() -> None:
+    """
+    Test the concurrent requests with the same payload share the handler call.
+    """
+    calls.clear()
+    responses = await asyncio.gather(
+        get("/reports/1", b"delay=0.05"),
+        get("/reports/1", b"delay=0.05"),
+        # The same deserialized payload out of a different query
+        get("/reports/1", b"delay=0.050"),
+        get("/reports/2", b"delay=0.05"),
+    )
+
+    assert responses == [
+        (200, b'{"id":1}'),
+        (200, b'{"id":1}'),
+        (200, b'{"id":1}'),
+        (200, b'{"id":2}'),
+    ]
+    assert [data["id"] for data in calls] == [1, 2]
+
+    # The finished flight is not reused
+    await get("/reports/1")
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_coalesced_failures_are_shared() -> None:
+    """
+    Test the handled exceptions are shared as the failure responses.
+    """
+    calls.clear()
+    responses = await asyncio.gather(get("/reports/0"), get("/reports/0"))
+    assert [status for status, _ in responses] == [404, 404]
+
+
+@pytest.mark.asyncio
+async def test_coalesced_requests_are_validated() -> None:
+    """
+    Test every request is validated before it joins the flight,
+    only the requests of the same caller share the response.
+    """
+    calls.clear()
+    responses = await asyncio.gather(
+        get("/private_reports/1", b"delay=0.05", user="alice"),
+        get("/private_reports/1", b"delay=0.05"),
+        get("/private_reports/1", b"delay=0.05", user="mallory"),
+        get("/private_reports/1", b"delay=0.05", user="alice"),
+    )
+    assert [status for status, _ in responses] == [200, 403, 403, 200]
+    assert len(calls) == 1
+
+    calls.clear()
+    user_responses = await asyncio.gather(
+        get("/private_reports/1", b"delay=0.05", user="alice"),
+        get("/private_reports/1", b"delay=0.05", user="bob"),
+    )
+    assert user_responses == [(200, b'{"id":1}'), (200, b'{"id":1}')]
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_coalescing_wait_is_bounded() -> None:
+    """
+    Test the request doesn't wait for the slow flight longer than the timeout.
+    """
+    calls.clear()
+    responses = await asyncio.gather(
+        get("/impatient_reports/1", b"delay=0.1"),
+        get("/impatient_reports/1", b"delay=0.1"),
+    )
+
+    assert responses == [(200, b'{"id":1}'), (200, b'{"id":1}')]
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_keeps_flight() -> None:
+    """
+    Test the requests waiting for the flight get the response
+    if the request that started it is cancelled.
+    """
+    calls.clear()
+    first = asyncio.ensure_future(get("/reports/1", b"delay=0.05"))
+    await asyncio.sleep(0.01)
+    second = asyncio.ensure_future(get("/reports/1", b"delay=0.05"))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == (200, b'{"id":1}')
+    assert len(calls) == 1
+    assert first.cancelled()
+
+
+def test_coalescing_configuration_is_validated() -> None:
+    """
+    Test only GET requests can be coalesced.
+    """
+    with pytest.raises(ImproperlyConfigured):
+
+        class PostCoalesced(PydanticBaseEndpoint):
+            coalesced_methods = (("POST", 1),)
+
+            async def post(self, data: typing.Dict[str, typing.Any]) -> typing.Any:
+                pass
@@ -0,0 +1,170 @@
+import datetime
+import typing
+
+import pytest
+
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+from starlette_cbge.conditional import etag_matches, format_http_date, parse_http_date
+from starlette_cbge.endpoints import PydanticBaseEndpoint
+from starlette_cbge.exceptions import ImproperlyConfigured, PreconditionFailedException
+from starlette_cbge.schema_backends import PydanticSchema
+
+
+UPDATED_AT = datetime.datetime(2020, 1, 2, 3, 4, 5, 600000)
+calls: typing.List[str] = []
+
+
+class DocumentRequestSchema(PydanticSchema):
+    id: int
+
+
+class DocumentResponseSchema(PydanticSchema):
+    id: int
+    version: int
+
+
+class Document(PydanticBaseEndpoint):
+    etag_fields = (("GET", "version"),)
+    last_modified_fields = (("GET", "updated_at"),)
+
+    request_schemas = (("GET", DocumentRequestSchema),)
+    response_schemas = (("GET", DocumentResponseSchema),)
+
+    async def get(self, data: typing.Dict[str, typing.Any]) -> typing.Any:
+        return {"id": data["id"], "version": 7, "updated_at": UPDATED_AT}
+
+    async def acquire_response_context(
+        self, request_data: typing.Dict[str, typing.Any], raw_response: typing.Any
+    ) -> typing.Any:
+        calls.append("serialise")
+        return raw_response
+
+
+class StaleVersionException(PreconditionFailedException):
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return {"description": "Stale version", "errors": None}
+
+
+class VersionedDocument(PydanticBaseEndpoint):
+    etag_fields = (("GET", "version"), ("PUT", "version"))
+    exception_classes = (("412", StaleVersionException),)
+
+    request_schemas = (("GET", DocumentRequestSchema), ("PUT", DocumentRequestSchema))
+    response_schemas = (
+        ("GET", DocumentResponseSchema),
+        ("PUT", DocumentResponseSchema),
+    )
+
+    async def get(self, data: typing.Dict[str, typing.Any]) -> typing.Any:
+        return {"id": data["id"], "version": 7}
+
+    async def put(self, data: typing.Dict[str, typing.Any]) -> typing.Any:
+        return {"id": data["id"], "version": 8}
+
+
+app = Starlette()
+app.add_route("/documents/{id}", Document, methods=["GET"])
+app.add_route("/versioned_documents/{id}", VersionedDocument, methods=["GET", "PUT"])
+
+
+def test_etag_matches() -> None:
+    """
+    Test the weak comparison of the ETags.
+    """
+    assert etag_matches('W/"1"', 'W/"1"')
+    assert etag_matches('"1"', 'W/"1"')
+    assert etag_matches('W/"0", W/"1"', '"1"')
+    assert etag_matches("*", 'W/"1"')
+    assert not etag_matches('W/"2"', 'W/"1"')
+    assert not etag_matches(None, 'W/"1"')
+
+
+def test_http_dates() -> None:
+    """
+    Test the HTTP dates are formatted in GMT and invalid ones are ignored.
+    """
+    value = datetime.datetime(2020, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+    assert format_http_date(value) == "Thu, 02 Jan 2020 03:04:05 GMT"
+    assert parse_http_date("Thu, 02 Jan 2020 03:04:05 GMT") == value
+    assert parse_http_date("yesterday") is None
+
+
+def test_version_field_etag_and_last_modified() -> None:
+    """
+    Test the validators are taken from the raw response
+    and the unchanged one is not serialized at all.
+    """
+    calls.clear()
+    client = TestClient(app)
+
+    response = client.get("/documents/1")
+    assert response.status_code == 200
+    assert response.headers["etag"] == 'W/"7"'
+    assert response.headers["last-modified"] == "Thu, 02 Jan 2020 03:04:05 GMT"
+    assert calls == ["serialise"]
+
+    response = client.get("/documents/1", headers={"if-none-match": 'W/"7"'})
+    assert response.status_code == 304
+    assert response.headers["etag"] == 'W/"7"'
+
+    response = client.get(
+        "/documents/1", headers={"if-modified-since": "Thu, 02 Jan 2020 03:04:05 GMT"}
+    )
+    assert response.status_code == 304
+    assert calls == ["serialise"]
+
+    # `If-None-Match` takes precedence
+    response = client.get(
+        "/documents/1",
+        headers={
+            "if-none-match": 'W/"6"',
+            "if-modified-since": "Thu, 02 Jan 2020 03:04:05 GMT",
+        },
+    )
+    assert response.status_code == 200
+
+    response = client.get(
+        "/documents/1", headers={"if-modified-since": "Thu, 02 Jan 2020 03:04:04 GMT"}
+    )
+    assert response.status_code == 200
+
+
+def test_precondition_failed_exception_class() -> None:
+    """
+    Test the failed `If-Match` is responded with the 412 class of the endpoint.
+    """
+    client = TestClient(app)
+    etag = client.get("/versioned_documents/1").headers["etag"]
+
+    response = client.put("/versioned_documents/1", headers={"if-match": etag})
+    assert response.status_code == 200
+
+    response = client.put("/versioned_documents/1", headers={"if-match": 'W/"0"'})
+    assert response.status_code == 412
+    assert response.json() == {"description": "Stale version", "errors": None}
+
+
+def test_conditional_configuration_is_validated() -> None:
+    """
+    Test the ETags are not allowed for POST and `Last-Modified` for the writes.
+    """
+    with pytest.raises(ImproperlyConfigured):
+
+        class PostETag(PydanticBaseEndpoint):
+            etag_fields = (("POST", None),)
+
+            async def get(self, data: typing.Dict[str, typing.Any]) -> typing.Any:
+                pass
+
+            async def post(self, data: typing.Dict[str, typing.Any]) -> typing.Any:
+                pass
+
+    with pytest.raises(ImproperlyConfigured):
+
+        class PutLastModified(PydanticBaseEndpoint):
+            last_modified_fields = (("PUT", "updated_at"),)
+
+            async def put(self, data: typing.Dict[str, typing.Any]) -> typing.Any:
+                pass
@@ -0,0 +1,195 @@
+import asyncio
+import typing
+
+import pytest
+
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+from starlette_cbge.dataloader import DataLoader, group_by, index_by
+from starlette_cbge.endpoints import PydanticBaseEndpoint
+from starlette_cbge.exceptions import ImproperlyConfigured
+from starlette_cbge.schema_backends import PydanticListSchema, PydanticSchema
+
+
+POSTS = [
+    {"id": 1, "author_id": 1, "title": "Post 1"},
+    {"id": 2, "author_id": 2, "title": "Post 2"},
+    {"id": 3, "author_id": 1, "title": "Post 3"},
+]
+batches: typing.List[typing.List[typing.Any]] = []
+
+
+async def load_posts(author_ids: typing.List[int]) -> typing.List[typing.Any]:
+    batches.append(author_ids)
+    return group_by(POSTS, "author_id", author_ids)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_are_batched() -> None:
+    """
+    Test the keys loaded within one loop iteration are loaded with one call
+    and memoized.
+    """
+    batches.clear()
+    loader = DataLoader(load_posts)
+
+    posts = await asyncio.gather(
+        loader.load(1), loader.load(2), loader.load(1), loader.load(3)
+    )
+    assert [[post["id"] for post in author_posts] for author_posts in posts] == [
+        [1, 3],
+        [2],
+        [1, 3],
+        [],
+    ]
+    assert batches == [[1, 2, 3]]
+
+    assert await loader.load_many([2, 4]) == [[POSTS[1]], []]
+    assert batches == [[1, 2, 3], [4]]
+
+
+@pytest.mark.asyncio
+async def test_batches_are_split_by_size() -> None:
+    """
+    Test the batch function gets up to `max_batch_size` keys.
+    """
+    batches.clear()
+    loader = DataLoader(load_posts, max_batch_size=2)
+
+    await loader.load_many([1, 2, 3])
+    assert batches == [[1, 2], [3]]
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_not_memoized() -> None:
+    """
+    Test the failure is propagated to every load of the batch
+    and the keys are loaded again next time.
+    """
+    calls = []
+
+    async def load(keys: typing.List[int]) -> typing.List[int]:
+        calls.append(keys)
+        if len(calls) == 1:
+            raise RuntimeError("Database is gone")
+        return keys[1:]
+
+    loader = DataLoader(load)
+
+    results = await asyncio.gather(
+        loader.load(1), loader.load(2), return_exceptions=True
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    # Wrong number of values
+    with pytest.raises(ValueError):
+        await loader.load(1)
+
+    loader.prime(1, 10)
+    assert await loader.load(1) == 10
+    assert calls == [[1, 2], [1]]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_batch_cancels_loads() -> None:
+    """
+    Test the loads of a cancelled batch are cancelled instead of left pending.
+    """
+    calls = []
+
+    async def load(keys: typing.List[int]) -> typing.List[int]:
+        calls.append(keys)
+        if len(calls) == 1:
+            raise asyncio.CancelledError()
+        return keys
+
+    loader = DataLoader(load)
+
+    results = await asyncio.gather(
+        loader.load(1), loader.load(2), return_exceptions=True
+    )
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+
+    assert await loader.load(1) == 1
+    assert calls == [[1, 2], [1]]
+
+
+def test_rows_are_aligned_with_keys() -> None:
+    """
+    Test the rows are returned in the order of the keys.
+    """
+    assert index_by(POSTS, "id", [3, 4, 1]) == [POSTS[2], None, POSTS[0]]
+    assert group_by(POSTS, "author_id", [2, 1]) == [[POSTS[1]], [POSTS[0], POSTS[2]]]
+
+
+class PostSchema(PydanticSchema):
+    id: int
+    title: str
+
+
+class AuthorResponseListSchema(PydanticListSchema):
+    id: int
+    posts: typing.List[PostSchema]
+
+
+class Authors(PydanticBaseEndpoint):
+    dataloaders = (("posts", "load_posts"),)
+
+    request_schemas = (("GET", PydanticSchema),)
+    response_schemas = (("GET", AuthorResponseListSchema),)
+
+    async def get(self, request_data: typing.Dict) -> typing.Any:
+        return [{"id": 1}, {"id": 2}, {"id": 3}]
+
+    async def load_posts(self, author_ids: typing.List[int]) -> typing.List[typing.Any]:
+        return await load_posts(author_ids)
+
+    async def acquire_response_context(
+        self, request_data: typing.Dict, raw_response: typing.Any
+    ) -> typing.Any:
+        posts = self.get_loader("posts")
+        authors_posts = await asyncio.gather(
+            *(posts.load(author["id"]) for author in raw_response)
+        )
+        return [
+            {**author, "posts": author_posts}
+            for author, author_posts in zip(raw_response, authors_posts)
+        ]
+
+
+app = Starlette()
+app.add_route("/authors", Authors, methods=["GET"])
+
+
+def test_endpoint_loaders_are_request_scoped() -> None:
+    """
+    Test the nested resources of a list response are loaded with one batch
+    per request.
+    """
+    batches.clear()
+    client = TestClient(app)
+
+    response = client.get("/authors")
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "id": 1,
+            "posts": [{"id": 1, "title": "Post 1"}, {"id": 3, "title": "Post 3"}],
+        },
+        {"id": 2, "posts": [{"id": 2, "title": "Post 2"}]},
+        {"id": 3, "posts": []},
+    ]
+
+    client.get("/authors")
+    assert batches == [[1, 2, 3], [1, 2, 3]]
+
+
+def test_unknown_batch_load_method_is_rejected() -> None:
+    """
+    Test a misnamed batch load method fails at the class creation.
+    """
+    with pytest.raises(ImproperlyConfigured):
+
+        class Misconfigured(PydanticBaseEndpoint):
+            dataloaders = (("posts", "load_missing"),)
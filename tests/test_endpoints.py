@@ -0,0 +1,227 @@
+import typing
+
+import pytest
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None  # type: ignore
+
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+from starlette_cbge.endpoints import ModelItemEndpoint, PydanticBaseEndpoint
+from starlette_cbge.exceptions import (
+    ExtendedHTTPException,
+    ImproperlyConfigured,
+    NotFoundException,
+)
+from starlette_cbge.interfaces import ModelInterface
+from starlette_cbge.schema_backends import PydanticSchema
+
+from example_app.base_api import base_pydantic
+
+
+def test_action_plans_compiled_on_class_creation() -> None:
+    """
+    Test the per method action plans are resolved once for the class.
+    """
+    action_plans = base_pydantic.Author._action_plans
+
+    assert set(action_plans) == {"GET", "HEAD", "PUT", "DELETE"}
+    assert action_plans["GET"].is_async
+    assert action_plans["GET"].handler is base_pydantic.Author.get
+    assert action_plans["GET"].validator is None
+    assert action_plans["GET"].resolver is base_pydantic.Author.read_record
+    assert action_plans["GET"].handler_takes_context
+    assert action_plans["PUT"].resolver is None
+    assert action_plans["HEAD"].handler is action_plans["GET"].handler
+    assert action_plans["HEAD"].response_schema is base_pydantic.AuthorResponseSchema
+
+
+def test_schema_without_handler_is_rejected() -> None:
+    """
+    Test a schema for the method without a handler fails at the class creation.
+    """
+    with pytest.raises(ImproperlyConfigured):
+
+        class Misconfigured(PydanticBaseEndpoint):
+            request_schemas = (("POST", base_pydantic.AuthorPostRequestSchema),)
+            response_schemas = (("POST", base_pydantic.AuthorResponseSchema),)
+
+            async def get(self, request_data: typing.Dict) -> None:
+                pass
+
+
+class RecordsModel(ModelInterface):
+    def __init__(self) -> None:
+        self.records = {1: {"id": 1, "name": "Author 1", "hidden": False}}
+        self.reads: typing.List[int] = []
+
+    async def read(
+        self,
+        values: typing.Dict[str, typing.Any],
+        fields: typing.Optional[typing.Sequence[str]] = None,
+    ) -> typing.Optional[typing.Any]:
+        self.reads.append(values["id"])
+        return self.records.get(values["id"])
+
+
+class Record(PydanticBaseEndpoint, ModelItemEndpoint):
+    model = RecordsModel()
+
+    request_schemas = (("GET", base_pydantic.AuthorIDRequestSchema),)
+    response_schemas = (("GET", base_pydantic.AuthorResponseSchema),)
+
+    async def validate_get_action(
+        self, request_data: typing.Dict, context: typing.Any
+    ) -> None:
+        if context["hidden"]:
+            raise ExtendedHTTPException(403)
+
+
+class RecordNotFoundException(NotFoundException):
+    def __init__(self) -> None:
+        super().__init__(detail="No such record")
+
+
+class CustomRecord(Record):
+    exception_classes = (("404", RecordNotFoundException),)
+
+
+class Greeting(PydanticBaseEndpoint):
+    request_schemas = (("GET", base_pydantic.AuthorIDRequestSchema),)
+    response_schemas = (("GET", base_pydantic.AuthorResponseSchema),)
+
+    async def validate_get_action(self, request_data: typing.Dict) -> typing.Any:
+        return {"id": request_data["id"], "name": f"Author {request_data['id']}"}
+
+    async def get(self, request_data: typing.Dict, context: typing.Any) -> typing.Any:
+        return context
+
+
+class UploadRequestSchema(PydanticSchema):
+    name: str = ""
+    body: bytes = b""
+
+
+class UploadResponseSchema(PydanticSchema):
+    name: str
+    size: int
+
+
+class Upload(PydanticBaseEndpoint):
+    request_schemas = (("POST", UploadRequestSchema),)
+    response_schemas = (("POST", UploadResponseSchema),)
+
+    async def post(self, request_data: typing.Dict) -> typing.Dict:
+        return {"name": request_data["name"], "size": len(request_data["body"])}
+
+
+app = Starlette()
+app.add_route("/records/{id}", Record, methods=["GET"])
+app.add_route("/custom-records/{id}", CustomRecord, methods=["GET"])
+app.add_route("/greetings/{id}", Greeting, methods=["GET"])
+app.add_route("/uploads", Upload, methods=["POST"])
+
+
+def test_context_resolver_loads_record_once() -> None:
+    """
+    Test the record is loaded once for the validator and the handler,
+    a missing one is responded with 404.
+    """
+    client = TestClient(app)
+    model = Record.model
+
+    response = client.get("/records/1")
+    assert response.status_code == 200
+    assert response.json() == {"id": 1, "name": "Author 1"}
+    assert model.reads == [1]
+
+    assert client.get("/records/2").status_code == 404
+    assert model.reads == [1, 2]
+
+    model.records[1]["hidden"] = True
+    assert client.get("/records/1").status_code == 403
+
+
+def test_missing_context_uses_404_exception_class() -> None:
+    """
+    Test the missing record is responded with the 404 exception class
+    of the endpoint.
+    """
+    client = TestClient(app)
+
+    response = client.get("/custom-records/2")
+    assert response.status_code == 404
+    assert response.json()["description"] == "No such record"
+
+
+def test_validator_context_is_passed_to_handler() -> None:
+    """
+    Test the context returned by the validator is passed to the handler.
+    """
+    client = TestClient(app)
+
+    response = client.get("/greetings/3")
+    assert response.status_code == 200
+    assert response.json() == {"id": 3, "name": "Author 3"}
+
+
+def test_unknown_context_resolver_is_rejected() -> None:
+    """
+    Test a misnamed context resolver fails at the class creation.
+    """
+    with pytest.raises(ImproperlyConfigured):
+
+        class Misconfigured(PydanticBaseEndpoint):
+            context_resolvers = (("GET", "read_missing"),)
+
+            async def get(self, request_data: typing.Dict) -> None:
+                pass
+
+
+@pytest.mark.skipif(msgpack is None, reason="msgpack is not installed")
+def test_msgpack_body_is_decoded() -> None:
+    """
+    Test the MessagePack body is decoded to the request data.
+    """
+    client = TestClient(app)
+
+    response = client.post(
+        "/uploads",
+        data=msgpack.packb({"name": "Upload 1"}),
+        headers={"content-type": "application/msgpack"},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"name": "Upload 1", "size": 0}
+
+
+@pytest.mark.skipif(msgpack is None, reason="msgpack is not installed")
+@pytest.mark.parametrize("body", [b"\xc1", b"\x81", b"\x01\x02", b"\xa2\xff\xfe"])
+def test_malformed_msgpack_body_is_rejected(body: bytes) -> None:
+    """
+    Test the malformed MessagePack body is responded with 400.
+    """
+    client = TestClient(app)
+
+    response = client.post(
+        "/uploads", data=body, headers={"content-type": "application/x-msgpack"}
+    )
+    assert response.status_code == 400
+    assert response.json()["description"] == "Malformed MessagePack body"
+
+
+def test_raw_body_is_passed_as_body_field() -> None:
+    """
+    Test the body of unstructured content type is passed as the `body` field.
+    """
+    client = TestClient(app)
+
+    response = client.post(
+        "/uploads",
+        data=b"\x00\x01\x02",
+        headers={"content-type": "application/octet-stream"},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"name": "", "size": 3}
@@ -0,0 +1,215 @@
+import asyncio
+import os
+import threading
+import time
+import typing
+
+import pytest
+
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+from starlette_cbge.conditional import make_etag
+from starlette_cbge.endpoints import PydanticBaseEndpoint
+from starlette_cbge.exceptions import ImproperlyConfigured
+from starlette_cbge.executors import ProcessPool, ThreadPool
+from starlette_cbge.schema_backends import PydanticSchema
+from starlette_cbge.testing import call_asgi
+
+
+reports_pool = ThreadPool("reports", max_workers=1, max_queue=1)
+compute_pool = ProcessPool("compute", max_workers=1)
+
+
+class ReportRequestSchema(PydanticSchema):
+    delay: float = 0
+
+
+class ReportResponseSchema(PydanticSchema):
+    thread: str
+
+
+class Report(PydanticBaseEndpoint):
+    handler_executors = (("GET", reports_pool),)
+
+    request_schemas = (("GET", ReportRequestSchema),)
+    response_schemas = (("GET", ReportResponseSchema),)
+
+    def get(self, data: typing.Dict[str, typing.Any]) -> typing.Any:
+        time.sleep(data["delay"])
+        return {"thread": threading.current_thread().name}
+
+
+class ComputeRequestSchema(PydanticSchema):
+    n: int
+
+
+class ComputeResponseSchema(PydanticSchema):
+    total: int
+    pid: int
+
+
+class Compute(PydanticBaseEndpoint):
+    handler_executors = (("GET", compute_pool),)
+
+    request_schemas = (("GET", ComputeRequestSchema),)
+    response_schemas = (("GET", ComputeResponseSchema),)
+
+    @staticmethod
+    def get(data: typing.Dict[str, typing.Any]) -> typing.Any:
+        return {
+            "total": sum(index * index for index in range(data["n"])),
+            "pid": os.getpid(),
+            "internal": "not in the response schema",
+        }
+
+
+class ScoredCompute(Compute):
+    async def acquire_response_context(
+        self, request_data: typing.Dict[str, typing.Any], raw_response: typing.Any
+    ) -> typing.Any:
+        return {**raw_response, "total": raw_response["total"] + 1}
+
+
+class HashedCompute(PydanticBaseEndpoint):
+    handler_executors = (("GET", compute_pool),)
+    etag_fields = (("GET", None), ("PUT", None))
+
+    request_schemas = (("GET", ComputeRequestSchema), ("PUT", ComputeRequestSchema))
+    response_schemas = (
+        ("GET", ComputeResponseSchema),
+        ("PUT", ComputeResponseSchema),
+    )
+
+    @staticmethod
+    def get(data: typing.Dict[str, typing.Any]) -> typing.Any:
+        return {"total": data["n"], "pid": os.getpid()}
+
+    async def put(self, data: typing.Dict[str, typing.Any]) -> typing.Any:
+        return {"total": data["n"], "pid": os.getpid()}
+
+
+app = Starlette()
+app.add_route("/reports", Report, methods=["GET"])
+app.add_route("/compute", Compute, methods=["GET"])
+app.add_route("/scored", ScoredCompute, methods=["GET"])
+app.add_route("/hashed", HashedCompute, methods=["GET", "PUT"])
+
+
+async def get(path: str, query_string: bytes = b"") -> typing.Tuple[int, bytes]:
+    """
+    Calls the app directly, so the requests are really concurrent.
+    """
+    return await call_asgi(app, "GET", path, query_string)
+
+
+@pytest.mark.asyncio
+async def test_thread_pool_sheds_requests_when_full() -> None:
+    """
+    Test the handler runs in the pool of the endpoint, the requests over
+    the workers and the queue are rejected with 503, the pool takes
+    the new ones once the calls have finished.
+    """
+    responses = await asyncio.gather(*(get("/reports", b"delay=0.1") for _ in range(3)))
+
+    statuses = sorted(status for status, _ in responses)
+    assert statuses == [200, 200, 503]
+    for status, body in responses:
+        if status == 200:
+            assert b"starlette-cbge-reports" in body
+        else:
+            assert b"reports executor is busy" in body
+    assert reports_pool.rejected == 1
+    assert reports_pool.pending == 0
+
+    status, _ = await get("/reports")
+    assert status == 200
+
+
+def test_process_pool_handler() -> None:
+    """
+    Test the handler runs in the worker process, the response is dumped there.
+    """
+    client = TestClient(app)
+    try:
+        response = client.get("/compute", params={"n": 1000})
+    finally:
+        compute_pool.shutdown()
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == sum(index * index for index in range(1000))
+    assert data["pid"] != os.getpid()
+    assert "internal" not in data
+
+    response = client.get("/compute", params={"n": "many"})
+    assert response.status_code == 422
+
+
+def test_process_pool_response_context() -> None:
+    """
+    Test the response context is acquired in the server process,
+    the worker sends the raw response back.
+    """
+    client = TestClient(app)
+    try:
+        response = client.get("/scored", params={"n": 3})
+    finally:
+        compute_pool.shutdown()
+
+    assert response.status_code == 200
+    assert response.json()["total"] == 6
+
+
+def test_process_pool_etags() -> None:
+    """
+    Test the ETags hash the response encoded in the worker,
+    both for `If-None-Match` and `If-Match`.
+    """
+    client = TestClient(app)
+    try:
+        response = client.get("/hashed", params={"n": 10})
+        etag = response.headers["etag"]
+        assert etag == make_etag(response.content)
+
+        response = client.get(
+            "/hashed", params={"n": 10}, headers={"if-none-match": etag}
+        )
+        assert response.status_code == 304
+
+        response = client.put("/hashed", json={"n": 10}, headers={"if-match": etag})
+        assert response.status_code == 200
+
+        response = client.put(
+            "/hashed", json={"n": 10}, headers={"if-match": '"stale"'}
+        )
+        assert response.status_code == 412
+    finally:
+        compute_pool.shutdown()
+
+
+def test_executors_configuration() -> None:
+    """
+    Test only the sync handlers run in the executors,
+    the process pool ones have to be static methods.
+    """
+    with pytest.raises(ImproperlyConfigured, match="only the sync handlers"):
+
+        class AsyncReport(PydanticBaseEndpoint):
+            handler_executors = (("GET", reports_pool),)
+
+            async def get(self, data: typing.Dict[str, typing.Any]) -> typing.Any:
+                return data
+
+    with pytest.raises(ImproperlyConfigured, match="must be a static method"):
+
+        class InstanceCompute(PydanticBaseEndpoint):
+            handler_executors = (("GET", compute_pool),)
+
+            def get(self, data: typing.Dict[str, typing.Any]) -> typing.Any:
+                return data
+
+    with pytest.raises(ImproperlyConfigured, match="no `post` handler"):
+
+        class MissingHandler(PydanticBaseEndpoint):
+            handler_executors = (("POST", reports_pool),)
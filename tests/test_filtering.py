@@ -0,0 +1,120 @@
+import pytest
+
+from starlette_cbge.endpoints import ListEndpoint, PydanticBaseEndpoint
+from starlette_cbge.exceptions import ImproperlyConfigured
+from starlette_cbge.filtering import Condition, FilterQuery, Filtering
+from starlette_cbge.model_backends.databases import get_query_values
+from starlette_cbge.pagination import KeysetPagination
+
+from example_app.base_api import base_pydantic
+
+
+filtering = Filtering(
+    {"id": ("eq", "in", "range"), "name": ("prefix",)},
+    sort_fields=("id", "name"),
+    field_types={"id": int},
+    indexes=(("name", "id"),),
+    max_in_values=3,
+)
+
+
+def test_query_params_are_parsed() -> None:
+    """
+    Test the query params are parsed to the conditions in the declared order,
+    the unknown ones are ignored.
+    """
+    query = filtering.parse(
+        {"name__prefix": "Au", "id__in": "1,2", "id__gte": "2", "limit": "1"}
+    )
+    assert query == FilterQuery(
+        conditions=(
+            Condition("id", "in", (1, 2)),
+            Condition("id", "gte", 2),
+            Condition("name", "prefix", "Au"),
+        )
+    )
+    assert query.shape() == (
+        (("id", "in", 2), ("id", "gte", 1), ("name", "prefix", 1)),
+        (),
+    )
+
+    assert filtering.parse({"sort": "-name,-id"}) == FilterQuery(
+        sort=(("name", True), ("id", True))
+    )
+    assert filtering.parse({"limit": "1"}) is None
+    assert "name" not in filtering.param_names
+
+
+@pytest.mark.parametrize(
+    "query_params",
+    [
+        {"id": "one"},
+        {"id__in": "1,2,3,4"},
+        {"id__in": ","},
+        {"name__prefix": ""},
+        {"sort": "-text"},
+        {"sort": "id,id"},
+        # Not covered by the index
+        {"sort": "id"},
+        {"sort": "name,-id"},
+    ],
+)
+def test_invalid_query_params_are_rejected(query_params: dict) -> None:
+    with pytest.raises(ValueError):
+        filtering.parse(query_params)
+
+
+def test_filter_statements() -> None:
+    """
+    Test the conditions are compiled to the parameterized SQL,
+    the statements are cached per shape of the query.
+    """
+    model = base_pydantic.AuthorsModel
+    query = filtering.parse(
+        {"id__in": "1,2", "name__prefix": "Au", "sort": "-name,-id"}
+    )
+    assert query is not None
+
+    statement = model.get_statement("select_many", query_shape=query.shape())
+    assert statement.sql == (
+        'SELECT "id", "name" FROM "authors" '
+        'WHERE "id" IN (:p0, :p1) AND "name" >= :p2 AND "name" < :p3 '
+        'ORDER BY "name" DESC, "id" DESC LIMIT :p4 OFFSET :p5'
+    )
+    params = statement.bind({"limit": 10, "offset": 0, **get_query_values(query)})
+    assert params == {"p0": 1, "p1": 2, "p2": "Au", "p3": "Av", "p4": 10, "p5": 0}
+
+    other_query = filtering.parse(
+        {"id__in": "3,4", "name__prefix": "B", "sort": "-name,-id"}
+    )
+    assert other_query is not None
+    assert (
+        model.get_statement("select_many", query_shape=other_query.shape()) is statement
+    )
+
+    # The primary key keeps the order total
+    statement = model.get_statement(
+        "select_many", query_shape=FilterQuery(sort=(("name", False),)).shape()
+    )
+    assert 'ORDER BY "name" ASC, "id" ASC' in statement.sql
+
+    query = FilterQuery(conditions=(Condition("name", "eq", "A"),))
+    statement = model.get_statement("select_after", ("id",), query_shape=query.shape())
+    assert statement.sql == (
+        'SELECT "id", "name" FROM "authors" WHERE "name" = :p0 AND "id" > :p1 '
+        'ORDER BY "id" ASC LIMIT :p2'
+    )
+
+
+def test_keyset_sort_conflict_is_rejected() -> None:
+    """
+    Test the filtering can't sort the keyset paginated collection.
+    """
+    with pytest.raises(ImproperlyConfigured):
+
+        class Misconfigured(PydanticBaseEndpoint, ListEndpoint):
+            pagination = KeysetPagination()
+            filtering = Filtering({"id": ("eq",)}, sort_fields=("id",))
+
+    with pytest.raises(ImproperlyConfigured):
+        Filtering({"id": ("like",)})
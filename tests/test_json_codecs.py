@@ -0,0 +1,143 @@
+import datetime
+import decimal
+import typing
+import uuid
+
+import pytest
+import typesystem
+
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+from starlette_cbge.endpoints import TypesystemBaseEndpoint
+from starlette_cbge.interfaces import JSONCodecInterface
+from starlette_cbge import json_codecs
+from starlette_cbge.json_codecs import (
+    JSONCodecResponse,
+    OrjsonCodec,
+    StdlibJSONCodec,
+    UjsonCodec,
+    orjson,
+    ujson,
+)
+from starlette_cbge.schema_backends import TypesystemListSchema
+
+CODECS: typing.List[typing.Type[JSONCodecInterface]] = [StdlibJSONCodec]
+if ujson is not None:
+    CODECS.append(UjsonCodec)
+if orjson is not None:
+    CODECS.append(OrjsonCodec)
+
+
+@pytest.mark.parametrize("codec_class", CODECS)
+def test_codec_round_trip(codec_class: type) -> None:
+    """
+    Test every installed codec handles the common non-JSON types the same way.
+    """
+    codec = codec_class()
+    data = {
+        "id": uuid.UUID("c28379db-5604-49b2-80e4-7e27c347ac56"),
+        "created": datetime.datetime(2019, 9, 1, 12, 30),
+        "day": datetime.date(2019, 9, 1),
+        "price": decimal.Decimal("1.5"),
+        "name": "Автор",
+    }
+
+    assert codec.loads(codec.dumps(data)) == {
+        "id": "c28379db-5604-49b2-80e4-7e27c347ac56",
+        "created": "2019-09-01T12:30:00",
+        "day": "2019-09-01",
+        "price": 1.5,
+        "name": "Автор",
+    }
+
+
+@pytest.mark.parametrize("codec_class", CODECS)
+@pytest.mark.parametrize(
+    "value",
+    [
+        datetime.datetime(2019, 9, 1, 12, 30, 15, 500),
+        datetime.datetime(2019, 9, 1, 12, 30, tzinfo=datetime.timezone.utc),
+        datetime.date(2019, 9, 1),
+        datetime.time(12, 30),
+    ],
+)
+def test_codec_datetime_parity(codec_class: type, value: typing.Any) -> None:
+    """
+    Test the datetime values are encoded as the stdlib codec does,
+    not as the epoch numbers.
+    """
+    data = {"value": value, "items": [value]}
+
+    assert codec_class().loads(codec_class().dumps(data)) == StdlibJSONCodec().loads(
+        StdlibJSONCodec().dumps(data)
+    )
+
+
+@pytest.mark.skipif(ujson is None, reason="ujson is not installed")
+def test_ujson_encodes_rows_without_stdlib(monkeypatch: typing.Any) -> None:
+    """
+    Test the rows with the datetime and UUID values are encoded by ujson itself,
+    not re-encoded by the stdlib `json`.
+    """
+
+    def stdlib_dumps(*args: typing.Any, **kwargs: typing.Any) -> str:
+        raise AssertionError("The stdlib encoder is called.")
+
+    monkeypatch.setattr(json_codecs.json, "dumps", stdlib_dumps)
+    rows = [
+        {
+            "id": uuid.UUID("c28379db-5604-49b2-80e4-7e27c347ac56"),
+            "created": datetime.datetime(2019, 9, 1, 12, 30),
+        }
+    ]
+
+    assert UjsonCodec().loads(UjsonCodec().dumps(rows)) == [
+        {"id": "c28379db-5604-49b2-80e4-7e27c347ac56", "created": "2019-09-01T12:30:00"}
+    ]
+
+
+def test_response_class_bound_to_codec() -> None:
+    """
+    Test the codec bound response class renders with its own codec.
+    """
+    codec = StdlibJSONCodec()
+    response_class = JSONCodecResponse.with_codec(codec)
+
+    assert response_class.codec is codec
+    assert JSONCodecResponse.codec is None
+    assert response_class({"id": 1}).body == b'{"id":1}'
+
+
+class BulkRequestListSchema(TypesystemListSchema):
+    name = typesystem.String()
+
+
+class OrjsonBulk(TypesystemBaseEndpoint):
+    json_codec = OrjsonCodec() if orjson is not None else None
+
+    bulk_request_schemas = (("POST", BulkRequestListSchema),)
+    bulk_response_schemas = (("POST", BulkRequestListSchema),)
+
+    async def post_many(
+        self, data: typing.List[typing.Dict[str, typing.Any]]
+    ) -> typing.Any:
+        return data
+
+
+@pytest.mark.skipif(orjson is None, reason="orjson is not installed")
+def test_orjson_encodes_bulk_errors() -> None:
+    """
+    Test the bulk errors keyed by the row indices are encoded by orjson.
+    """
+    app = Starlette()
+    app.add_route("/bulk", OrjsonBulk, methods=["POST"])
+    client = TestClient(app)
+
+    response = client.post("/bulk", json=[{"name": "first"}, {}, {"name": 3}])
+
+    assert response.status_code == 422
+    assert response.json()["errors"] == {
+        "1": {"name": "This field is required."},
+        "2": {"name": "Must be a string."},
+    }
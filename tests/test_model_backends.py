@@ -0,0 +1,172 @@
+from typing import Any
+
+import pytest
+
+from starlette_cbge.exceptions import ImproperlyConfigured
+from starlette_cbge.model_backends import databases
+from starlette_cbge.test_client import AsyncTestClient
+
+from example_app.base_api import base_pydantic, base_typesystem
+from example_app.db import insert_data
+
+
+def test_statements_generated_from_schema() -> None:
+    """
+    Test the SQL is generated out of the schema fields and cached.
+    """
+    model = base_pydantic.AuthorsModel
+
+    statement = model.get_statement("select")
+    assert statement.sql == 'SELECT "id", "name" FROM "authors" WHERE "id" = :p0'
+    assert statement.bind({"id": 3, "name": "ignored"}) == {"p0": 3}
+    assert model.get_statement("select") is statement
+
+    statement = model.get_statement("insert", ("name",), rows=2)
+    assert statement.sql == (
+        'INSERT INTO "authors" ("name") VALUES (:p0), (:p1) ' 'RETURNING "id", "name"'
+    )
+    assert statement.bind({"name": "A"}, {"name": "B"}) == {"p0": "A", "p1": "B"}
+
+    assert (
+        base_typesystem.AuthorsModel.get_columns()
+        == base_pydantic.AuthorsModel.get_columns()
+        == ("id", "name")
+    )
+
+
+def test_keyset_statements() -> None:
+    """
+    Test the keyset pagination seeks with the row value comparison.
+    """
+    model = base_pydantic.AuthorsModel
+
+    statement = model.get_statement("select_after", ("name", "id"))
+    assert statement.sql == (
+        'SELECT "id", "name" FROM "authors" WHERE ("name", "id") > (:p0, :p1) '
+        'ORDER BY "name" ASC, "id" ASC LIMIT :p2'
+    )
+
+    statement = model.get_statement("select_before", ("id",))
+    assert statement.sql == (
+        'SELECT "id", "name" FROM "authors" WHERE "id" < :p0 '
+        'ORDER BY "id" DESC LIMIT :p1'
+    )
+
+
+def test_projected_statements() -> None:
+    """
+    Test only the requested columns are selected, along with the primary key.
+    """
+    model = base_pydantic.AuthorsModel
+
+    columns = model.get_selected_columns(["name"])
+    assert columns == ("id", "name")
+    assert model.get_selected_columns(None) == ()
+
+    statement = model.get_statement("select_many", selected_columns=("id",))
+    assert statement.sql.startswith('SELECT "id" FROM "authors"')
+    assert model.get_statement("select_many", selected_columns=("id",)) is statement
+    assert model.get_statement("select_many") is not statement
+
+
+def test_write_columns_skip_unknown_keys() -> None:
+    """
+    Test only the declared columns are written, the primary key is excluded.
+    """
+    model = base_pydantic.AuthorsModel
+
+    columns = model.get_write_columns({"id": 1, "name": "A", "unknown": "B"})
+    assert columns == ("name",)
+
+
+@pytest.mark.asyncio
+async def test_databases_model_crud(async_client: AsyncTestClient) -> None:
+    """
+    Test the generic CRUD operations.
+    """
+    await insert_data()
+    model = base_pydantic.AuthorsModel()
+
+    created = await model.create({"name": "Author 4"})
+    assert dict(created) == {"id": 4, "name": "Author 4"}
+
+    read = await model.read({"id": 2})
+    assert read is not None
+    assert dict(read) == {"id": 2, "name": "Author 2"}
+    assert await model.read({"id": 333}) is None
+
+    rows = await model.read_many({"limit": 2, "offset": 1})
+    assert [dict(row) for row in rows] == [
+        {"id": 2, "name": "Author 2"},
+        {"id": 3, "name": "Author 3"},
+    ]
+
+    updated = await model.update({"id": 2, "name": "Author 2 changed"})
+    assert updated is not None
+    assert dict(updated) == {"id": 2, "name": "Author 2 changed"}
+    assert await model.update({"id": 333, "name": "Author 333"}) is None
+
+    assert await model.delete({"id": 2}) is True
+    assert await model.delete({"id": 2}) is False
+
+
+@pytest.mark.asyncio
+async def test_databases_model_read_in(async_client: AsyncTestClient) -> None:
+    """
+    Test the batch look up by a column returns the matching rows
+    in the primary key order.
+    """
+    await insert_data()
+    model = base_pydantic.AuthorsModel()
+
+    statement = model.get_statement("select_where_in", ("name",), 2)
+    assert statement.sql == (
+        'SELECT "id", "name" FROM "authors" WHERE "name" IN (:p0, :p1) ORDER BY "id"'
+    )
+
+    rows = await model.read_in("name", ["Author 3", "Author 1", "Author 9"])
+    assert [dict(row) for row in rows] == [
+        {"id": 1, "name": "Author 1"},
+        {"id": 3, "name": "Author 3"},
+    ]
+    assert await model.read_in("id", []) == []
+
+
+@pytest.mark.asyncio
+async def test_databases_model_bulk_mixed_columns(
+    async_client: AsyncTestClient,
+) -> None:
+    """
+    Test the bulk writes of the items with different sets of the columns.
+    """
+    await insert_data()
+    model = base_pydantic.AuthorsModel()
+
+    rows = await model.create_many(
+        [{"name": "Author 4"}, {"id": 10, "name": "Author 10"}, {"name": "Author 11"}]
+    )
+    assert [dict(row) for row in rows] == [
+        {"id": 4, "name": "Author 4"},
+        {"id": 10, "name": "Author 10"},
+        {"id": 11, "name": "Author 11"},
+    ]
+
+    rows = await model.update_many([{"id": 1}, {"id": 2, "name": "Author 2 changed"}])
+    assert [dict(row) for row in rows] == [
+        {"id": 1, "name": "Author 1"},
+        {"id": 2, "name": "Author 2 changed"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_databases_model_requires_sqlite_returning(
+    async_client: AsyncTestClient, monkeypatch: Any
+) -> None:
+    """
+    Test an old SQLite library is reported instead of a syntax error.
+    """
+    monkeypatch.setattr(databases, "SQLITE_RETURNING", False)
+    model = base_pydantic.AuthorsModel()
+
+    with pytest.raises(ImproperlyConfigured):
+        await model.read({"id": 1})
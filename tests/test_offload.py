@@ -0,0 +1,184 @@
+import threading
+import typing
+
+import pytest
+import typesystem
+
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+from starlette_cbge.endpoints import PydanticBaseEndpoint, TypesystemBaseEndpoint
+from starlette_cbge.exceptions import ImproperlyConfigured
+from starlette_cbge.executors import ProcessPool, ThreadPool
+from starlette_cbge.json_codecs import StdlibJSONCodec
+from starlette_cbge.schema_backends import (
+    PydanticListSchema,
+    PydanticSchema,
+    TypesystemListSchema,
+)
+
+
+offload_pool = ThreadPool("offload", max_workers=1)
+dump_threads: typing.List[str] = []
+encode_threads: typing.List[str] = []
+
+
+class RecordingCodec(StdlibJSONCodec):
+    def dumps(self, data: typing.Any) -> bytes:
+        encode_threads.append(threading.current_thread().name)
+        return super().dumps(data)
+
+
+class ItemsRequestSchema(PydanticSchema):
+    limit: int = 5
+
+
+class ItemsRequestListSchema(PydanticListSchema):
+    name: str
+    count: int
+
+
+class ItemsResponseListSchema(PydanticListSchema):
+    id: int
+    name: str
+
+    @classmethod
+    def perform_dump(cls, data: typing.Any, columns: typing.Any = None) -> typing.Any:
+        dump_threads.append(threading.current_thread().name)
+        return super().perform_dump(data, columns)
+
+
+class InlineItems(PydanticBaseEndpoint):
+    request_schemas = (("GET", ItemsRequestSchema),)
+    response_schemas = (("GET", ItemsResponseListSchema),)
+    bulk_request_schemas = (("POST", ItemsRequestListSchema),)
+    bulk_response_schemas = (("POST", ItemsRequestListSchema),)
+
+    async def get(self, data: typing.Dict[str, typing.Any]) -> typing.Any:
+        return [
+            {"id": index, "name": f"Item {index}"} for index in range(data["limit"])
+        ]
+
+    async def post_many(
+        self, data: typing.List[typing.Dict[str, typing.Any]]
+    ) -> typing.Any:
+        return data
+
+
+class OffloadedItems(InlineItems):
+    offload_threshold = 2
+    offload_chunk_size = 2
+    offload_executor = offload_pool
+    json_codec = RecordingCodec()
+
+
+class TypesystemItemsRequestListSchema(TypesystemListSchema):
+    name = typesystem.String()
+    count = typesystem.Integer()
+
+
+class TypesystemItems(TypesystemBaseEndpoint):
+    offload_threshold = 2
+    offload_chunk_size = 2
+
+    bulk_request_schemas = (("POST", TypesystemItemsRequestListSchema),)
+
+    async def post_many(self, data: typing.List[typing.Dict[str, typing.Any]]) -> None:
+        return None
+
+
+app = Starlette()
+app.add_route("/inline", InlineItems, methods=["GET", "POST"])
+app.add_route("/offloaded", OffloadedItems, methods=["GET", "POST"])
+app.add_route("/typesystem", TypesystemItems, methods=["POST"])
+
+
+PAYLOAD: typing.List[typing.Dict[str, typing.Any]] = [
+    {"name": "first", "count": 1},
+    {"name": "second", "count": "many"},
+    {"name": "third", "count": 3},
+    {"name": "fourth", "count": 4},
+    {"count": 5},
+]
+
+
+def test_large_lists_are_dumped_in_chunks() -> None:
+    """
+    Test the lists over the threshold are dumped in the offload executor
+    chunk by chunk, the small ones inline, with the same results.
+    """
+    client = TestClient(app)
+    inline = client.get("/inline")
+
+    dump_threads.clear()
+    response = client.get("/offloaded")
+    assert response.status_code == 200
+    assert response.json() == inline.json()
+    assert len(dump_threads) == 3
+    assert all(name.startswith("starlette-cbge-offload") for name in dump_threads)
+
+    dump_threads.clear()
+    assert client.get("/offloaded", params={"limit": 2}).json() == [
+        {"id": 0, "name": "Item 0"},
+        {"id": 1, "name": "Item 1"},
+    ]
+    assert dump_threads == [threading.current_thread().name]
+
+
+def test_large_lists_are_encoded_off_the_loop() -> None:
+    """
+    Test the list responses over the threshold are encoded in the offload executor,
+    the small ones and the errors inline.
+    """
+    client = TestClient(app)
+
+    encode_threads.clear()
+    response = client.get("/offloaded")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert len(response.json()) == 5
+    assert len(encode_threads) == 1
+    assert encode_threads[0].startswith("starlette-cbge-offload")
+
+    encode_threads.clear()
+    client.get("/offloaded", params={"limit": 2})
+    client.get("/offloaded", params={"limit": "many"})
+    assert encode_threads == [threading.current_thread().name] * 2
+
+
+def test_large_payloads_are_loaded_in_chunks() -> None:
+    """
+    Test the errors of all the chunks are reported with the indices
+    of the whole payload, the same as the inline ones.
+    """
+    client = TestClient(app)
+    inline = client.post("/inline", json=PAYLOAD)
+    assert inline.status_code == 422
+
+    response = client.post("/offloaded", json=PAYLOAD)
+    assert response.status_code == 422
+    assert response.json() == inline.json()
+    assert [error["loc"][0] for error in response.json()["errors"]] == [1, 4]
+
+    response = client.post("/offloaded", json=PAYLOAD[2:4] * 3)
+    assert response.status_code == 200
+    assert response.json() == PAYLOAD[2:4] * 3
+
+    response = client.post("/typesystem", json=PAYLOAD)
+    assert response.status_code == 422
+    assert response.json()["errors"] == {
+        "1": {"count": "Must be a number."},
+        "4": {"name": "This field is required."},
+    }
+
+
+def test_offload_configuration() -> None:
+    """
+    Test the projected schemas aren't sent to the process pools.
+    """
+    with pytest.raises(ImproperlyConfigured, match="can't be pickled"):
+
+        class ProjectedItems(InlineItems):
+            offload_threshold = 100
+            offload_executor = ProcessPool("offload", max_workers=1)
+            sparse_fieldsets = (("GET", "fields"),)
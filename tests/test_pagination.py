@@ -0,0 +1,130 @@
+import base64
+import json
+import typing
+
+import pytest
+
+from starlette_cbge.pagination import (
+    CursorPagination,
+    KeysetPagination,
+    OffsetPagination,
+    PageRequest,
+)
+
+
+ROWS = [{"id": index, "name": f"Author {index}"} for index in range(1, 6)]
+
+
+def test_offset_pagination() -> None:
+    """
+    Test the offset pagination links to the neighbour pages.
+    """
+    pagination = OffsetPagination(default_limit=2)
+
+    page_request = pagination.parse({"offset": "2"})
+    assert page_request == PageRequest(limit=2, offset=2)
+
+    page = pagination.paginate(ROWS[2:5], page_request)
+    assert page.items == ROWS[2:4]
+    assert page.next == {"limit": "2", "offset": "4"}
+    assert page.prev == {"limit": "2", "offset": "0"}
+
+    page = pagination.paginate(ROWS[4:], pagination.parse({"offset": "4"}))
+    assert page.next is None
+
+
+@pytest.mark.parametrize(
+    "query_params", [{"limit": "0"}, {"limit": "x"}, {"offset": "-1"}]
+)
+def test_offset_pagination_invalid_params(query_params: dict) -> None:
+    """
+    Test invalid params are rejected.
+    """
+    with pytest.raises(ValueError):
+        OffsetPagination().parse(query_params)
+
+
+def test_pagination_limit_is_capped() -> None:
+    """
+    Test the limit can't exceed the max one.
+    """
+    assert OffsetPagination(max_limit=10).parse({"limit": "1000"}).limit == 10
+
+
+def test_keyset_pagination() -> None:
+    """
+    Test the keyset pagination passes the keys of the boundary rows.
+    """
+    pagination = KeysetPagination(sort_keys=("id",), key_types={"id": int})
+
+    page_request = pagination.parse({"limit": "2", "after_id": "1"})
+    assert page_request == PageRequest(limit=2, sort_keys=("id",), after=(1,))
+
+    page = pagination.paginate(ROWS[1:4], page_request)
+    assert page.items == ROWS[1:3]
+    assert page.next == {"limit": "2", "after_id": "3"}
+    assert page.prev == {"limit": "2", "before_id": "2"}
+
+    # Previous pages are fetched backwards
+    page_request = pagination.parse({"limit": "2", "before_id": "2"})
+    page = pagination.paginate([ROWS[0]], page_request)
+    assert page.items == [ROWS[0]]
+    assert page.next == {"limit": "2", "after_id": "1"}
+    assert page.prev is None
+
+
+def test_keyset_pagination_invalid_params() -> None:
+    """
+    Test invalid keys are rejected.
+    """
+    pagination = KeysetPagination(sort_keys=("name", "id"), key_types={"id": int})
+
+    with pytest.raises(ValueError):
+        pagination.parse({"after_id": "1"})
+    with pytest.raises(ValueError):
+        pagination.parse({"after_name": "A", "after_id": "x"})
+    with pytest.raises(ValueError):
+        pagination.parse(
+            {"after_name": "A", "after_id": "1", "before_name": "A", "before_id": "1"}
+        )
+
+
+def test_cursor_pagination() -> None:
+    """
+    Test the keys survive the round trip through the opaque cursor.
+    """
+    pagination = CursorPagination(sort_keys=("name", "id"), default_limit=2)
+
+    page = pagination.paginate(ROWS[:3], pagination.parse({}))
+    assert page.items == ROWS[:2]
+    assert page.prev is None
+    assert page.next is not None
+    assert set(page.next) == {"limit", "cursor"}
+
+    page_request = pagination.parse(page.next)
+    assert page_request.after == ("Author 2", 2)
+
+    with pytest.raises(ValueError):
+        pagination.parse({"cursor": "garbage"})
+
+
+@pytest.mark.parametrize(
+    "keys",
+    [
+        ["Author 2", 2],
+        {"name": "Author 2"},
+        {"name": "Author 2", "title": 2},
+        {"name": "Author 2", "id": {"$gt": 0}},
+        {"name": ["Author 2"], "id": 2},
+    ],
+)
+def test_cursor_pagination_invalid_keys(keys: typing.Any) -> None:
+    """
+    Test the cursor must name the sort keys and hold the scalar values.
+    """
+    pagination = CursorPagination(sort_keys=("name", "id"))
+    data = json.dumps(["after", keys]).encode("utf-8")
+    cursor = base64.urlsafe_b64encode(data).decode("ascii")
+
+    with pytest.raises(ValueError):
+        pagination.parse({"cursor": cursor})
@@ -0,0 +1,110 @@
+import time
+import tracemalloc
+import typing
+
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+from starlette_cbge.endpoints import PydanticBaseEndpoint
+from starlette_cbge.profiling import RequestProfiler
+from starlette_cbge.schema_backends import PydanticSchema
+
+
+sampling_profiler = RequestProfiler(sample_rate=1.0)
+slow_profiler = RequestProfiler(slow_threshold=0.05, capacity=2, sample_interval=0.001)
+
+
+class ReportRequestSchema(PydanticSchema):
+    delay: float = 0
+
+
+class ReportResponseSchema(PydanticSchema):
+    delay: float
+
+
+async def build_report(data: typing.Dict[str, typing.Any]) -> typing.Any:
+    # Blocks the event loop, so the sampled stacks show it
+    time.sleep(data["delay"])
+    return {"delay": data["delay"]}
+
+
+class SampledReport(PydanticBaseEndpoint):
+    profiler = sampling_profiler
+
+    request_schemas = (("GET", ReportRequestSchema),)
+    response_schemas = (("GET", ReportResponseSchema),)
+
+    async def get(self, data: typing.Dict[str, typing.Any]) -> typing.Any:
+        return await build_report(data)
+
+
+class SlowReport(SampledReport):
+    profiler = slow_profiler
+    server_timing = True
+
+
+app = Starlette()
+app.add_route("/sampled", SampledReport, methods=["GET"])
+app.add_route("/slow", SlowReport, methods=["GET"])
+app.add_route("/debug/profiles", slow_profiler.endpoint, methods=["GET"])
+app.add_event_handler("shutdown", slow_profiler.close)
+
+
+def test_sampled_requests_are_profiled() -> None:
+    """
+    Test the sampled request gets the profile and the allocations,
+    the tracing is stopped afterwards.
+    """
+    client = TestClient(app)
+
+    response = client.get("/sampled")
+    assert response.status_code == 200
+
+    (record,) = sampling_profiler.get_records()
+    assert record["sampled"]
+    assert record["endpoint"] == "SampledReport"
+    assert any("process_action" in row["function"] for row in record["profile"])
+    assert "delta_kib" in record["allocations"]
+    assert not tracemalloc.is_tracing()
+    assert not sampling_profiler.profiling
+
+
+def test_slowest_requests_are_kept() -> None:
+    """
+    Test only the requests over the threshold are kept, the slowest of them,
+    with the stacks sampled while they were processed.
+    """
+    client = TestClient(app)
+
+    for delay in (0, 0.06, 0.1, 0.08):
+        assert client.get("/slow", params={"delay": delay}).status_code == 200
+
+    response = client.get("/debug/profiles")
+    records = response.json()
+    assert [record["query"] for record in records] == ["delay=0.1", "delay=0.08"]
+    assert not records[0]["sampled"]
+    assert records[0]["duration_ms"] >= 100
+    assert records[0]["phases_ms"]["handler"] >= 100
+    assert any("build_report" in sample["stack"] for sample in records[0]["stacks"])
+
+
+def test_sampler_runs_while_requests_are_in_flight() -> None:
+    """
+    Test the stacks are sampled only while the requests are processed,
+    the sampler thread is stopped on the app shutdown.
+    """
+    with TestClient(app) as client:
+        assert client.get("/slow", params={"delay": 0.01}).status_code == 200
+        sampler = slow_profiler.sampler
+        assert sampler is not None and sampler.is_alive()
+        assert slow_profiler.in_flight == 0
+
+        # A sample taken just before the pause may be appended yet
+        time.sleep(0.01)
+        samples = len(sampler.samples)
+        time.sleep(0.05)
+        assert len(sampler.samples) == samples
+
+    sampler.join(1)
+    assert not sampler.is_alive()
+    assert slow_profiler.sampler is None
@@ -0,0 +1,264 @@
+import typing
+
+import pydantic
+import pytest
+import typesystem
+
+from starlette_cbge.exceptions import ImproperlyConfigured
+from starlette_cbge.schema_backends import (
+    PydanticSchema,
+    PydanticListSchema,
+    TypesystemSchema,
+    TypesystemListSchema,
+    set_strict_dump,
+    typesystem_fields,
+)
+
+from example_app.base_api import base_pydantic, base_typesystem
+
+
+LIST_SCHEMAS = [
+    base_pydantic.AuthorResponseListSchema,
+    base_typesystem.AuthorResponseListSchema,
+]
+
+
+@pytest.mark.parametrize("schema", LIST_SCHEMAS)
+def test_trusted_dump_projects_declared_fields(schema: typing.Any) -> None:
+    """
+    Test the trusted dump only projects the declared fields.
+    """
+    assert "trusted_dump" not in getattr(schema, "__fields__", {})
+    assert schema.perform_dump([{"id": 1, "name": "Author 1", "extra": "x"}]) == [
+        {"id": 1, "name": "Author 1"}
+    ]
+    # Not validated
+    assert schema.perform_dump_item({"id": "1", "name": "Author 1"}) == {
+        "id": "1",
+        "name": "Author 1",
+    }
+
+
+@pytest.mark.parametrize("schema", LIST_SCHEMAS)
+def test_strict_dump_validates_trusted_schemas(schema: typing.Any) -> None:
+    """
+    Test the strict mode brings the validation back.
+    """
+    set_strict_dump(True)
+    try:
+        assert schema.perform_dump([{"id": "1", "name": "Author 1"}]) == [
+            {"id": 1, "name": "Author 1"}
+        ]
+        with pytest.raises((pydantic.ValidationError, typesystem.ValidationError)):
+            schema.perform_dump([{"id": "one", "name": "Author 1"}])
+    finally:
+        set_strict_dump(False)
+
+
+def test_trusted_dump_field_is_rejected() -> None:
+    """
+    Test the pydantic flag without `ClassVar` isn't taken as a model field silently.
+    """
+    with pytest.raises(ImproperlyConfigured, match="ClassVar"):
+
+        class PlainTrustedSchema(PydanticSchema):
+            trusted_dump = True
+
+            id: int
+
+    with pytest.raises(ImproperlyConfigured, match="ClassVar"):
+
+        class PlainTrustedListSchema(PydanticListSchema):
+            trusted_dump = True
+
+            id: int
+
+
+class TypesystemTrustedSchema(TypesystemSchema):
+    trusted_dump = True
+
+    id = typesystem_fields.Integer()
+    count = typesystem_fields.Integer(default=lambda: 5)
+
+
+def test_trusted_dump_calls_callable_defaults() -> None:
+    """
+    Test the trusted dump fills the missing values as the validation does.
+    """
+    expected = TypesystemTrustedSchema.generic_validate({"id": 1})
+
+    assert expected == {"id": 1, "count": 5}
+    assert TypesystemTrustedSchema.perform_dump({"id": 1}) == expected
+
+
+class PydanticItemSchema(PydanticSchema):
+    id: int
+    name: str
+    rating: typing.Optional[float] = None
+    active: bool = True
+    tags: typing.List[str] = []
+
+
+class PydanticSimpleSchema(PydanticSchema):
+    id: int
+    name: str
+    rating: typing.Optional[float] = None
+    active: bool = True
+
+
+class TypesystemSimpleSchema(TypesystemSchema):
+    id = typesystem_fields.Integer()
+    name = typesystem_fields.String()
+    rating = typesystem_fields.Float(allow_null=True)
+    active = typesystem_fields.Boolean(default=True)
+
+
+COMPILED_PAYLOADS = [
+    {"id": 1, "name": "Author 1"},
+    {"id": 1, "name": "Author 1", "rating": 4.5, "active": False, "extra": 1},
+    {"id": "1", "name": "Author 1"},
+    {"id": 1, "name": " Author 1 "},
+    {"id": 1, "name": ""},
+    {"id": True, "name": "Author 1"},
+    {"id": 1, "name": "Author 1", "rating": 4},
+    {"id": 1, "name": "Author 1", "rating": float("inf")},
+    {"name": "Author 1"},
+]
+
+
+@pytest.mark.parametrize("schema", [PydanticSimpleSchema, TypesystemSimpleSchema])
+@pytest.mark.parametrize("payload", COMPILED_PAYLOADS)
+def test_compiled_validator_matches_generic(
+    schema: typing.Any, payload: typing.Dict[str, typing.Any]
+) -> None:
+    """
+    Test the compiled validator gives the same result or error as the generic path.
+    """
+    assert schema.compile() is not None
+
+    try:
+        expected = schema.generic_validate(payload)
+    except (pydantic.ValidationError, typesystem.ValidationError) as exc:
+        with pytest.raises(type(exc)):
+            schema.perform_load(payload)
+    else:
+        assert schema.perform_load(payload) == expected
+        assert schema.perform_dump(payload) == expected
+
+
+class TypesystemCallableDefaultSchema(TypesystemSchema):
+    id = typesystem_fields.Integer()
+    count = typesystem_fields.Integer(default=lambda: 5)
+
+
+def test_compiled_validator_calls_callable_defaults() -> None:
+    """
+    Test the compiled validator calls the callable default as the generic path does.
+    """
+    assert TypesystemCallableDefaultSchema.compile() is not None
+
+    expected = TypesystemCallableDefaultSchema.generic_validate({"id": 1})
+    assert expected == {"id": 1, "count": 5}
+    assert TypesystemCallableDefaultSchema.perform_load({"id": 1}) == expected
+
+
+def test_unsupported_fields_are_not_compiled() -> None:
+    """
+    Test schemas with unsupported field types stay on the generic path.
+    """
+    assert PydanticItemSchema.compile() is None
+    assert PydanticItemSchema.perform_load({"id": "1", "name": "Author 1"}) == {
+        "id": 1,
+        "name": "Author 1",
+        "rating": None,
+        "active": True,
+        "tags": [],
+    }
+
+
+class PydanticSimpleListSchema(PydanticListSchema):
+    id: int
+    name: str
+    active: bool = True
+
+
+class TypesystemSimpleListSchema(TypesystemListSchema):
+    id = typesystem_fields.Integer()
+    name = typesystem_fields.String()
+    active = typesystem_fields.Boolean(default=True)
+
+
+@pytest.mark.parametrize(
+    "schema", [PydanticSimpleListSchema, TypesystemSimpleListSchema]
+)
+def test_batch_validation(schema: typing.Any) -> None:
+    """
+    Test the column by column validation of dicts and of tuples with column names.
+    """
+    rows = [
+        {"id": 1, "name": "Author 1"},
+        {"id": "2", "name": "Author 2", "active": False},
+        {"id": 3, "name": "Author 3", "active": True},
+    ]
+    expected = [
+        {"id": 1, "name": "Author 1", "active": True},
+        {"id": 2, "name": "Author 2", "active": False},
+        {"id": 3, "name": "Author 3", "active": True},
+    ]
+
+    assert schema.perform_load(rows) == expected
+    assert schema.perform_load(
+        [(1, "Author 1"), ("2", "Author 2"), (3, "Author 3")], columns=["id", "name"],
+    ) == [dict(item, active=True) for item in expected]
+
+
+class TypesystemCallableDefaultListSchema(TypesystemListSchema):
+    id = typesystem_fields.Integer()
+    count = typesystem_fields.Integer(default=lambda: 5)
+
+
+def test_batch_validation_calls_callable_defaults() -> None:
+    """
+    Test the missing values of the batch are filled as the generic path does.
+    """
+    rows = [{"id": 1}, {"id": 2, "count": 3}, {"id": "3"}]
+    expected = [
+        TypesystemCallableDefaultListSchema.generic_validate(row) for row in rows
+    ]
+
+    assert expected == [
+        {"id": 1, "count": 5},
+        {"id": 2, "count": 3},
+        {"id": 3, "count": 5},
+    ]
+    assert TypesystemCallableDefaultListSchema.perform_load(rows) == expected
+
+
+def test_batch_validation_errors_pydantic() -> None:
+    """
+    Test the errors are reported with the row indices.
+    """
+    with pytest.raises(pydantic.ValidationError) as exc_info:
+        PydanticSimpleListSchema.perform_load(
+            [{"id": 1, "name": "Author 1"}, {"id": "x", "name": "Author 2"}, {"id": 3}]
+        )
+
+    assert [error["loc"] for error in exc_info.value.errors()] == [
+        (1, "id"),
+        (2, "name"),
+    ]
+
+
+def test_batch_validation_errors_typesystem() -> None:
+    """
+    Test the errors are reported with the row indices.
+    """
+    with pytest.raises(typesystem.ValidationError) as exc_info:
+        TypesystemSimpleListSchema.perform_load(
+            [{"id": 1, "name": "Author 1"}, {"id": "x", "name": "Author 2"}, {"id": 3}]
+        )
+
+    assert dict(exc_info.value) == {
+        1: {"id": "Must be a number."},
+        2: {"name": "This field is required."},
+    }
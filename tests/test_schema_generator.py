@@ -0,0 +1,228 @@
+import json
+import typing
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import yaml
+
+from starlette.routing import BaseRoute, Mount, Route, Router
+
+from starlette_cbge.schema_generator_backends import OpenAPIv3SchemaGenerator
+from starlette_cbge.test_client import AsyncTestClient
+
+from example_app.base_api import base_pydantic, base_typesystem
+
+
+BASE_SCHEMA = {"openapi": "3.0.0", "info": {"title": "Example API", "version": "1.0"}}
+
+
+def test_schema_is_cached_until_routes_change() -> None:
+    """
+    Test the document is built once and rebuilt only for the changed routes.
+    """
+    schemas = OpenAPIv3SchemaGenerator(BASE_SCHEMA)
+    routes: typing.List[BaseRoute] = [
+        Mount(
+            "/api", app=Router([Route("/authors/{id}", endpoint=base_pydantic.Author)]),
+        )
+    ]
+
+    cached_schema = schemas.get_cached_schema(routes)
+    assert "/api/authors/{id}" in cached_schema.schema["paths"]
+    assert schemas.get_cached_schema(list(routes)) is cached_schema
+
+    routes.append(Route("/authors", endpoint=base_pydantic.Authors))
+    rebuilt_schema = schemas.get_cached_schema(routes)
+    assert rebuilt_schema is not cached_schema
+    assert "/authors" in rebuilt_schema.schema["paths"]
+
+
+def test_only_changed_subtrees_are_regenerated() -> None:
+    """
+    Test mounting a sub app reuses the schemas of the unchanged subtrees.
+    """
+    schemas = OpenAPIv3SchemaGenerator(BASE_SCHEMA)
+    pydantic_api = Router([Route("/authors/{id}", endpoint=base_pydantic.Author)])
+    routes = [Mount("/pydantic", app=pydantic_api)]
+    schemas.get_cached_schema(routes)
+    pydantic_subtree = list(schemas.subtrees.values())
+
+    operations = []
+    get_operation = schemas.get_operation
+
+    def counting_get_operation(*args: typing.Any) -> dict:
+        operations.append(args[:2])
+        return get_operation(*args)
+
+    schemas.get_operation = counting_get_operation  # type: ignore
+
+    typesystem_api = Router([Route("/authors/{id}", endpoint=base_typesystem.Author)])
+    routes.append(Mount("/typesystem", app=typesystem_api))
+    schema = schemas.get_cached_schema(routes).schema
+
+    assert operations == [
+        ("/authors/{id}", "get"),
+        ("/authors/{id}", "put"),
+        ("/authors/{id}", "delete"),
+    ]
+    assert set(schema["paths"]) == {
+        "/pydantic/authors/{id}",
+        "/typesystem/authors/{id}",
+    }
+    assert pydantic_subtree[0] in schemas.subtrees.values()
+
+    # Unmounted subtrees are dropped from the cache
+    routes.pop()
+    schema = schemas.get_cached_schema(routes).schema
+    assert set(schema["paths"]) == {"/pydantic/authors/{id}"}
+    assert len(schemas.subtrees) == 2
+
+
+def test_subtrees_extracted_in_thread_pool() -> None:
+    """
+    Test the document built in the thread pool is the same as the sequential one,
+    the caches filled by the workers are merged into the generator ones.
+    """
+    routes = [
+        Mount("/pydantic", app=Router([Route("/a", endpoint=base_pydantic.Authors)])),
+        Mount(
+            "/typesystem", app=Router([Route("/a", endpoint=base_typesystem.Authors)])
+        ),
+    ]
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        parallel = OpenAPIv3SchemaGenerator(BASE_SCHEMA, executor=executor)
+        parallel_schema = parallel.get_schema(routes)
+
+    sequential = OpenAPIv3SchemaGenerator(BASE_SCHEMA)
+    sequential_schema = sequential.get_schema(routes)
+    assert json.dumps(parallel_schema) == json.dumps(sequential_schema)
+
+    for cache_name in ("fragments", "docstrings", "subtrees"):
+        parallel_cache = getattr(parallel, cache_name)
+        assert type(parallel_cache) is dict
+        assert parallel_cache.keys() == getattr(sequential, cache_name).keys()
+
+
+def test_schema_fragments_are_referenced() -> None:
+    """
+    Test the schemas are added to the components once and referenced.
+    """
+    schemas = OpenAPIv3SchemaGenerator(BASE_SCHEMA)
+    routes = [
+        Route("/authors", endpoint=base_pydantic.Authors),
+        Route("/authors/{id}", endpoint=base_pydantic.Author),
+        Route("/typesystem/authors/{id}", endpoint=base_typesystem.Author),
+    ]
+
+    schema = schemas.get_schema(routes)
+    components = schema["components"]["schemas"]
+
+    operation = schema["paths"]["/authors/{id}"]["get"]
+    assert operation["parameters"] == [
+        {
+            "name": "id",
+            "in": "path",
+            "required": True,
+            "schema": {"title": "Id", "type": "integer"},
+        }
+    ]
+    response_schema = operation["responses"]["200"]["content"]["application/json"][
+        "schema"
+    ]
+    assert response_schema == {"$ref": "#/components/schemas/AuthorResponseSchema"}
+    assert components["AuthorResponseSchema"] == (
+        base_pydantic.AuthorResponseSchema.openapi_schema()
+    )
+
+    operation = schema["paths"]["/authors/{id}"]["put"]
+    assert operation["requestBody"]["content"]["application/json"]["schema"] == {
+        "$ref": "#/components/schemas/AuthorPutReuqestSchema"
+    }
+    assert operation["responses"]["422"]["content"]["application/json"]["schema"] == {
+        "$ref": "#/components/schemas/ExtendedHTTPException"
+    }
+
+    operation = schema["paths"]["/authors"]["get"]
+    assert operation["responses"]["200"]["content"]["application/json"]["schema"] == {
+        "type": "array",
+        "items": {"$ref": "#/components/schemas/AuthorResponseListSchema"},
+    }
+
+    # Same name from another module is qualified
+    assert "example_app.base_api.base_typesystem.AuthorResponseSchema" in components
+
+
+def test_feature_exceptions_are_documented() -> None:
+    """
+    Test the exception classes added by the features (eg. 412 of the ETags)
+    are in the responses.
+    """
+    schemas = OpenAPIv3SchemaGenerator(BASE_SCHEMA)
+    schema = schemas.get_schema([Route("/authors/{id}", endpoint=base_pydantic.Author)])
+
+    responses = schema["paths"]["/authors/{id}"]["put"]["responses"]
+    assert responses["412"]["description"] == "Precondition failed"
+
+
+def test_docstrings_are_parsed_once() -> None:
+    """
+    Test the docstrings are parsed once per function.
+    """
+    schemas = OpenAPIv3SchemaGenerator(BASE_SCHEMA)
+    routes = [
+        Route("/authors/{id}", endpoint=base_pydantic.Author),
+        Route("/typesystem/authors/{id}", endpoint=base_typesystem.Author),
+    ]
+    parsed = []
+    parse_docstring_text = schemas.parse_docstring_text
+
+    def counting_parse_docstring_text(docstring: str) -> dict:
+        parsed.append(docstring)
+        return parse_docstring_text(docstring)
+
+    schemas.parse_docstring_text = counting_parse_docstring_text  # type: ignore
+
+    schemas.get_schema(routes)
+    schemas.get_schema(routes)
+    # get, put and delete shared by both endpoints
+    assert len(parsed) == 3
+
+
+@pytest.mark.asyncio
+async def test_schema_endpoint(async_client: AsyncTestClient) -> None:
+    """
+    Test the document is served as YAML or JSON with the ETag.
+    """
+    response = await async_client.get("/schema")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.oai.openapi"
+    assert yaml.safe_load(response.text)["openapi"] == "3.0.0"
+    yaml_etag = response.headers["etag"]
+
+    response = await async_client.get("/schema", headers={"accept": "application/json"})
+    assert response.status_code == 200
+    assert json.loads(response.text)["openapi"] == "3.0.0"
+    assert response.headers["etag"] != yaml_etag
+
+
+@pytest.mark.asyncio
+async def test_schema_endpoint_not_modified(async_client: AsyncTestClient) -> None:
+    """
+    Test the conditional request with the current ETag gets 304.
+    """
+    response = await async_client.get("/schema?format=json")
+    etag = response.headers["etag"]
+
+    response = await async_client.get(
+        "/schema?format=json", headers={"if-none-match": f'"stale", W/{etag}'}
+    )
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+    response = await async_client.get(
+        "/schema?format=json", headers={"if-none-match": '"stale"'}
+    )
+    assert response.status_code == 200
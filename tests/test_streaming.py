@@ -0,0 +1,31 @@
+import json
+import typing
+
+import pytest
+
+from starlette_cbge.json_codecs import StdlibJSONCodec
+from starlette_cbge.streaming import stream_json_array
+
+
+async def rows(count: int) -> typing.AsyncIterator[typing.Dict[str, typing.Any]]:
+    for index in range(count):
+        yield {"id": index, "name": f"Author {index}"}
+
+
+@pytest.mark.parametrize("count", [0, 1, 5])
+@pytest.mark.asyncio
+async def test_stream_json_array(count: int) -> None:
+    """
+    Test the chunked JSON array is a valid JSON document for any number of batches.
+    """
+    chunks = [
+        chunk
+        async for chunk in stream_json_array(
+            rows(count), dict, StdlibJSONCodec(), batch_size=2
+        )
+    ]
+
+    assert len(chunks) == (count + 1) // 2 + 1
+    assert json.loads(b"".join(chunks)) == [
+        {"id": index, "name": f"Author {index}"} for index in range(count)
+    ]
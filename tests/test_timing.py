@@ -0,0 +1,134 @@
+import time
+import typing
+
+import pytest
+
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+from starlette_cbge import timing
+from starlette_cbge.endpoints import PydanticBaseEndpoint
+from starlette_cbge.exceptions import ImproperlyConfigured, NotFoundException
+from starlette_cbge.schema_backends import PydanticSchema
+from starlette_cbge.timing import HistogramSink, PhaseTimer
+
+
+def test_phases_are_timed_exclusively() -> None:
+    """
+    Test the nested phases are not counted in the enclosing one,
+    so the phases add up to the total.
+    """
+    timer = PhaseTimer()
+    with timer.phase("deserialize"):
+        with timer.phase("payload"):
+            time.sleep(0.02)
+    with timer.phase("handler"):
+        time.sleep(0.01)
+    with timer.phase("handler"):
+        pass
+    total = timer.finish()
+
+    assert list(timer.durations) == ["deserialize", "payload", "handler"]
+    assert timer.durations["payload"] >= 0.02
+    assert timer.durations["deserialize"] < 0.01
+    assert timer.durations["handler"] >= 0.01
+    assert sum(timer.durations.values()) <= total
+    assert [(span.phase, span.parent) for span in timer.spans] == [
+        ("deserialize", None),
+        ("payload", 0),
+        ("handler", None),
+        ("handler", None),
+    ]
+
+    header = timer.server_timing(total)
+    assert header.startswith("deserialize;dur=")
+    assert ", total;dur=" in header
+
+
+def test_histogram_exposition() -> None:
+    """
+    Test the histograms are rendered in the Prometheus text format
+    with the cumulative buckets.
+    """
+    sink = HistogramSink(buckets=(0.01, 0.1))
+    for value in (0.005, 0.05, 0.5):
+        sink.observe("Authors", "GET", "handler", value)
+
+    assert sink.exposition().splitlines()[2:] == [
+        'http_request_phase_seconds_bucket{endpoint="Authors",method="GET",'
+        'phase="handler",le="0.01"} 1',
+        'http_request_phase_seconds_bucket{endpoint="Authors",method="GET",'
+        'phase="handler",le="0.1"} 2',
+        'http_request_phase_seconds_bucket{endpoint="Authors",method="GET",'
+        'phase="handler",le="+Inf"} 3',
+        'http_request_phase_seconds_sum{endpoint="Authors",method="GET",'
+        'phase="handler"} 0.555',
+        'http_request_phase_seconds_count{endpoint="Authors",method="GET",'
+        'phase="handler"} 3',
+    ]
+
+
+@pytest.mark.skipif(timing.trace is not None, reason="opentelemetry is installed")
+def test_opentelemetry_sink_requires_package() -> None:
+    with pytest.raises(ImproperlyConfigured):
+        timing.OpenTelemetrySink()
+
+
+sink = HistogramSink()
+
+
+class GaugeRequestSchema(PydanticSchema):
+    id: int
+
+
+class GaugeResponseSchema(PydanticSchema):
+    id: int
+
+
+class Gauge(PydanticBaseEndpoint):
+    timing_sinks = (sink,)
+    server_timing = True
+
+    request_schemas = (("GET", GaugeRequestSchema),)
+    response_schemas = (("GET", GaugeResponseSchema),)
+
+    async def get(self, data: typing.Dict[str, typing.Any]) -> typing.Any:
+        if data["id"] == 0:
+            raise NotFoundException()
+        return {"id": data["id"]}
+
+
+app = Starlette()
+app.add_route("/gauges/{id}", Gauge, methods=["GET"])
+
+
+def test_endpoint_phases_are_recorded() -> None:
+    """
+    Test the pipeline phases are sent in the `Server-Timing` header
+    and recorded by the sinks, failures included.
+    """
+    client = TestClient(app)
+
+    response = client.get("/gauges/1")
+    assert response.status_code == 200
+    phases = [
+        metric.split(";")[0] for metric in response.headers["server-timing"].split(", ")
+    ]
+    assert phases == [
+        "deserialize",
+        "shape",
+        "payload",
+        "validate",
+        "handler",
+        "serialise",
+        "context",
+        "encode",
+        "total",
+    ]
+
+    response = client.get("/gauges/0")
+    assert response.status_code == 404
+
+    assert sink.histograms[("Gauge", "GET", "total")].count == 2
+    assert sink.histograms[("Gauge", "GET", "handler")].count == 2
+    assert sink.histograms[("Gauge", "GET", "serialise")].count == 1